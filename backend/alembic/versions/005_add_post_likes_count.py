@@ -0,0 +1,42 @@
+"""add likes_count counter to posts
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-07-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# Number of posts backfilled per UPDATE statement
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def upgrade():
+    # Add denormalized likes counter (defaults to 0 for existing rows)
+    op.add_column('posts', sa.Column('likes_count', sa.Integer(), nullable=False, server_default='0'))
+    
+    # Backfill from likes table. Each id range is committed on its own (outside the migration's transaction),
+    # so likes arriving during the upgrade wait for one chunk's row locks at most
+    max_id = op.get_bind().execute(sa.text("SELECT MAX(id) FROM posts")).scalar() or 0
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        for start in range(0, max_id + 1, BACKFILL_CHUNK_SIZE):
+            conn.execute(
+                sa.text(
+                    "UPDATE posts SET likes_count = "
+                    "(SELECT COUNT(*) FROM likes WHERE likes.post_id = posts.id) "
+                    "WHERE posts.id >= :start AND posts.id < :end"
+                ),
+                {"start": start, "end": start + BACKFILL_CHUNK_SIZE}
+            )
+
+def downgrade():
+    op.drop_column('posts', 'likes_count')
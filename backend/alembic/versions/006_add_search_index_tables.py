@@ -0,0 +1,44 @@
+"""add search index tables
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-07-08 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postings: term -> post (binary collation so that e.g. kana variants stay distinct terms)
+    op.create_table('search_postings',
+        sa.Column('term', sa.String(64, collation='utf8mb4_bin'), nullable=False),
+        sa.Column('post_id', sa.Integer(), nullable=False),
+        sa.Column('title_tf', sa.Integer(), nullable=False),
+        sa.Column('content_tf', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('term', 'post_id')
+    )
+    op.create_index('ix_search_postings_post_id', 'search_postings', ['post_id'], unique=False)
+    
+    # Per-document token counts for BM25 length normalization
+    op.create_table('search_documents',
+        sa.Column('post_id', sa.Integer(), nullable=False),
+        sa.Column('title_length', sa.Integer(), nullable=False),
+        sa.Column('content_length', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('post_id')
+    )
+
+
+def downgrade():
+    op.drop_table('search_documents')
+    op.drop_index('ix_search_postings_post_id', table_name='search_postings')
+    op.drop_table('search_postings')
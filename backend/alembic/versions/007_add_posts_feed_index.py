@@ -0,0 +1,24 @@
+"""add covering index for the public post feed
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-07-15 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (status, published_at, id) serves keyset pagination and the feed COUNT from the index alone
+    op.create_index('ix_posts_status_published_at_id', 'posts', ['status', 'published_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_posts_status_published_at_id', table_name='posts')
@@ -0,0 +1,38 @@
+"""add related_posts table
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-07-22 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Precomputed related posts (populate with: python rebuild_related_posts.py)
+    op.create_table('related_posts',
+        sa.Column('post_id', sa.Integer(), nullable=False),
+        sa.Column('related_post_id', sa.Integer(), nullable=False),
+        sa.Column('shared_categories', sa.Integer(), nullable=False),
+        sa.Column('shared_tags', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('post_id', 'related_post_id')
+    )
+    op.create_index('ix_related_posts_related_post_id', 'related_posts', ['related_post_id'], unique=False)
+    op.create_index('ix_related_posts_post_id_score', 'related_posts', ['post_id', 'score'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_related_posts_post_id_score', table_name='related_posts')
+    op.drop_index('ix_related_posts_related_post_id', table_name='related_posts')
+    op.drop_table('related_posts')
@@ -0,0 +1,48 @@
+"""add content_length to posts
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-07-29 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+# Number of posts backfilled per UPDATE statement
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def upgrade():
+    # Stored character count so the length filter does not scan post bodies
+    op.add_column('posts', sa.Column('content_length', sa.Integer(), nullable=False, server_default='0'))
+    
+    # Reading every post body is the slow part of this upgrade. Autocommit makes each id range its own
+    # transaction, so admin edits are not blocked until the last chunk and the undo log stays small
+    max_id = op.get_bind().execute(sa.text("SELECT MAX(id) FROM posts")).scalar() or 0
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        for start in range(0, max_id + 1, BACKFILL_CHUNK_SIZE):
+            conn.execute(
+                sa.text(
+                    "UPDATE posts SET content_length = CHAR_LENGTH(content) "
+                    "WHERE id >= :start AND id < :end"
+                ),
+                {"start": start, "end": start + BACKFILL_CHUNK_SIZE}
+            )
+    
+    op.create_index(
+        'ix_posts_status_published_at_content_length', 'posts',
+        ['status', 'published_at', 'content_length'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_posts_status_published_at_content_length', table_name='posts')
+    op.drop_column('posts', 'content_length')
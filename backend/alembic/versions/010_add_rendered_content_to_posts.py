@@ -0,0 +1,35 @@
+"""add pre-rendered markdown columns to posts
+
+Revision ID: 010
+Revises: 009
+Create Date: 2025-07-30 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rendered HTML, TOC, word count and reading time, keyed by a hash of the content.
+    # Existing posts are rendered afterwards with: python render_posts.py
+    op.add_column('posts', sa.Column('content_html', sa.Text().with_variant(mysql.MEDIUMTEXT(), 'mysql'), nullable=True))
+    op.add_column('posts', sa.Column('toc', sa.JSON(), nullable=True))
+    op.add_column('posts', sa.Column('word_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('posts', sa.Column('reading_time', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('posts', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column('posts', 'content_hash')
+    op.drop_column('posts', 'reading_time')
+    op.drop_column('posts', 'word_count')
+    op.drop_column('posts', 'toc')
+    op.drop_column('posts', 'content_html')
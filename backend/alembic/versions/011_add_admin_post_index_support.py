@@ -0,0 +1,56 @@
+"""add per-status post counters and indexes for the admin post index
+
+Revision ID: 011
+Revises: 010
+Create Date: 2025-07-31 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-status totals maintained by the admin write paths, so listing never runs COUNT(*)
+    op.create_table(
+        'post_status_counts',
+        sa.Column('status', sa.Enum('draft', 'published', name='poststatus'), nullable=False),
+        sa.Column('post_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('status')
+    )
+    op.bulk_insert(
+        sa.table('post_status_counts', sa.column('status', sa.String), sa.column('post_count', sa.Integer)),
+        [{'status': 'draft', 'post_count': 0}, {'status': 'published', 'post_count': 0}]
+    )
+    op.execute(
+        "UPDATE post_status_counts SET post_count = "
+        "(SELECT COUNT(*) FROM posts WHERE posts.status = post_status_counts.status)"
+    )
+
+    # (created_at, id) keyset order, optionally narrowed by status or author
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_posts_status_created_at_id', 'posts', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_posts_user_id_created_at_id', 'posts', ['user_id', 'created_at', 'id'], unique=False)
+    # Title prefix search
+    op.create_index('ix_posts_title', 'posts', ['title'], unique=False)
+    # Category / tag filters look posts up by taxonomy id
+    op.create_index(
+        'ix_post_categories_category_id_post_id', 'post_categories', ['category_id', 'post_id'], unique=False
+    )
+    op.create_index('ix_post_tags_tag_id_post_id', 'post_tags', ['tag_id', 'post_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_post_tags_tag_id_post_id', table_name='post_tags')
+    op.drop_index('ix_post_categories_category_id_post_id', table_name='post_categories')
+    op.drop_index('ix_posts_title', table_name='posts')
+    op.drop_index('ix_posts_user_id_created_at_id', table_name='posts')
+    op.drop_index('ix_posts_status_created_at_id', table_name='posts')
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
+    op.drop_table('post_status_counts')
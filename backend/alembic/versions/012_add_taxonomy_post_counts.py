@@ -0,0 +1,40 @@
+"""add post counters to categories and tags
+
+Revision ID: 012
+Revises: 011
+Create Date: 2025-08-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Denormalized post counts, maintained by the admin write paths in the same transaction
+    for table, association, column in (
+        ('categories', 'post_categories', 'category_id'),
+        ('tags', 'post_tags', 'tag_id'),
+    ):
+        op.add_column(table, sa.Column('post_count', sa.Integer(), nullable=False, server_default='0'))
+        op.add_column(table, sa.Column('published_post_count', sa.Integer(), nullable=False, server_default='0'))
+        # Backfill (the tables are small, one UPDATE each)
+        op.execute(
+            f"UPDATE {table} SET "
+            f"post_count = (SELECT COUNT(*) FROM {association} a WHERE a.{column} = {table}.id), "
+            f"published_post_count = (SELECT COUNT(*) FROM {association} a "
+            f"JOIN posts p ON p.id = a.post_id "
+            f"WHERE a.{column} = {table}.id AND p.status = 'published')"
+        )
+
+
+def downgrade():
+    for table in ('tags', 'categories'):
+        op.drop_column(table, 'published_post_count')
+        op.drop_column(table, 'post_count')
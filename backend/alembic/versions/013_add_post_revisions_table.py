@@ -0,0 +1,44 @@
+"""add post revisions table
+
+Revision ID: 013
+Revises: 012
+Create Date: 2025-08-02 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Full content for the head and every Nth revision, zlib-compressed reverse deltas in between
+    op.create_table(
+        'post_revisions',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('post_id', sa.Integer(), nullable=False),
+        sa.Column('revision', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('is_snapshot', sa.Boolean(), nullable=False),
+        sa.Column('data', sa.LargeBinary().with_variant(mysql.MEDIUMBLOB(), 'mysql'), nullable=False),
+        sa.Column('content_length', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('post_id', 'revision', name='uq_post_revisions_post_id_revision')
+    )
+    op.create_index(op.f('ix_post_revisions_id'), 'post_revisions', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_post_revisions_id'), table_name='post_revisions')
+    op.drop_table('post_revisions')
@@ -1,51 +1,314 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 from datetime import datetime
-import io
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+import time
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy import and_, func, or_, select
+from app.db.session import get_db, SessionLocal
+from app.db.loaders import post_response_options, post_summary_options
 from app.api.deps import get_current_user
-from app.schemas.post import Post, PostCreate, PostUpdate, PostList
-from app.schemas.category import Category, CategoryCreate, CategoryUpdate
-from app.schemas.tag import Tag, TagCreate, TagUpdate
-from app.schemas.image import Image, ImageCreate, ImageUpdate, ImageUploadResponse
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.schemas.post import (
+    Post, PostSummary, PostCreate, PostUpdate, PostList, PostImportItem, PostImportError, PostImportResult,
+    PostBulkRequest, PostBulkResult, PostContentEdit, PostContentPatch, PostContentPatchResult,
+    AdminPost, AdminPostList, AdminPostCursorList
+)
+from app.schemas.post_revision import PostRevision, PostRevisionSummary
+from app.schemas.category import Category, CategoryCreate, CategoryUpdate, CategoryWithCounts
+from app.schemas.tag import Tag, TagCreate, TagUpdate, TagWithCounts
+from app.schemas.image import (
+    Image, ImageCreate, ImageUpdate, ImageUploadComplete, ImageUploadInit, ImageUploadResponse, ImageUploadSession
+)
 from app.models import post as post_model, category as category_model, tag as tag_model, user as user_model, image as image_model
 from app.models.post import PostStatus
+from app.services.like_buffer import like_buffer
+from app.services.search import SearchService
+from app.services.related_posts import RelatedPostsService, schedule_related_refill
+from app.services.markdown_render import MarkdownRenderService, content_hash
+from app.services.post_bulk import PostBulkService
+from app.services.post_counters import PostCounterService, PostCounterState
+from app.services.post_revisions import PostRevisionService
+from app.services.post_transfer import PostTransferService
+from app.services.feeds import feed_store
+from app.services.image_processing import process_image
+from app.services.image_uploads import (
+    UploadBusy, UploadNotFound, UploadOffsetMismatch, UploadSession, UploadTooLarge, image_uploads
+)
+from app.services.image_variants import image_variants
+from app.services.response_cache import response_cache
+from app.services.slug_cache import slug_cache
+from app.services.snapshot import schedule_snapshot_export
 import os
 import uuid
-from PIL import Image as PILImage
 
 router = APIRouter()
 
 
 # Posts
-@router.get("/posts", response_model=PostList)
+@router.get("/posts", response_model=Union[AdminPostList, AdminPostCursorList])
 def get_all_posts(
-    page: int = 1,
-    per_page: int = 10,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    # カーソル（キーセット）ページネーション。指定時（空文字で先頭ページ）はpageを無視する
+    cursor: Optional[str] = None,
+    # Filters
+    status_filter: Optional[PostStatus] = Query(None, alias="status"),
+    author_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    tag_id: Optional[int] = None,
+    title_prefix: Optional[str] = Query(None, min_length=1, max_length=200),
+    # 一覧は既定で本文を含まない。include=content で本文付きの Post を返す
+    include: Optional[str] = Query(None, pattern="^content$"),
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    """管理画面の記事一覧（作成日時の新しい順）
+
+    件数は状態別カウンタから返す。状態以外の条件で絞り込んだ場合、ページ番号指定では
+    絞り込み結果をCOUNTし、カーソル指定では total を返さない（COUNTしない）。
+    """
+    include_content = include == "content"
     query = db.query(post_model.Post)
-    total = query.count()
+    
+    if status_filter is not None:
+        query = query.filter(post_model.Post.status == status_filter)
+    if author_id is not None:
+        query = query.filter(post_model.Post.user_id == author_id)
+    if category_id is not None:
+        query = query.filter(post_model.Post.id.in_(
+            select(post_model.post_categories.c.post_id).where(post_model.post_categories.c.category_id == category_id)
+        ))
+    if tag_id is not None:
+        query = query.filter(post_model.Post.id.in_(
+            select(post_model.post_tags.c.post_id).where(post_model.post_tags.c.tag_id == tag_id)
+        ))
+    if title_prefix:
+        escaped = title_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(post_model.Post.title.like(f"{escaped}%", escape="\\"))
+    
+    status_counts = PostCounterService(db).counts()
+    only_status_filter = author_id is None and category_id is None and tag_id is None and not title_prefix
+    if not only_status_filter:
+        total = None
+    elif status_filter is not None:
+        total = status_counts[status_filter.value]
+    else:
+        total = sum(status_counts.values())
+    
+    options = post_response_options() if include_content else post_summary_options()
+    schema = Post if include_content else PostSummary
+    
+    if cursor is not None:
+        if cursor:
+            try:
+                values = decode_cursor(cursor)
+                last_created_at = datetime.fromisoformat(values["c"])
+                last_id = int(values["i"])
+            except (ValueError, KeyError, TypeError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor"
+                )
+            query = query.filter(or_(
+                post_model.Post.created_at < last_created_at,
+                and_(post_model.Post.created_at == last_created_at, post_model.Post.id < last_id)
+            ))
+        
+        # Fetch one extra row to know whether a next page exists
+        posts = query.options(*options).order_by(
+            post_model.Post.created_at.desc(), post_model.Post.id.desc()
+        ).limit(per_page + 1).all()
+        
+        next_cursor = None
+        if len(posts) > per_page:
+            posts = posts[:per_page]
+            next_cursor = encode_cursor({"c": posts[-1].created_at.isoformat(), "i": posts[-1].id})
+        
+        return AdminPostCursorList(
+            posts=[schema.model_validate(post) for post in posts],
+            per_page=per_page,
+            next_cursor=next_cursor,
+            total=total,
+            status_counts=status_counts
+        )
+    
+    if total is None:
+        total = query.with_entities(func.count(post_model.Post.id)).scalar()
     
     offset = (page - 1) * per_page
-    posts = query.order_by(post_model.Post.created_at.desc()).offset(offset).limit(per_page).all()
+    posts = query.options(*options).order_by(
+        post_model.Post.created_at.desc(), post_model.Post.id.desc()
+    ).offset(offset).limit(per_page).all()
     
     pages = (total + per_page - 1) // per_page
     
-    return PostList(
-        posts=posts,
+    return AdminPostList(
+        posts=[schema.model_validate(post) for post in posts],
         total=total,
         page=page,
         per_page=per_page,
-        pages=pages
+        pages=pages,
+        status_counts=status_counts
+    )
+
+
+# Bulk export / import (NDJSON)
+# 応答に含めるエラー行の上限
+MAX_REPORTED_IMPORT_ERRORS = 100
+
+
+@router.get("/posts/export")
+def export_posts(
+    batch_size: int = Query(500, ge=1, le=5000),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    """全記事をカテゴリ・タグのID付きでNDJSONとしてストリーミングする"""
+    def generate():
+        # The response outlives request dependencies, so the stream owns its session
+        db = SessionLocal()
+        try:
+            yield from PostTransferService(db).export_ndjson(batch_size=batch_size)
+        finally:
+            db.close()
+
+    filename = f"posts-{datetime.utcnow():%Y%m%d%H%M%S}.ndjson"
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def _import_posts_batch(batch: List[tuple], user_id: int, result: PostImportResult) -> None:
+    db = SessionLocal()
+    try:
+        created, updated = PostTransferService(db).import_batch([item for _, item in batch], user_id)
+        db.commit()
+        result.created += created
+        result.updated += updated
+    except Exception as e:
+        db.rollback()
+        result.failed += len(batch)
+        for line, _ in batch:
+            _add_import_error(result, line, f"Batch failed: {e}")
+    finally:
+        db.close()
+
+
+def _add_import_error(result: PostImportResult, line: int, detail: str) -> None:
+    if len(result.errors) < MAX_REPORTED_IMPORT_ERRORS:
+        result.errors.append(PostImportError(line=line, detail=detail))
+
+
+@router.post("/posts/import", response_model=PostImportResult)
+async def import_posts(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    batch_size: int = Query(500, ge=1, le=5000),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    """NDJSON（1行1記事、エクスポートと同じ形式）を読みながら、slugをキーにバッチ単位で作成・更新する
+
+    不正な行はスキップしてエラーとして報告する。バッチ単位でコミットするので、
+    途中のバッチが失敗してもそれ以前のバッチは反映される。
+    """
+    started = time.perf_counter()
+    result = PostImportResult(lines=0, created=0, updated=0, failed=0, seconds=0, posts_per_second=0)
+    batch = []
+    
+    def parse(line_number: int, raw: bytes) -> None:
+        if not raw.strip():
+            return
+        result.lines += 1
+        try:
+            batch.append((line_number, PostImportItem.model_validate_json(raw)))
+        except ValidationError as e:
+            result.failed += 1
+            _add_import_error(result, line_number, str(e.errors(include_url=False, include_input=False)))
+    
+    line_number = 0
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for raw in lines:
+            line_number += 1
+            parse(line_number, raw)
+            if len(batch) >= batch_size:
+                await run_in_threadpool(_import_posts_batch, batch, current_user.id, result)
+                batch = []
+    parse(line_number + 1, pending)
+    if batch:
+        await run_in_threadpool(_import_posts_batch, batch, current_user.id, result)
+    
+    # Imported posts can touch any list, page or slug
+    response_cache.clear()
+    slug_cache.clear()
+    feed_store.invalidate()
+    schedule_snapshot_export(background_tasks)
+    
+    result.seconds = round(time.perf_counter() - started, 3)
+    imported = result.created + result.updated
+    result.posts_per_second = round(imported / result.seconds, 1) if result.seconds else 0.0
+    return result
+
+
+def _taxonomy_count_tags(counts_changed: Tuple[bool, bool]) -> List[str]:
+    """公開記事数が変わったカテゴリ・タグ一覧（公開API）のキャッシュタグ"""
+    return [tag for tag, changed in zip(("categories", "tags"), counts_changed) if changed]
+
+
+@router.post("/posts/bulk", response_model=PostBulkResult)
+def bulk_update_posts(
+    bulk_in: PostBulkRequest,
+    background_tasks: BackgroundTasks,
+    current_user: user_model.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """複数記事への操作（公開・非公開・削除・カテゴリ/タグの付け替え）を1トランザクションで適用する
+
+    存在しない記事は not_found として結果に含め、他の記事の処理は続ける。
+    存在しないカテゴリ・タグを指定した場合は何も変更せず 400 を返す。
+    """
+    try:
+        outcome = PostBulkService(db).apply(bulk_in.operations)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    db.commit()
+    schedule_related_refill(background_tasks, outcome.related_refill_ids)
+    
+    response_cache.invalidate(
+        "post-list",
+        *(f"post:{post_id}" for post_id in outcome.changed_ids | outcome.deleted.keys()),
+        *_taxonomy_count_tags((outcome.category_counts_changed, outcome.tag_counts_changed))
     )
+    for post_id, (slug, post_status) in outcome.posts.items():
+        slug_cache.set(slug, post_id, post_status)
+    if outcome.deleted:
+        slug_cache.discard(*outcome.deleted.values())
+    if outcome.visibility_changed:
+        feed_store.invalidate()
+    if outcome.changed_ids or outcome.deleted:
+        schedule_snapshot_export(
+            background_tasks, outcome.changed_ids, list(outcome.deleted.values()),
+            taxonomies=outcome.category_counts_changed or outcome.tag_counts_changed
+        )
+    
+    return outcome.result
 
 
 @router.post("/posts", response_model=Post)
 def create_post(
     post_in: PostCreate,
+    background_tasks: BackgroundTasks,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -80,24 +343,43 @@ def create_post(
         ).all()
         post.tags = tags
     
+    # Keep the stored character count in sync with content
+    post.content_length = len(post.content)
+    # Pre-render markdown in the worker pool
+    MarkdownRenderService(db).render_post(post)
+    
     # Set published_at if publishing
     if post_in.status == PostStatus.PUBLISHED:
         post.published_at = datetime.utcnow()
     
     db.add(post)
+    db.flush()
+    
+    # Update search index and related posts in the same transaction
+    SearchService(db).index_post(post)
+    refill_ids = RelatedPostsService(db).refresh_post(post.id) if post.status == PostStatus.PUBLISHED else set()
+    counts_changed = PostCounterService(db).apply([(None, PostCounterState.of(post))])
+    PostRevisionService(db).record(post, current_user.id)
+    
     db.commit()
+    schedule_related_refill(background_tasks, refill_ids)
+    response_cache.invalidate("post-list", *_taxonomy_count_tags(counts_changed))
+    slug_cache.set(post.slug, post.id, post.status)
+    if post.status == PostStatus.PUBLISHED:
+        feed_store.invalidate()
+        schedule_snapshot_export(background_tasks, [post.id], taxonomies=any(counts_changed))
     db.refresh(post)
     
     return post
 
 
-@router.get("/posts/{post_id}", response_model=Post)
+@router.get("/posts/{post_id}", response_model=AdminPost)
 def get_post(
     post_id: int,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    post = db.query(post_model.Post).filter(
+    post = db.query(post_model.Post).options(*post_response_options()).filter(
         post_model.Post.id == post_id
     ).first()
     
@@ -107,13 +389,50 @@ def get_post(
             detail="Post not found"
         )
     
-    return post
+    result = AdminPost.model_validate(post)
+    # The stored content_hash is cleared when rendering fails, so hash the content itself
+    result.content_hash = content_hash(post.content)
+    return result
+
+
+@router.get("/posts/{post_id}/revisions", response_model=List[PostRevisionSummary])
+def get_post_revisions(
+    post_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    # この版番号より古い版を返す（ページング用）
+    before: Optional[int] = Query(None, ge=1),
+    current_user: user_model.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """記事の版の一覧（新しい順、本文なし）"""
+    return PostRevisionService(db).list(post_id, limit=limit, before=before)
+
+
+@router.get("/posts/{post_id}/revisions/{revision}", response_model=PostRevision)
+def get_post_revision(
+    post_id: int,
+    revision: int,
+    current_user: user_model.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """指定した版のタイトルと本文"""
+    found = PostRevisionService(db).get(post_id, revision)
+    
+    if not found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Revision not found"
+        )
+    
+    row, content = found
+    return PostRevision(**PostRevisionSummary.model_validate(row).model_dump(), content=content)
 
 
 @router.put("/posts/{post_id}", response_model=Post)
 def update_post(
     post_id: int,
     post_in: PostUpdate,
+    background_tasks: BackgroundTasks,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -129,8 +448,25 @@ def update_post(
     
     # Update fields
     update_data = post_in.model_dump(exclude_unset=True, exclude={"category_ids", "tag_ids"})
+    
+    taxonomy_changed = (
+        post_in.category_ids is not None or post_in.tag_ids is not None or "status" in update_data
+    )
+    previous_counter_state = PostCounterState.of(post) if taxonomy_changed else None
+    # Title and content changes are kept in the revision history
+    revision_service = PostRevisionService(db)
+    revision_tracked = bool({"title", "content"} & update_data.keys())
+    if revision_tracked:
+        revision_service.ensure_initial(post)
+    previous_slug = post.slug
+    # Sitemap and feeds list published posts by slug, title and excerpt
+    previous_feed_fields = (post.status, post.slug, post.title, post.excerpt)
+    
     for field, value in update_data.items():
         setattr(post, field, value)
+    if "content" in update_data:
+        post.content_length = len(post.content)
+        MarkdownRenderService(db).render_post(post)
     
     # Update categories if provided
     if post_in.category_ids is not None:
@@ -152,15 +488,116 @@ def update_post(
     elif post_in.status == PostStatus.DRAFT:
         post.published_at = None
     
+    # Re-index only when searchable fields or visibility changed
+    if {"title", "content", "status"} & update_data.keys():
+        SearchService(db).index_post(post)
+    
+    # Refresh related posts when taxonomy or visibility changed
+    refill_ids = set()
+    if taxonomy_changed:
+        db.flush()
+        refill_ids = RelatedPostsService(db).refresh_post(post.id)
+        counts_changed = PostCounterService(db).apply([(previous_counter_state, PostCounterState.of(post))])
+    else:
+        counts_changed = (False, False)
+    if revision_tracked:
+        revision_service.record(post, current_user.id)
+    
     db.commit()
+    schedule_related_refill(background_tasks, refill_ids)
+    response_cache.invalidate("post-list", f"post:{post.id}", *_taxonomy_count_tags(counts_changed))
+    if post.slug != previous_slug:
+        slug_cache.discard(previous_slug)
+    slug_cache.set(post.slug, post.id, post.status)
+    feed_fields = (post.status, post.slug, post.title, post.excerpt)
+    if feed_fields != previous_feed_fields and PostStatus.PUBLISHED in (previous_feed_fields[0], post.status):
+        feed_store.invalidate()
+    if PostStatus.PUBLISHED in (previous_feed_fields[0], post.status):
+        schedule_snapshot_export(
+            background_tasks, [post.id], [previous_slug] if post.slug != previous_slug else [],
+            taxonomies=any(counts_changed)
+        )
     db.refresh(post)
     
     return post
 
 
+def _apply_content_edits(content: str, edits: List[PostContentEdit]) -> str:
+    """差分を先頭から順に適用する。本文の範囲外を指す編集は ValueError"""
+    for edit in edits:
+        end = edit.position + edit.delete
+        if end > len(content):
+            raise ValueError("Edit is out of range")
+        content = content[:edit.position] + edit.insert + content[end:]
+    return content
+
+
+@router.patch("/posts/{post_id}/content", response_model=PostContentPatchResult)
+def patch_post_content(
+    post_id: int,
+    patch_in: PostContentPatch,
+    current_user: user_model.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """本文を差分で更新する（エディタの自動保存用）
+
+    公開中の記事には使えない（409）。編集途中の本文が公開されないよう、公開記事は PUT で保存する。
+    base_hash が現在の本文のハッシュと一致しなければ 409 を返す（別のタブなどでの更新と衝突）。
+    適用後の本文が変わらなければ何も書き込まない。
+    """
+    # Lock the row so concurrent saves are checked against the latest content
+    post = db.query(post_model.Post).filter(
+        post_model.Post.id == post_id
+    ).with_for_update().first()
+    
+    if not post:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
+    
+    if post.status == PostStatus.PUBLISHED:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Published posts cannot be autosaved; save them with PUT /api/admin/posts/{post_id}"
+        )
+    
+    current_hash = content_hash(post.content)
+    if patch_in.base_hash != current_hash:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Content has changed since the base revision"
+        )
+    
+    try:
+        content = _apply_content_edits(post.content, patch_in.edits)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if content == post.content:
+        db.rollback()
+        return PostContentPatchResult(content_hash=current_hash, content_length=len(content), changed=False)
+    
+    post.content = content
+    post.content_length = len(content)
+    MarkdownRenderService(db).render_post(post)
+    SearchService(db).index_post(post)
+    
+    db.commit()
+    
+    return PostContentPatchResult(content_hash=content_hash(content), content_length=len(content), changed=True)
+
+
 @router.delete("/posts/{post_id}")
 def delete_post(
     post_id: int,
+    background_tasks: BackgroundTasks,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -174,16 +611,62 @@ def delete_post(
             detail="Post not found"
         )
     
+    slug = post.slug
+    previous_counter_state = PostCounterState.of(post)
+    was_published = post.status == PostStatus.PUBLISHED
+    
+    SearchService(db).remove_post(post.id)
+    PostRevisionService(db).remove_post(post.id)
+    refill_ids = RelatedPostsService(db).remove_posts([post.id])
     db.delete(post)
+    db.flush()
+    counts_changed = PostCounterService(db).apply([(previous_counter_state, None)])
     db.commit()
+    schedule_related_refill(background_tasks, refill_ids)
+    response_cache.invalidate("post-list", f"post:{post_id}", *_taxonomy_count_tags(counts_changed))
+    slug_cache.discard(slug)
+    if was_published:
+        feed_store.invalidate()
+        schedule_snapshot_export(background_tasks, [], [slug], taxonomies=any(counts_changed))
     
     return {"message": "Post deleted successfully"}
 
 
+# Likes
+@router.get("/likes/buffer-stats")
+def get_like_buffer_stats(
+    current_user: user_model.User = Depends(get_current_user)
+):
+    return {"running": like_buffer.is_running, **like_buffer.stats()}
+
+
+# Cache
+@router.get("/cache/stats")
+def get_response_cache_stats(
+    current_user: user_model.User = Depends(get_current_user)
+):
+    return response_cache.stats()
+
+
+@router.get("/feeds/stats")
+def get_feed_stats(
+    current_user: user_model.User = Depends(get_current_user)
+):
+    return feed_store.stats()
+
+
+@router.get("/slug-cache/stats")
+def get_slug_cache_stats(
+    current_user: user_model.User = Depends(get_current_user)
+):
+    return slug_cache.stats()
+
+
 # Categories
 @router.post("/categories", response_model=Category)
 def create_category(
     category_in: CategoryCreate,
+    background_tasks: BackgroundTasks,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -202,12 +685,14 @@ def create_category(
     category = category_model.Category(**category_in.model_dump())
     db.add(category)
     db.commit()
+    response_cache.invalidate("categories")
+    schedule_snapshot_export(background_tasks, [], taxonomies=True)
     db.refresh(category)
     
     return category
 
 
-@router.get("/categories", response_model=List[Category])
+@router.get("/categories", response_model=List[CategoryWithCounts])
 def get_all_categories(
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -218,7 +703,7 @@ def get_all_categories(
     return categories
 
 
-@router.get("/categories/{category_id}", response_model=Category)
+@router.get("/categories/{category_id}", response_model=CategoryWithCounts)
 def get_category(
     category_id: int,
     current_user: user_model.User = Depends(get_current_user),
@@ -241,6 +726,7 @@ def get_category(
 def update_category(
     category_id: int,
     category_in: CategoryUpdate,
+    background_tasks: BackgroundTasks,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -276,7 +762,13 @@ def update_category(
     for field, value in update_data.items():
         setattr(category, field, value)
     
+    # Posts embedding this category need their snapshot rewritten
+    post_ids = db.execute(
+        select(post_model.post_categories.c.post_id).where(post_model.post_categories.c.category_id == category_id)
+    ).scalars().all()
     db.commit()
+    response_cache.invalidate("categories", f"category:{category_id}")
+    schedule_snapshot_export(background_tasks, post_ids, taxonomies=True)
     db.refresh(category)
     
     return category
@@ -285,6 +777,7 @@ def update_category(
 @router.delete("/categories/{category_id}")
 def delete_category(
     category_id: int,
+    background_tasks: BackgroundTasks,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -299,18 +792,16 @@ def delete_category(
         )
     
     # Check if category is used in any posts
-    posts_count = db.query(post_model.Post).filter(
-        post_model.Post.categories.any(category_model.Category.id == category_id)
-    ).count()
-    
-    if posts_count > 0:
+    if category.post_count > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot delete category. It is used in {posts_count} post(s)."
+            detail=f"Cannot delete category. It is used in {category.post_count} post(s)."
         )
     
     db.delete(category)
     db.commit()
+    response_cache.invalidate("categories")
+    schedule_snapshot_export(background_tasks, [], taxonomies=True)
     
     return {"message": "Category deleted successfully"}
 
@@ -319,6 +810,7 @@ def delete_category(
 @router.post("/tags", response_model=Tag)
 def create_tag(
     tag_in: TagCreate,
+    background_tasks: BackgroundTasks,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -337,12 +829,14 @@ def create_tag(
     tag = tag_model.Tag(**tag_in.model_dump())
     db.add(tag)
     db.commit()
+    response_cache.invalidate("tags")
+    schedule_snapshot_export(background_tasks, [], taxonomies=True)
     db.refresh(tag)
     
     return tag
 
 
-@router.get("/tags", response_model=List[Tag])
+@router.get("/tags", response_model=List[TagWithCounts])
 def get_all_tags(
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -353,7 +847,7 @@ def get_all_tags(
     return tags
 
 
-@router.get("/tags/{tag_id}", response_model=Tag)
+@router.get("/tags/{tag_id}", response_model=TagWithCounts)
 def get_tag(
     tag_id: int,
     current_user: user_model.User = Depends(get_current_user),
@@ -376,6 +870,7 @@ def get_tag(
 def update_tag(
     tag_id: int,
     tag_in: TagUpdate,
+    background_tasks: BackgroundTasks,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -411,7 +906,13 @@ def update_tag(
     for field, value in update_data.items():
         setattr(tag, field, value)
     
+    # Posts embedding this tag need their snapshot rewritten
+    post_ids = db.execute(
+        select(post_model.post_tags.c.post_id).where(post_model.post_tags.c.tag_id == tag_id)
+    ).scalars().all()
     db.commit()
+    response_cache.invalidate("tags", f"tag:{tag_id}")
+    schedule_snapshot_export(background_tasks, post_ids, taxonomies=True)
     db.refresh(tag)
     
     return tag
@@ -420,6 +921,7 @@ def update_tag(
 @router.delete("/tags/{tag_id}")
 def delete_tag(
     tag_id: int,
+    background_tasks: BackgroundTasks,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -434,18 +936,16 @@ def delete_tag(
         )
     
     # Check if tag is used in any posts
-    posts_count = db.query(post_model.Post).filter(
-        post_model.Post.tags.any(tag_model.Tag.id == tag_id)
-    ).count()
-    
-    if posts_count > 0:
+    if tag.post_count > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot delete tag. It is used in {posts_count} post(s)."
+            detail=f"Cannot delete tag. It is used in {tag.post_count} post(s)."
         )
     
     db.delete(tag)
     db.commit()
+    response_cache.invalidate("tags")
+    schedule_snapshot_export(background_tasks, [], taxonomies=True)
     
     return {"message": "Tag deleted successfully"}
 
@@ -481,6 +981,64 @@ def get_image(
     return image
 
 
+ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/png", "image/gif", "image/webp"]
+
+
+def _create_image(db: Session, image_data: ImageCreate) -> image_model.Image:
+    image = image_model.Image(**image_data.model_dump())
+    db.add(image)
+    db.commit()
+    db.refresh(image)
+    return image
+
+
+async def _store_image(
+    db: Session,
+    source_path: str,
+    original_name: Optional[str],
+    content_type: str,
+    file_size: int,
+    alt_text: Optional[str],
+    caption: Optional[str]
+) -> ImageUploadResponse:
+    """受信済みの一時ファイルを画像として保存し、レコードを作る（一時ファイルは削除する）"""
+    # Generate unique filename
+    file_extension = os.path.splitext(original_name or "")[1]
+    unique_filename = f"{uuid.uuid4()}{file_extension}"
+
+    try:
+        # Decode, optimize and thumbnail in the image worker pool; the event loop keeps serving other requests
+        width, height = await process_image(source_path, unique_filename)
+    finally:
+        await run_in_threadpool(image_uploads.discard, source_path)
+
+    # Generate alt text from filename if not provided
+    if not alt_text and original_name:
+        # Remove extension and replace separators with spaces
+        alt_text = os.path.splitext(original_name)[0].replace('_', ' ').replace('-', ' ')
+
+    # Create image record in database
+    image_data = ImageCreate(
+        filename=unique_filename,
+        original_name=original_name or unique_filename,
+        alt_text=alt_text,
+        caption=caption,
+        file_size=file_size,
+        width=width,
+        height=height,
+        mime_type=content_type
+    )
+
+    image = await run_in_threadpool(_create_image, db, image_data)
+
+    return ImageUploadResponse(
+        id=image.id,
+        filename=unique_filename,
+        url=f"/uploads/images/{unique_filename}",
+        message="Image uploaded successfully"
+    )
+
+
 @router.post("/images/upload", response_model=ImageUploadResponse)
 async def upload_image(
     file: UploadFile = File(...),
@@ -490,120 +1048,156 @@ async def upload_image(
     db: Session = Depends(get_db)
 ):
     # Validate file type
-    allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-    if file.content_type not in allowed_types:
+    if file.content_type not in ALLOWED_IMAGE_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid file type. Only images are allowed."
         )
     
-    # Validate file size (5MB max)
-    content = await file.read()
-    if len(content) > 5 * 1024 * 1024:  # 5MB
+    # Copy to a temporary file in chunks, stopping as soon as the size limit is exceeded
+    try:
+        source_path, file_size = await image_uploads.spool(file, settings.IMAGE_UPLOAD_MAX_BYTES)
+    except UploadTooLarge:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size too large. Maximum 5MB allowed."
+            detail=f"File size too large. Maximum {settings.IMAGE_UPLOAD_MAX_BYTES // (1024 * 1024)}MB allowed."
         )
     
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    
-    # Create uploads directory if it doesn't exist
-    upload_dir = "uploads/images"
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Save file
-    file_path = os.path.join(upload_dir, unique_filename)
-    
-    # Process image with Pillow for optimization and thumbnail creation
-    try:
-        # Open and process the image
-        with PILImage.open(io.BytesIO(content)) as img:
-            # Convert RGBA to RGB if necessary (for JPEG compatibility)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Create a white background
-                rgb_img = PILImage.new('RGB', img.size, (255, 255, 255))
-                # Paste the image on the white background
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = rgb_img
-            
-            # Get original dimensions
-            width, height = img.size
-            
-            # Save optimized original image
-            img.save(file_path, quality=85, optimize=True)
-            
-            # Create thumbnail directory
-            thumb_dir = os.path.join(upload_dir, "thumbnails")
-            os.makedirs(thumb_dir, exist_ok=True)
-            
-            # Generate thumbnails
-            thumbnail_sizes = {
-                'small': (150, 150),
-                'medium': (300, 300),
-                'large': (800, 800)
-            }
-            
-            for size_name, (max_width, max_height) in thumbnail_sizes.items():
-                # Create a copy for thumbnail
-                thumb_img = img.copy()
-                
-                # Calculate thumbnail size maintaining aspect ratio
-                thumb_img.thumbnail((max_width, max_height), PILImage.Resampling.LANCZOS)
-                
-                # Save thumbnail
-                thumb_filename = f"{os.path.splitext(unique_filename)[0]}_{size_name}{file_extension}"
-                thumb_path = os.path.join(thumb_dir, thumb_filename)
-                thumb_img.save(thumb_path, quality=85, optimize=True)
-                
-    except Exception as e:
-        # If image processing fails, save the original file
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
-        # Try to get dimensions from the saved file
-        try:
-            with PILImage.open(file_path) as img:
-                width, height = img.size
-        except Exception:
-            width = height = None
-    
-    # Generate alt text from filename if not provided
-    if not alt_text and file.filename:
-        # Remove extension and replace separators with spaces
-        alt_text = os.path.splitext(file.filename)[0].replace('_', ' ').replace('-', ' ')
-    
-    # Create image record in database
-    image_data = ImageCreate(
-        filename=unique_filename,
-        original_name=file.filename or unique_filename,
-        alt_text=alt_text,
-        caption=caption,
-        file_size=len(content),
-        width=width,
-        height=height,
-        mime_type=file.content_type
+    return await _store_image(db, source_path, file.filename, file.content_type, file_size, alt_text, caption)
+
+
+def _upload_session_response(session: UploadSession) -> ImageUploadSession:
+    return ImageUploadSession(
+        upload_id=session.upload_id,
+        offset=session.offset,
+        size=session.size,
+        chunk_size=settings.IMAGE_UPLOAD_CHUNK_MAX_BYTES
     )
-    
-    image = image_model.Image(**image_data.model_dump())
-    db.add(image)
-    db.commit()
-    db.refresh(image)
-    
-    return ImageUploadResponse(
-        id=image.id,
-        filename=unique_filename,
-        url=f"/uploads/images/{unique_filename}",
-        message="Image uploaded successfully"
+
+
+def _upload_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Upload not found"
     )
 
 
+def _upload_offset_conflict(offset: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Upload offset mismatch. {offset} bytes have been received.",
+        headers={"Upload-Offset": str(offset)}
+    )
+
+
+@router.post("/images/uploads", response_model=ImageUploadSession, status_code=status.HTTP_201_CREATED)
+def create_image_upload(
+    upload_in: ImageUploadInit,
+    current_user: user_model.User = Depends(get_current_user)
+):
+    """分割アップロードを開始する
+
+    続けて PATCH /images/uploads/{upload_id}?offset=... でデータを chunk_size ずつ送り、
+    POST /images/uploads/{upload_id}/complete で画像を登録する。
+    途中で切断された場合は GET /images/uploads/{upload_id} の offset から送り直す。
+    """
+    if upload_in.content_type not in ALLOWED_IMAGE_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file type. Only images are allowed."
+        )
+    if upload_in.size > settings.IMAGE_RESUMABLE_UPLOAD_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size too large. Maximum {settings.IMAGE_RESUMABLE_UPLOAD_MAX_BYTES // (1024 * 1024)}MB allowed."
+        )
+
+    session = image_uploads.create(upload_in.filename, upload_in.content_type, upload_in.size)
+    return _upload_session_response(session)
+
+
+@router.get("/images/uploads/{upload_id}", response_model=ImageUploadSession)
+def get_image_upload(
+    upload_id: str,
+    current_user: user_model.User = Depends(get_current_user)
+):
+    try:
+        session = image_uploads.get(upload_id)
+    except UploadNotFound:
+        raise _upload_not_found()
+    return _upload_session_response(session)
+
+
+@router.patch("/images/uploads/{upload_id}", response_model=ImageUploadSession)
+async def append_image_upload(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    """リクエストボディ（生のバイト列）を受信済みデータの末尾に追記する。offset は受信済みのバイト数と一致させる"""
+    content_length = request.headers.get("content-length")
+    try:
+        session = await image_uploads.append(
+            upload_id,
+            offset,
+            request.stream(),
+            settings.IMAGE_UPLOAD_CHUNK_MAX_BYTES,
+            content_length=int(content_length) if content_length and content_length.isdigit() else None
+        )
+    except UploadNotFound:
+        raise _upload_not_found()
+    except UploadOffsetMismatch as e:
+        raise _upload_offset_conflict(e.offset)
+    except UploadBusy:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another chunk of this upload is being received"
+        )
+    except UploadTooLarge:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Chunk exceeds the chunk size or the declared file size"
+        )
+    return _upload_session_response(session)
+
+
+@router.post("/images/uploads/{upload_id}/complete", response_model=ImageUploadResponse)
+async def complete_image_upload(
+    upload_id: str,
+    upload_in: ImageUploadComplete,
+    current_user: user_model.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    try:
+        session, source_path = await run_in_threadpool(image_uploads.claim, upload_id)
+    except UploadNotFound:
+        raise _upload_not_found()
+    except UploadOffsetMismatch as e:
+        raise _upload_offset_conflict(e.offset)
+
+    return await _store_image(
+        db, source_path, session.filename, session.content_type, session.size, upload_in.alt_text, upload_in.caption
+    )
+
+
+@router.delete("/images/uploads/{upload_id}")
+def delete_image_upload(
+    upload_id: str,
+    current_user: user_model.User = Depends(get_current_user)
+):
+    try:
+        image_uploads.remove(upload_id)
+    except UploadNotFound:
+        raise _upload_not_found()
+    return {"message": "Upload cancelled successfully"}
+
+
 @router.put("/images/{image_id}", response_model=Image)
 def update_image(
     image_id: int,
     image_in: ImageUpdate,
+    background_tasks: BackgroundTasks,
     current_user: user_model.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -622,7 +1216,14 @@ def update_image(
     for field, value in update_data.items():
         setattr(image, field, value)
     
+    # Posts embedding this image as featured image need their snapshot rewritten
+    post_ids = db.execute(
+        select(post_model.Post.id).where(post_model.Post.featured_image_id == image_id)
+    ).scalars().all()
     db.commit()
+    response_cache.invalidate(f"image:{image_id}")
+    if post_ids:
+        schedule_snapshot_export(background_tasks, post_ids)
     db.refresh(image)
     
     return image
@@ -659,6 +1260,7 @@ def delete_image(
     file_path = os.path.join("uploads/images", image.filename)
     if os.path.exists(file_path):
         os.remove(file_path)
+    image_variants.purge(image.filename)
     
     # Delete database record
     db.delete(image)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_current_user
+from app.db.session import get_async_db
 from app.models.user import User
 from app.services.analytics import AnalyticsService
 from app.schemas.analytics import (
@@ -22,7 +23,7 @@ router = APIRouter()
 async def track_page_view(
     page_view_data: PageViewCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ページビューを記録する（認証不要）"""
     try:
@@ -38,12 +39,12 @@ async def track_page_view(
         user_agent = request.headers.get("User-Agent", "")
         
         # アナリティクスサービスを使用してページビューを記録
-        analytics_service = AnalyticsService(db)
-        page_view = analytics_service.create_page_view(
+        # （同期APIのサービスを非同期セッション上で run_sync 経由で呼ぶ）
+        await db.run_sync(lambda session: AnalyticsService(session).create_page_view(
             page_view_data=page_view_data,
             ip_address=client_ip,
             user_agent_str=user_agent
-        )
+        ))
         
         return {"status": "success", "message": "Page view recorded"}
     
@@ -55,86 +56,77 @@ async def track_page_view(
 
 @router.get("/admin/overview", response_model=AnalyticsOverview)
 async def get_analytics_overview(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """アナリティクス概要データを取得する（管理者のみ）"""
-    analytics_service = AnalyticsService(db)
-    return analytics_service.get_analytics_overview()
+    return await db.run_sync(lambda session: AnalyticsService(session).get_analytics_overview())
 
 
 @router.get("/admin/traffic", response_model=List[TrafficData])
 async def get_traffic_data(
     days: int = 30,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """トラフィックデータを取得する（管理者のみ）"""
     if days > 365:  # 最大1年間
         days = 365
     
-    analytics_service = AnalyticsService(db)
-    return analytics_service.get_traffic_data(days=days)
+    return await db.run_sync(lambda session: AnalyticsService(session).get_traffic_data(days=days))
 
 
 @router.get("/admin/popular-posts", response_model=List[PostPerformance])
 async def get_popular_posts(
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """人気記事ランキングを取得する（管理者のみ）"""
     if limit > 50:  # 最大50件
         limit = 50
     
-    analytics_service = AnalyticsService(db)
-    return analytics_service.get_popular_posts(limit=limit)
+    return await db.run_sync(lambda session: AnalyticsService(session).get_popular_posts(limit=limit))
 
 
 @router.get("/admin/device-stats", response_model=List[DeviceStats])
 async def get_device_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """デバイス別統計を取得する（管理者のみ）"""
-    analytics_service = AnalyticsService(db)
-    return analytics_service.get_device_stats()
+    return await db.run_sync(lambda session: AnalyticsService(session).get_device_stats())
 
 
 @router.get("/admin/referrer-stats", response_model=List[ReferrerStats])
 async def get_referrer_stats(
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """参照元別統計を取得する（管理者のみ）"""
     if limit > 20:  # 最大20件
         limit = 20
     
-    analytics_service = AnalyticsService(db)
-    return analytics_service.get_referrer_stats(limit=limit)
+    return await db.run_sync(lambda session: AnalyticsService(session).get_referrer_stats(limit=limit))
 
 
 @router.get("/admin/dashboard", response_model=AnalyticsDashboardData)
 async def get_dashboard_data(
     days: int = 30,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """ダッシュボード用の総合データを取得する（管理者のみ）"""
-    analytics_service = AnalyticsService(db)
-    
-    # 各種データを並行して取得
-    overview = analytics_service.get_analytics_overview()
-    traffic_data = analytics_service.get_traffic_data(days=days)
-    popular_posts = analytics_service.get_popular_posts(limit=10)
-    device_stats = analytics_service.get_device_stats()
-    referrer_stats = analytics_service.get_referrer_stats(limit=10)
+    def collect(session) -> AnalyticsDashboardData:
+        analytics_service = AnalyticsService(session)
+        return AnalyticsDashboardData(
+            overview=analytics_service.get_analytics_overview(),
+            traffic_data=analytics_service.get_traffic_data(days=days),
+            popular_posts=analytics_service.get_popular_posts(limit=10),
+            device_stats=analytics_service.get_device_stats(),
+            referrer_stats=analytics_service.get_referrer_stats(limit=10)
+        )
     
-    return AnalyticsDashboardData(
-        overview=overview,
-        traffic_data=traffic_data,
-        popular_posts=popular_posts,
-        device_stats=device_stats,
-        referrer_stats=referrer_stats
-    )
\ No newline at end of file
+    # 1つのセッションで順に取得する（AsyncSessionは並行利用できない）
+    return await db.run_sync(collect)
\ No newline at end of file
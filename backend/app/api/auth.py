@@ -5,6 +5,7 @@ from app.schemas.user import UserCreate, UserLogin, Token, User, PasswordChange,
 from app.models import user as user_model
 from app.core.security import verify_password, get_password_hash, create_access_token
 from app.api.deps import get_current_user
+from app.services.response_cache import response_cache
 
 router = APIRouter()
 
@@ -129,5 +130,6 @@ def change_username(
     # Update username
     current_user.username = username_data.new_username.strip()
     db.commit()
+    response_cache.invalidate(f"user:{current_user.id}")
     
     return {"message": "Username changed successfully"}
\ No newline at end of file
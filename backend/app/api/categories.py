@@ -2,13 +2,15 @@ from typing import List
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.schemas.category import Category
+from app.schemas.category import CategoryWithCount
 from app.models import category as category_model
+from app.services.response_cache import cached_response
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Category])
+@router.get("/", response_model=List[CategoryWithCount])
+@cached_response(List[CategoryWithCount], tags=lambda result: {"categories"})
 def get_categories(db: Session = Depends(get_db)):
     categories = db.query(category_model.Category).order_by(
         category_model.Category.name
@@ -10,7 +10,8 @@ from app.models.user import User
 security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(
+# 同期セッションを使うので def にしてスレッドプールで実行させる（イベントループを塞がない）
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
@@ -42,7 +43,7 @@ async def get_current_user(
     return user
 
 
-async def get_current_user_optional(
+def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
@@ -50,6 +51,6 @@ async def get_current_user_optional(
         return None
     
     try:
-        return await get_current_user(credentials, db)
+        return get_current_user(credentials, db)
     except HTTPException:
         return None
\ No newline at end of file
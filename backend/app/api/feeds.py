@@ -0,0 +1,67 @@
+import gzip
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.services.feeds import FeedDocument, feed_store
+
+router = APIRouter()
+
+# クローラー・フィードリーダー向け。鮮度は If-Modified-Since で確認させる
+FEED_CACHE_CONTROL = "public, max-age=300"
+
+
+def _not_modified(request: Request, document: FeedDocument) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return document.last_modified <= since
+
+
+def _feed_response(request: Request, db: Session, name: str, media_type: str) -> Response:
+    document = feed_store.get(db, name)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+    headers = {
+        "Last-Modified": format_datetime(document.last_modified, usegmt=True),
+        "Cache-Control": FEED_CACHE_CONTROL,
+        "Vary": "Accept-Encoding"
+    }
+    if _not_modified(request, document):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Serve the stored gzip bytes as-is; decompress only for the rare client without gzip
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(document.gzip_body, media_type=media_type, headers=headers)
+    return Response(gzip.decompress(document.gzip_body), media_type=media_type, headers=headers)
+
+
+@router.get("/sitemap.xml")
+def get_sitemap(request: Request, db: Session = Depends(get_db)):
+    """サイトマップ（公開記事が50,000件を超えたらサイトマップインデックス）"""
+    return _feed_response(request, db, "sitemap.xml", "application/xml")
+
+
+@router.get("/sitemap-{page:int}.xml")
+def get_sitemap_page(page: int, request: Request, db: Session = Depends(get_db)):
+    """サイトマップインデックスから参照される分割サイトマップ"""
+    return _feed_response(request, db, f"sitemap-{page}.xml", "application/xml")
+
+
+@router.get("/feed.xml")
+def get_rss_feed(request: Request, db: Session = Depends(get_db)):
+    return _feed_response(request, db, "feed.xml", "application/rss+xml")
+
+
+@router.get("/atom.xml")
+def get_atom_feed(request: Request, db: Session = Depends(get_db)):
+    return _feed_response(request, db, "atom.xml", "application/atom+xml")
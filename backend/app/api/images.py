@@ -0,0 +1,73 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.session import get_async_db
+from app.models.image import Image
+from app.services.image_variants import VariantSpec, image_variants, image_version, source_format
+
+router = APIRouter()
+
+# URLに画像のバージョン（v）が入るので、ブラウザにはURLごとに無期限でキャッシュさせる。
+# 共有キャッシュは削除した画像をいつまでも返さないよう s-maxage で短く区切る（nginx は proxy_cache_valid で同じ時間）
+VARIANT_CACHE_CONTROL = "public, max-age=31536000, s-maxage=600, immutable"
+
+
+@router.get("/{image_id}")
+async def get_image_variant(
+    image_id: int,
+    v: str = Query(..., description="Image version (stored filename without extension); other values return 404"),
+    w: Optional[int] = Query(None, description="Width in pixels (one of IMAGE_VARIANT_SIZES)"),
+    h: Optional[int] = Query(None, description="Height in pixels (one of IMAGE_VARIANT_SIZES)"),
+    fit: str = Query("contain", pattern="^(contain|cover)$"),
+    fmt: Optional[str] = Query(None, pattern="^(jpeg|png|webp)$", description="Defaults to the format of the original"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """画像のリサイズ版
+
+    fit=contain は w・h に収まるよう縮小、fit=cover は w×h を埋めるよう縮小して中央を切り抜く（w と h が必要）。
+    元画像より大きくはしない。生成結果はディスクにキャッシュする。
+    v が現在の画像のバージョンと一致しなければ（削除・IDの再利用）404 を返す。
+    """
+    sizes = settings.image_variant_sizes
+    if w is None and h is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="w or h is required"
+        )
+    if any(value is not None and value not in sizes for value in (w, h)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported size. Allowed sizes: {', '.join(map(str, sizes))}"
+        )
+    if fit == "cover" and (w is None or h is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="fit=cover requires both w and h"
+        )
+
+    filename = await db.scalar(select(Image.filename).where(Image.id == image_id))
+    if not filename or v != image_version(filename):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+
+    spec = VariantSpec(width=w, height=h, fit=fit, fmt=fmt or source_format(filename))
+    try:
+        body = await image_variants.read(filename, spec)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+    except OSError:
+        # Stored as-is because it could not be decoded at upload time
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Image cannot be resized"
+        )
+
+    return Response(body, media_type=spec.media_type, headers={"Cache-Control": VARIANT_CACHE_CONTROL})
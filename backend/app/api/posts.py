@@ -1,10 +1,15 @@
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple, Union
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from pydantic import SerializeAsAny
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from datetime import datetime, date
-from app.db.session import get_db
-from app.schemas.post import Post, PostList
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func, select, update
+from datetime import datetime, date, time, timedelta
+from app.db.session import get_db, get_async_db
+from app.db.loaders import post_response_options, post_summary_options, post_fields_options
+from app.schemas.post import (
+    Post, PostSummary, PostFields, PostList, PostCursorList, parse_post_fields, post_fields_model
+)
 from app.schemas.like import LikeResponse, LikeCreate
 from typing import Dict
 from app.models import post as post_model
@@ -12,31 +17,148 @@ from app.models.post import PostStatus
 from app.models.category import Category
 from app.models.tag import Tag
 from app.models.like import Like
+from app.models.related_post import RelatedPost
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.services.like_buffer import like_buffer, LikeBufferFull
+from app.services.search import SearchService
+from app.services.related_posts import RelatedPostsService, RELATED_POSTS_PER_POST
+from app.services.response_cache import cached_response, make_etag, response_cache
+from app.services.slug_cache import slug_cache
 
 router = APIRouter()
 
 
-@router.get("/", response_model=PostList)
+def _post_cache_tags(post: Union[Post, PostSummary, PostFields]) -> Set[str]:
+    """記事レスポンスのキャッシュ無効化タグ（記事本体と埋め込まれた関連データ）
+
+    fields= で省かれた関連データのタグは付けない（その変更はレスポンスに影響しない）。
+    """
+    tags = {f"post:{post.id}"}
+    user = getattr(post, "user", None)
+    if user:
+        tags.add(f"user:{user.id}")
+    tags.update(f"category:{category.id}" for category in getattr(post, "categories", None) or [])
+    tags.update(f"tag:{tag.id}" for tag in getattr(post, "tags", None) or [])
+    featured_image = getattr(post, "featured_image", None)
+    if featured_image:
+        tags.add(f"image:{featured_image.id}")
+    return tags
+
+
+def _post_etag(post: Union[post_model.Post, PostFields]) -> Optional[str]:
+    """記事詳細のETag。更新日時といいね数に加え、埋め込まれる関連データの表示内容も含める
+
+    fields= 指定時（PostFields）は None を返し、レスポンスボディのハッシュを使わせる。
+    """
+    if isinstance(post, PostFields):
+        return None
+    return make_etag(
+        post.id,
+        post.updated_at,
+        post.likes_count,
+        post.user.username,
+        [(category.id, category.name, category.slug) for category in post.categories],
+        [(tag.id, tag.name, tag.slug) for tag in post.tags],
+        post.featured_image.updated_at if post.featured_image else None
+    )
+
+
+def _post_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Post not found"
+    )
+
+
+async def _resolve_published_post_id(db: AsyncSession, slug: str) -> int:
+    """slugキャッシュから公開記事のIDを引く。存在しない・非公開なら（DBに問い合わせず）404"""
+    entry = await slug_cache.resolve_async(db, slug)
+    if entry is None or not entry.is_published:
+        raise _post_not_found()
+    return entry.post_id
+
+
+def _published_post_by_id(post_id: int, slug: str):
+    """キャッシュで解決したIDの記事を主キーで取得するクエリ。
+
+    他ワーカーでの変更がキャッシュに未反映でも誤った記事を返さないよう、slugと公開状態も条件に含める。
+    """
+    return select(post_model.Post).where(
+        post_model.Post.id == post_id,
+        post_model.Post.slug == slug,
+        post_model.Post.status == PostStatus.PUBLISHED
+    )
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if fields is None:
+        return None
+    try:
+        return parse_post_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def _list_options(include_content: bool, fields: Optional[Tuple[str, ...]] = None):
+    """一覧の読み込みオプション。fields= 指定時はその列だけ、既定は本文を読み込まない PostSummary 用"""
+    if fields is not None:
+        return post_fields_options(fields)
+    return post_response_options() if include_content else post_summary_options()
+
+
+def _list_items(
+    posts, include_content: bool, fields: Optional[Tuple[str, ...]] = None
+) -> List[Union[Post, PostSummary, PostFields]]:
+    if fields is not None:
+        schema = post_fields_model(fields)
+    else:
+        schema = Post if include_content else PostSummary
+    return [schema.model_validate(post) for post in posts]
+
+
+def _post_list_cache_tags(posts: List[Union[Post, PostSummary]]) -> Set[str]:
+    tags = {"post-list"}
+    for post in posts:
+        tags.update(_post_cache_tags(post))
+    return tags
+
+
+@router.get("/", response_model=Union[PostList, PostCursorList])
+@cached_response(Union[PostList, PostCursorList], tags=lambda result: _post_list_cache_tags(result.posts))
 async def get_posts(
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
+    # カーソル（キーセット）ページネーション。指定時（空文字で先頭ページ）はpageを無視する
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     categories: Optional[List[str]] = Query(None),
     tags: Optional[List[str]] = Query(None),
     # 互換性のため単一選択も受け付け
     category: Optional[str] = None,
     tag: Optional[str] = None,
     search: Optional[str] = None,
-    sort: Optional[str] = Query(None, regex="^(latest|popular|oldest)$"),
+    sort: Optional[str] = Query(None, pattern="^(latest|popular|oldest)$"),
     # 投稿日期間フィルター
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     # 文字数範囲フィルター
     min_length: Optional[int] = Query(None, ge=0),
     max_length: Optional[int] = Query(None, ge=0),
-    db: Session = Depends(get_db)
+    # 一覧は既定で本文を含まない。include=content で本文付きの Post を返す
+    include: Optional[str] = Query(None, pattern="^content$"),
+    # 返す項目をカンマ区切りで指定（例: fields=slug,title）。指定した列だけをSELECTする
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
+    include_content = include == "content"
+    field_names = _parse_fields(fields)
+    
     # Base query - only published posts
-    query = db.query(post_model.Post).filter(
+    query = select(post_model.Post).where(
         post_model.Post.status == PostStatus.PUBLISHED,
         post_model.Post.published_at.isnot(None)
     )
@@ -52,36 +174,48 @@ async def get_posts(
     
     # Apply filters
     if all_categories:
-        query = query.join(post_model.Post.categories).filter(
+        query = query.join(post_model.Post.categories).where(
             Category.slug.in_(all_categories)
         )
     
     if all_tags:
-        query = query.join(post_model.Post.tags).filter(
+        query = query.join(post_model.Post.tags).where(
             Tag.slug.in_(all_tags)
         )
     
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            post_model.Post.title.ilike(search_term) |
-            post_model.Post.content.ilike(search_term)
-        )
+        match_condition = SearchService.match_condition(search)
+        if match_condition is not None:
+            query = query.where(match_condition)
+        else:
+            # インデックスで扱えない検索語は部分一致にフォールバック
+            search_term = f"%{search}%"
+            query = query.where(
+                post_model.Post.title.ilike(search_term) |
+                post_model.Post.content.ilike(search_term)
+            )
     
-    # 投稿日期間フィルター
+    # 投稿日期間フィルター（インデックスが効くよう列を関数で包まず半開区間で比較）
     if date_from:
-        query = query.filter(func.date(post_model.Post.published_at) >= date_from)
+        query = query.where(post_model.Post.published_at >= datetime.combine(date_from, time.min))
     if date_to:
-        query = query.filter(func.date(post_model.Post.published_at) <= date_to)
+        query = query.where(post_model.Post.published_at < datetime.combine(date_to + timedelta(days=1), time.min))
     
-    # 文字数範囲フィルター
+    # 文字数範囲フィルター（保存済みの content_length を使う）
     if min_length is not None:
-        query = query.filter(func.length(post_model.Post.content) >= min_length)
+        query = query.where(post_model.Post.content_length >= min_length)
     if max_length is not None:
-        query = query.filter(func.length(post_model.Post.content) <= max_length)
+        query = query.where(post_model.Post.content_length <= max_length)
+    
+    if cursor is not None:
+        return await _paginate_by_cursor(
+            db, query, cursor, sort, per_page, include_total, include_content, field_names
+        )
     
-    # Get total count
-    total = query.count()
+    # Get total count (subquery selects only the id, not the post bodies)
+    total = await db.scalar(
+        select(func.count()).select_from(query.with_only_columns(post_model.Post.id).subquery())
+    )
     
     # Apply sorting
     if sort == "popular":
@@ -97,18 +231,15 @@ async def get_posts(
     
     # Apply pagination
     offset = (page - 1) * per_page
-    posts = query.offset(offset).limit(per_page).all()
-    
-    # Add likes count for each post
-    for post in posts:
-        post.likes_count = db.query(func.count(Like.id)).filter(Like.post_id == post.id).scalar()
-        post.is_liked = False  # Frontend will handle this
+    posts = (await db.scalars(
+        query.options(*_list_options(include_content, field_names)).offset(offset).limit(per_page)
+    )).all()
     
     # Calculate total pages
     pages = (total + per_page - 1) // per_page
     
     return PostList(
-        posts=posts,
+        posts=_list_items(posts, include_content, field_names),
         total=total,
         page=page,
         per_page=per_page,
@@ -116,14 +247,104 @@ async def get_posts(
     )
 
 
-@router.get("/search", response_model=List[Post])
+async def _paginate_by_cursor(
+    db: AsyncSession,
+    query,
+    cursor: str,
+    sort: Optional[str],
+    per_page: int,
+    include_total: bool,
+    include_content: bool,
+    field_names: Optional[Tuple[str, ...]] = None
+) -> PostCursorList:
+    """(published_at, id) のキーセットでページングする。COUNTは include_total 指定時のみ実行"""
+    if sort == "popular":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination supports only latest and oldest sorts"
+        )
+    order = "oldest" if sort == "oldest" else "latest"
+    
+    total = None
+    if include_total:
+        total = await db.scalar(query.with_only_columns(func.count(post_model.Post.id)).order_by(None))
+    
+    published_at = post_model.Post.published_at
+    post_id = post_model.Post.id
+    
+    if cursor:
+        try:
+            values = decode_cursor(cursor)
+            if values.get("o") != order:
+                raise ValueError("Cursor was issued for a different sort")
+            last_published_at = datetime.fromisoformat(values["p"])
+            last_id = int(values["i"])
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        
+        if order == "oldest":
+            query = query.where(or_(
+                published_at > last_published_at,
+                and_(published_at == last_published_at, post_id > last_id)
+            ))
+        else:
+            query = query.where(or_(
+                published_at < last_published_at,
+                and_(published_at == last_published_at, post_id < last_id)
+            ))
+    
+    if order == "oldest":
+        query = query.order_by(published_at.asc(), post_id.asc())
+    else:
+        query = query.order_by(published_at.desc(), post_id.desc())
+    
+    # Fetch one extra row to know whether a next page exists
+    posts = (await db.scalars(
+        query.options(*_list_options(include_content, field_names)).limit(per_page + 1)
+    )).all()
+    
+    next_cursor = None
+    if len(posts) > per_page:
+        posts = posts[:per_page]
+        last = posts[-1]
+        next_cursor = encode_cursor({"o": order, "p": last.published_at.isoformat(), "i": last.id})
+    
+    return PostCursorList(
+        posts=_list_items(posts, include_content, field_names),
+        per_page=per_page,
+        next_cursor=next_cursor,
+        total=total
+    )
+
+
+@router.get("/search", response_model=List[Union[Post, PostSummary, SerializeAsAny[PostFields]]])
+@cached_response(List[Union[Post, PostSummary, SerializeAsAny[PostFields]]], tags=_post_list_cache_tags)
 def search_posts(
     q: str = Query(..., min_length=2),
     limit: int = Query(10, ge=1, le=50),
+    include: Optional[str] = Query(None, pattern="^content$"),
+    fields: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
+    include_content = include == "content"
+    field_names = _parse_fields(fields)
+    ranked_ids = SearchService(db).search(q, limit=limit)
+    if ranked_ids is not None:
+        posts = db.query(post_model.Post).options(*_list_options(include_content, field_names)).filter(
+            post_model.Post.id.in_(ranked_ids),
+            post_model.Post.status == PostStatus.PUBLISHED,
+            post_model.Post.published_at.isnot(None)
+        ).all()
+        # BM25スコア順に並べ直す
+        rank = {post_id: i for i, post_id in enumerate(ranked_ids)}
+        return _list_items(sorted(posts, key=lambda post: rank[post.id]), include_content, field_names)
+    
+    # インデックスで扱えない検索語は部分一致にフォールバック
     search_term = f"%{q}%"
-    posts = db.query(post_model.Post).filter(
+    posts = db.query(post_model.Post).options(*_list_options(include_content, field_names)).filter(
         and_(
             post_model.Post.status == PostStatus.PUBLISHED,
             post_model.Post.published_at.isnot(None),
@@ -132,95 +353,118 @@ def search_posts(
         )
     ).order_by(post_model.Post.published_at.desc()).limit(limit).all()
     
-    return posts
+    return _list_items(posts, include_content, field_names)
 
 
-@router.get("/{slug}/related", response_model=Dict[str, List[Post]])
+@router.get("/likes", response_model=Dict[int, int])
+async def get_likes_counts(
+    ids: str = Query(..., pattern=r"^\d+(,\d+)*$", description="Comma-separated post ids (up to 100)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """公開記事のいいね数をまとめて返す（記事ID → いいね数）
+
+    静的スナップショットの一覧にはいいね数が入らないので、一覧のカードはこれで1回にまとめて取得する。
+    公開されていない・存在しないIDは結果に含めない。
+    """
+    post_ids = set(map(int, ids.split(",")))
+    if len(post_ids) > 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Too many ids (max 100)"
+        )
+    rows = await db.execute(
+        select(post_model.Post.id, post_model.Post.likes_count).where(
+            post_model.Post.id.in_(post_ids),
+            post_model.Post.status == PostStatus.PUBLISHED,
+            post_model.Post.published_at.isnot(None)
+        )
+    )
+    return {post_id: likes_count + like_buffer.pending_count(post_id) for post_id, likes_count in rows}
+
+
+@router.get("/{slug}/related", response_model=Dict[str, List[Union[Post, PostSummary, SerializeAsAny[PostFields]]]])
+@cached_response(
+    Dict[str, List[Union[Post, PostSummary, SerializeAsAny[PostFields]]]],
+    tags=lambda result: _post_list_cache_tags([post for posts in result.values() for post in posts])
+)
 def get_related_posts(
     slug: str,
     limit: int = Query(5, ge=1, le=20),
+    include: Optional[str] = Query(None, pattern="^content$"),
+    fields: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    # まず対象の記事を取得
-    post = db.query(post_model.Post).filter(
-        post_model.Post.slug == slug,
-        post_model.Post.status == PostStatus.PUBLISHED
-    ).first()
+    include_content = include == "content"
+    field_names = _parse_fields(fields)
     
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
+    # まず対象の記事IDを取得（slugキャッシュ経由）
+    entry = slug_cache.resolve(db, slug)
+    if entry is None or not entry.is_published:
+        raise _post_not_found()
+    post_id = entry.post_id
     
-    # カテゴリが同じ記事を取得
-    related_by_category = []
-    if post.categories:
-        category_ids = [cat.id for cat in post.categories]
-        related_by_category = db.query(post_model.Post).join(
-            post_model.Post.categories
-        ).filter(
-            and_(
-                Category.id.in_(category_ids),
-                post_model.Post.id != post.id,
-                post_model.Post.status == PostStatus.PUBLISHED,
-                post_model.Post.published_at.isnot(None)
-            )
-        ).order_by(post_model.Post.published_at.desc()).limit(limit).all()
-    
-    # タグが同じ記事を取得
-    related_by_tags = []
-    if post.tags:
-        tag_ids = [tag.id for tag in post.tags]
-        related_by_tags = db.query(post_model.Post).join(
-            post_model.Post.tags
-        ).filter(
-            and_(
-                Tag.id.in_(tag_ids),
-                post_model.Post.id != post.id,
-                post_model.Post.status == PostStatus.PUBLISHED,
-                post_model.Post.published_at.isnot(None)
+    # 事前計算済みの関連記事をスコア順に1回で取得
+    related = db.query(
+        post_model.Post, RelatedPost.shared_categories, RelatedPost.shared_tags
+    ).join(
+        RelatedPost, RelatedPost.related_post_id == post_model.Post.id
+    ).options(*_list_options(include_content, field_names)).filter(
+        RelatedPost.post_id == post_id,
+        post_model.Post.status == PostStatus.PUBLISHED
+    ).order_by(RelatedPost.score.desc()).limit(RELATED_POSTS_PER_POST).all()
+    
+    if not related:
+        # まだ計算されていない記事（rebuild前など）はその場で計算する（保存はしない）
+        rows = RelatedPostsService(db).compute([post_id])
+        posts_by_id = {
+            post.id: post for post in db.query(post_model.Post).options(
+                *_list_options(include_content, field_names)
+            ).filter(
+                post_model.Post.id.in_([row["related_post_id"] for row in rows])
             )
-        ).order_by(post_model.Post.published_at.desc()).limit(limit).all()
+        }
+        related = [
+            (posts_by_id[row["related_post_id"]], row["shared_categories"], row["shared_tags"])
+            for row in rows if row["related_post_id"] in posts_by_id
+        ]
     
-    # 人気記事を取得（仮実装：最新記事）
-    popular_posts = db.query(post_model.Post).filter(
-        and_(
-            post_model.Post.id != post.id,
-            post_model.Post.status == PostStatus.PUBLISHED,
-            post_model.Post.published_at.isnot(None)
-        )
-    ).order_by(post_model.Post.published_at.desc()).limit(limit).all()
+    # 複数の一覧に現れる記事も1回だけ変換する
+    items = dict(zip(
+        (post.id for post, _, _ in related),
+        _list_items([post for post, _, _ in related], include_content, field_names)
+    ))
+    related = [(items[post.id], shared_categories, shared_tags) for post, shared_categories, shared_tags in related]
     
-    # Pydanticスキーマに変換
     return {
-        "related_by_category": [Post.from_orm(post) for post in related_by_category[:limit]],
-        "related_by_tags": [Post.from_orm(post) for post in related_by_tags[:limit]],
-        "popular": [Post.from_orm(post) for post in popular_posts[:limit]]
+        "related_by_category": [post for post, shared_categories, _ in related if shared_categories][:limit],
+        "related_by_tags": [post for post, _, shared_tags in related if shared_tags][:limit],
+        # 共有タクソノミー・新しさ・人気度を合わせたスコア順
+        "popular": [post for post, _, _ in related][:limit]
     }
 
 
-@router.get("/{slug}", response_model=Post)
+@router.get("/{slug}", response_model=Union[Post, SerializeAsAny[PostFields]])
+@cached_response(Union[Post, SerializeAsAny[PostFields]], tags=_post_cache_tags, etag=_post_etag)
 async def get_post(
     slug: str,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    post = db.query(post_model.Post).filter(
-        post_model.Post.slug == slug,
-        post_model.Post.status == PostStatus.PUBLISHED,
-        post_model.Post.published_at.isnot(None)
-    ).first()
-    
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
+    field_names = _parse_fields(fields)
+    options = post_response_options() if field_names is None else post_fields_options(field_names)
+    post_id = await _resolve_published_post_id(db, slug)
+    post = (await db.scalars(
+        _published_post_by_id(post_id, slug).options(*options).where(
+            post_model.Post.published_at.isnot(None)
         )
+    )).first()
     
-    # Add likes count
-    post.likes_count = db.query(func.count(Like.id)).filter(Like.post_id == post.id).scalar()
-    post.is_liked = False  # Frontend will handle this
+    if not post:
+        slug_cache.discard(slug)
+        raise _post_not_found()
     
+    if field_names is not None:
+        return post_fields_model(field_names).model_validate(post)
     return post
 
 
@@ -229,23 +473,32 @@ async def add_like(
     slug: str,
     like_data: LikeCreate,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Get the post
-    post = db.query(post_model.Post).filter(
-        post_model.Post.slug == slug,
-        post_model.Post.status == PostStatus.PUBLISHED
-    ).first()
+    post_id = await _resolve_published_post_id(db, slug)
+    post = (await db.scalars(_published_post_by_id(post_id, slug))).first()
     
     if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
+        slug_cache.discard(slug)
+        raise _post_not_found()
     
     # Get client IP address
     client_ip = request.client.host if request.client else None
     
+    # Buffered mode: acknowledge immediately, the background flusher persists it
+    if settings.LIKE_BUFFER_ENABLED and like_buffer.is_running:
+        try:
+            await like_buffer.enqueue(post.id, like_data.session_id, client_ip)
+        except LikeBufferFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many likes right now. Please try again later."
+            )
+        
+        # Approximate count: persisted counter plus likes not yet flushed
+        return LikeResponse(likes_count=post.likes_count + like_buffer.pending_count(post.id))
+    
     # Always create a new like (no duplicate checking)
     new_like = Like(
         post_id=post.id,
@@ -253,32 +506,34 @@ async def add_like(
         ip_address=client_ip
     )
     db.add(new_like)
-    db.commit()
     
-    # Get updated likes count
-    likes_count = db.query(func.count(Like.id)).filter(Like.post_id == post.id).scalar()
+    # Increment the denormalized counter in the same transaction
+    await db.execute(
+        update(post_model.Post)
+        .where(post_model.Post.id == post.id)
+        .values(likes_count=post_model.Post.likes_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    # Cached responses (and their ETags) embed likes_count
+    response_cache.invalidate(f"post:{post.id}")
     
-    return LikeResponse(likes_count=likes_count)
+    # Get updated likes count (reloaded from the row after commit)
+    await db.refresh(post, attribute_names=["likes_count"])
+    return LikeResponse(likes_count=post.likes_count)
 
 
 @router.get("/{slug}/likes", response_model=LikeResponse)
 async def get_post_likes(
     slug: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Get the post
-    post = db.query(post_model.Post).filter(
-        post_model.Post.slug == slug,
-        post_model.Post.status == PostStatus.PUBLISHED
-    ).first()
+    post_id = await _resolve_published_post_id(db, slug)
+    post = (await db.scalars(_published_post_by_id(post_id, slug))).first()
     
     if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
-    
-    # Get likes count
-    likes_count = db.query(func.count(Like.id)).filter(Like.post_id == post.id).scalar()
+        slug_cache.discard(slug)
+        raise _post_not_found()
     
-    return LikeResponse(likes_count=likes_count)
\ No newline at end of file
+    return LikeResponse(likes_count=post.likes_count + like_buffer.pending_count(post.id))
\ No newline at end of file
@@ -2,13 +2,15 @@ from typing import List
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.schemas.tag import Tag
+from app.schemas.tag import TagWithCount
 from app.models import tag as tag_model
+from app.services.response_cache import cached_response
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Tag])
+@router.get("/", response_model=List[TagWithCount])
+@cached_response(List[TagWithCount], tags=lambda result: {"tags"})
 def get_tags(db: Session = Depends(get_db)):
     tags = db.query(tag_model.Tag).order_by(
         tag_model.Tag.name
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -22,6 +22,61 @@ class Settings(BaseSettings):
     # Security
     BCRYPT_ROUNDS: int = 12
     
+    # Likes (write-behind buffer, opt-in)
+    LIKE_BUFFER_ENABLED: bool = False
+    LIKE_BUFFER_MAX_SIZE: int = 10000
+    LIKE_BUFFER_BATCH_SIZE: int = 500
+    LIKE_BUFFER_FLUSH_INTERVAL: float = 1.0  # seconds
+    LIKE_BUFFER_ENQUEUE_TIMEOUT: float = 0.5  # seconds to wait for space when full
+    
+    # Response cache for public read endpoints
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_TTL: float = 60.0  # seconds
+    
+    # Markdown pre-rendering on post save (worker processes; 0 renders inline)
+    MARKDOWN_RENDER_WORKERS: int = 2
+    MARKDOWN_RENDER_TIMEOUT: float = 30.0  # seconds
+    
+    # Image decoding and thumbnails on upload (worker processes; None = one per CPU core, 0 runs in a thread)
+    IMAGE_PROCESS_WORKERS: Optional[int] = None
+    # Uploads waiting for a worker, per worker (further uploads wait without holding the event loop)
+    IMAGE_PROCESS_QUEUE_PER_WORKER: int = 2
+
+    # Image uploads are streamed to temporary files (kept outside the publicly served uploads/ directory)
+    IMAGE_UPLOAD_MAX_BYTES: int = 5 * 1024 * 1024  # single multipart request
+    IMAGE_RESUMABLE_UPLOAD_MAX_BYTES: int = 50 * 1024 * 1024  # init/append/complete protocol
+    IMAGE_UPLOAD_CHUNK_MAX_BYTES: int = 4 * 1024 * 1024  # per append request; keep below nginx client_max_body_size
+    IMAGE_UPLOAD_TMP_DIR: str = "tmp/uploads"
+    IMAGE_UPLOAD_SESSION_TTL: float = 24 * 3600.0  # seconds; unfinished uploads are removed after this
+
+    # Resized variants served by /api/images/{id} (generated on first request, least recently used evicted)
+    IMAGE_VARIANT_SIZES: str = "150,300,640,800,1200,1600"  # allowed values for w and h
+    IMAGE_VARIANT_CACHE_DIR: str = "cache/images"
+    IMAGE_VARIANT_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+    IMAGE_VARIANT_QUALITY: int = 82
+
+    # Post revision history: every Nth revision keeps the full content, the rest are reverse deltas
+    REVISION_SNAPSHOT_INTERVAL: int = 20
+    
+    # Slug -> post id cache (shared by post endpoints and page view tracking)
+    SLUG_CACHE_MAX_ENTRIES: int = 50000
+    SLUG_CACHE_TTL: float = 300.0  # seconds
+    SLUG_CACHE_NEGATIVE_MAX_ENTRIES: int = 10000
+    SLUG_CACHE_NEGATIVE_TTL: float = 30.0  # seconds
+    
+    # Public site (absolute URLs in sitemap and feeds)
+    SITE_URL: str = "http://localhost"
+    SITE_DESCRIPTION: str = ""
+    
+    # Sitemap / RSS / Atom (generated on change, kept gzip-compressed in memory)
+    FEED_MAX_ITEMS: int = 50
+    FEED_CACHE_TTL: float = 300.0  # seconds; bounds staleness across workers
+    
+    # Static snapshot of the anonymous read API for nginx (export_snapshot.py; opt-in after admin writes)
+    SNAPSHOT_ENABLED: bool = False
+    SNAPSHOT_DIR: str = "snapshot"
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
@@ -34,5 +89,9 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
         return self.CORS_ORIGINS
 
+    @property
+    def image_variant_sizes(self) -> List[int]:
+        return sorted(int(size) for size in self.IMAGE_VARIANT_SIZES.split(",") if size.strip())
+
 
 settings = Settings()
\ No newline at end of file
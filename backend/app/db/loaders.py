@@ -0,0 +1,55 @@
+from typing import Iterable
+from sqlalchemy.orm import defer, joinedload, load_only, selectinload
+from app.models.post import Post
+
+
+def post_response_options():
+    """Post レスポンス（user・categories・tags・featured_image）のシリアライズに必要なリレーションを先読みするオプション
+
+    多対一は JOIN、多対多は SELECT ... IN でまとめて読み込むので、
+    件数に関係なくクエリ数は一定になる。
+    """
+    return (
+        joinedload(Post.user),
+        joinedload(Post.featured_image),
+        selectinload(Post.categories),
+        selectinload(Post.tags),
+    )
+
+
+def post_summary_options():
+    """一覧用（PostSummary）の読み込みオプション。本文などの大きな列はSELECTしない
+
+    raiseload=True なので、遅延列に誤ってアクセスすると（暗黙のクエリを発行せず）例外になる。
+    """
+    return (
+        defer(Post.content, raiseload=True),
+        defer(Post.content_html, raiseload=True),
+        defer(Post.toc, raiseload=True),
+        *post_response_options(),
+    )
+
+
+# fields= で指定できるリレーションと、その読み込み方法
+POST_RELATIONSHIP_LOADERS = {
+    "user": lambda: joinedload(Post.user),
+    "featured_image": lambda: joinedload(Post.featured_image),
+    "categories": lambda: selectinload(Post.categories),
+    "tags": lambda: selectinload(Post.tags),
+}
+
+
+def post_fields_options(fields: Iterable[str]):
+    """fields= 用の読み込みオプション。指定された列とリレーションだけを読み込む
+
+    ページングのキーに使う id と published_at は常に読み込む。
+    """
+    fields = set(fields)
+    columns = {Post.id, Post.published_at}
+    options = []
+    for name in fields:
+        if name in POST_RELATIONSHIP_LOADERS:
+            options.append(POST_RELATIONSHIP_LOADERS[name]())
+        elif name in Post.__table__.columns:
+            columns.add(getattr(Post, name))
+    return (load_only(*columns, raiseload=True), *options)
@@ -1,4 +1,7 @@
+from typing import AsyncIterator
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 import pymysql
@@ -6,23 +9,57 @@ import pymysql
 # Install PyMySQL as MySQLdb
 pymysql.install_as_MySQLdb()
 
+
+def engine_options(url: str) -> dict:
+    """エンジンの共通設定（SQLite はテスト用。接続プールの大きさは指定できない）"""
+    options = {"pool_pre_ping": True, "echo": settings.DEBUG}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(pool_size=10, max_overflow=20)
+    return options
+
+
 # Create engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    echo=settings.DEBUG
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def async_database_url(url: str) -> str:
+    """同期ドライバ（PyMySQL）のDATABASE_URLを非同期ドライバ（aiomysql）のURLに変換する"""
+    url = make_url(url)
+    if url.get_backend_name() == "mysql":
+        url = url.set(drivername="mysql+aiomysql")
+    elif url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+# Create async engine (same database, async driver)
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **engine_options(settings.DATABASE_URL)
+)
+
+# Create async session factory
+# コミット後の属性アクセスで暗黙のI/Oが起きないよう expire_on_commit=False にする
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
 def get_db() -> Session:
     """Dependency to get database session"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency to get async database session (for async def handlers)"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,14 +1,42 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api import auth, posts, categories, tags, admin, analytics
+from app.api import auth, posts, categories, tags, admin, analytics, feeds, images
+from app.services.like_buffer import like_buffer
+from app.services.image_processing import shutdown_image_pool
+from app.services.markdown_render import shutdown_render_pool
+from app.services.slug_cache import slug_cache
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.LIKE_BUFFER_ENABLED:
+        like_buffer.start()
+    # Warm the slug cache with the newest posts; it fills on demand if the database is not reachable yet
+    try:
+        async with AsyncSessionLocal() as db:
+            await slug_cache.load(db)
+    except Exception:
+        logger.warning("Could not warm the slug cache, starting with an empty cache", exc_info=True)
+    yield
+    # Flush buffered likes before the worker exits
+    await like_buffer.stop()
+    shutdown_render_pool()
+    shutdown_image_pool()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -27,6 +55,8 @@ app.include_router(categories.router, prefix="/api/categories", tags=["categorie
 app.include_router(tags.router, prefix="/api/tags", tags=["tags"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(feeds.router, prefix="/api", tags=["feeds"])
+app.include_router(images.router, prefix="/api/images", tags=["images"])
 
 
 @app.get("/api/health")
@@ -1,9 +1,12 @@
 from app.models.user import User
-from app.models.post import Post
+from app.models.post import Post, PostStatusCount
 from app.models.category import Category
 from app.models.tag import Tag
 from app.models.image import Image
 from app.models.analytics import PageView, SiteStatistic, PopularPost
 from app.models.like import Like
+from app.models.search import SearchPosting, SearchDocument
+from app.models.related_post import RelatedPost
+from app.models.post_revision import PostRevision
 
-__all__ = ["User", "Post", "Category", "Tag", "Image", "PageView", "SiteStatistic", "PopularPost", "Like"]
\ No newline at end of file
+__all__ = ["User", "Post", "PostStatusCount", "Category", "Tag", "Image", "PageView", "SiteStatistic", "PopularPost", "Like", "SearchPosting", "SearchDocument", "RelatedPost", "PostRevision"]
\ No newline at end of file
@@ -12,6 +12,9 @@ class Category(Base):
     name = Column(String(50), unique=True, nullable=False)
     slug = Column(String(50), unique=True, nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # 関連する記事数・公開記事数（記事の作成・状態変更・関連付け・削除と同一トランザクションで更新）
+    post_count = Column(Integer, nullable=False, default=0, server_default="0")
+    published_post_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Relationships
     posts = relationship("Post", secondary=post_categories, back_populates="categories")
\ No newline at end of file
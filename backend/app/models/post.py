@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Table
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Table, Index, JSON
+from sqlalchemy.dialects import mysql
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -15,17 +16,26 @@ post_categories = Table(
     'post_categories',
     Base.metadata,
     Column('post_id', Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True),
-    Column('category_id', Integer, ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True)
+    Column('category_id', Integer, ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True),
+    # Category filter on the admin post index
+    Index('ix_post_categories_category_id_post_id', 'category_id', 'post_id')
 )
 
 post_tags = Table(
     'post_tags',
     Base.metadata,
     Column('post_id', Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True),
-    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True)
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    # Tag filter on the admin post index
+    Index('ix_post_tags_tag_id_post_id', 'tag_id', 'post_id')
 )
 
 
+def _content_length_default(context):
+    """INSERT時に content_length が未指定なら本文の文字数で埋める"""
+    return len(context.get_current_parameters().get("content") or "")
+
+
 class Post(Base):
     __tablename__ = "posts"
     
@@ -40,10 +50,40 @@ class Post(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     published_at = Column(DateTime(timezone=True), nullable=True, index=True)
+    # いいね数の非正規化カウンタ（likesへのINSERTと同一トランザクションで更新）
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # 本文の文字数（文字数範囲フィルター用。作成・更新時に更新）
+    content_length = Column(Integer, nullable=False, default=_content_length_default, server_default="0")
+    # サーバー側でレンダリングした本文（content_hash が本文と一致する間は再レンダリングしない）
+    content_html = Column(Text().with_variant(mysql.MEDIUMTEXT(), "mysql"), nullable=True)
+    toc = Column(JSON, nullable=True)
+    word_count = Column(Integer, nullable=False, default=0, server_default="0")
+    reading_time = Column(Integer, nullable=False, default=0, server_default="0")  # minutes
+    content_hash = Column(String(64), nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="posts")
     categories = relationship("Category", secondary=post_categories, back_populates="posts")
     tags = relationship("Tag", secondary=post_tags, back_populates="posts")
     featured_image = relationship("Image", foreign_keys=[featured_image_id])
-    likes = relationship("Like", back_populates="post", cascade="all, delete-orphan")
\ No newline at end of file
+    likes = relationship("Like", back_populates="post", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Covers the public feed: status filter, (published_at, id) keyset order, COUNT
+        # and the content-length range filter evaluated inside the index
+        Index("ix_posts_status_published_at_content_length", "status", "published_at", "id", "content_length"),
+        # Admin post index: (created_at, id) keyset order, optionally narrowed by status or author
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_posts_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Title prefix search on the admin post index
+        Index("ix_posts_title", "title"),
+    )
+
+
+class PostStatusCount(Base):
+    """状態別の記事数（管理画面の一覧の件数表示用。記事の作成・状態変更・削除と同一トランザクションで更新）"""
+    __tablename__ = "post_status_counts"
+    
+    status = Column(Enum(PostStatus), primary_key=True)
+    post_count = Column(Integer, nullable=False, default=0, server_default="0")
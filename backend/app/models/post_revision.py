@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects import mysql
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class PostRevision(Base):
+    """記事本文の版（update_post で保存）
+
+    最新版と一定間隔の版は本文全体（is_snapshot）、それ以外は1つ新しい版から
+    その版を復元する逆差分を、いずれも zlib 圧縮して data に持つ。
+    """
+    __tablename__ = "post_revisions"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), nullable=False)
+    revision = Column(Integer, nullable=False)  # 1 から始まる記事内の連番
+    title = Column(String(200), nullable=False)
+    is_snapshot = Column(Boolean, nullable=False, default=False)
+    data = Column(LargeBinary().with_variant(mysql.MEDIUMBLOB(), "mysql"), nullable=False)
+    content_length = Column(Integer, nullable=False, default=0)
+    content_hash = Column(String(64), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint("post_id", "revision", name="uq_post_revisions_post_id_revision"),
+    )
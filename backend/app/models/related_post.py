@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class RelatedPost(Base):
+    """記事ごとの関連記事（カテゴリ・タグの共有数、新しさ、人気度による重み付きスコア）"""
+    __tablename__ = "related_posts"
+    
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    related_post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True, index=True)
+    shared_categories = Column(Integer, nullable=False, default=0)
+    shared_tags = Column(Integer, nullable=False, default=0)
+    score = Column(Float, nullable=False, default=0)
+    
+    # Relationships
+    related_post = relationship("Post", foreign_keys=[related_post_id])
+    
+    __table_args__ = (
+        # Serves "related posts of X ordered by score" from the index
+        Index("ix_related_posts_post_id_score", "post_id", "score"),
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.dialects import mysql
+from app.db.base import Base
+
+# Terms are compared byte-wise: the default utf8mb4_unicode_ci collation would
+# treat e.g. "ハハ" and "パパ" as the same term.
+TermType = String(64).with_variant(mysql.VARCHAR(64, collation="utf8mb4_bin"), "mysql")
+
+
+class SearchPosting(Base):
+    """転置インデックスのポスティング（語 → 記事）"""
+    __tablename__ = "search_postings"
+    
+    term = Column(TermType, primary_key=True)
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True, index=True)
+    title_tf = Column(Integer, nullable=False, default=0)  # タイトル中の出現回数
+    content_tf = Column(Integer, nullable=False, default=0)  # 本文中の出現回数
+
+
+class SearchDocument(Base):
+    """BM25の文書長正規化に使う、インデックス済み記事ごとのトークン数"""
+    __tablename__ = "search_documents"
+    
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+    title_length = Column(Integer, nullable=False, default=0)
+    content_length = Column(Integer, nullable=False, default=0)
@@ -30,4 +30,13 @@ class Category(CategoryInDB):
 
 
 class CategoryResponse(CategoryInDB):
-    pass
\ No newline at end of file
+    pass
+
+
+# 一覧用。公開APIは公開記事数だけを返す（下書きの数は管理画面のみ）
+class CategoryWithCount(Category):
+    published_post_count: int
+
+
+class CategoryWithCounts(CategoryWithCount):
+    post_count: int
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 
@@ -44,4 +44,22 @@ class ImageUploadResponse(BaseModel):
     id: int
     filename: str
     url: str
-    message: str
\ No newline at end of file
+    message: str
+
+
+class ImageUploadInit(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str
+    size: int = Field(..., gt=0, description="Total size of the file in bytes")
+
+
+class ImageUploadSession(BaseModel):
+    upload_id: str
+    offset: int = Field(..., description="Bytes received so far; the next chunk starts here")
+    size: int
+    chunk_size: int = Field(..., description="Maximum bytes per append request")
+
+
+class ImageUploadComplete(BaseModel):
+    alt_text: Optional[str] = None
+    caption: Optional[str] = None
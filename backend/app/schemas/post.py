@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field
+import enum
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, create_model
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple, Union
 from app.models.post import PostStatus
 from app.schemas.category import Category
 from app.schemas.tag import Tag
@@ -32,6 +34,87 @@ class PostUpdate(BaseModel):
     tag_ids: Optional[List[int]] = None
 
 
+class PostImportItem(PostBase):
+    """NDJSONインポートの1行。エクスポートの出力をそのまま受け付ける（未知の項目は無視）"""
+    user_id: Optional[int] = None
+    published_at: Optional[datetime] = None
+    category_ids: List[int] = []
+    tag_ids: List[int] = []
+
+
+class PostImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class PostImportResult(BaseModel):
+    lines: int
+    created: int
+    updated: int
+    failed: int
+    errors: List[PostImportError] = []
+    seconds: float
+    posts_per_second: float
+
+
+class PostBulkAction(str, enum.Enum):
+    PUBLISH = "publish"
+    UNPUBLISH = "unpublish"
+    DELETE = "delete"
+    ADD_CATEGORIES = "add_categories"
+    REMOVE_CATEGORIES = "remove_categories"
+    SET_CATEGORIES = "set_categories"
+    ADD_TAGS = "add_tags"
+    REMOVE_TAGS = "remove_tags"
+    SET_TAGS = "set_tags"
+
+
+class PostBulkOperation(BaseModel):
+    action: PostBulkAction
+    post_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    # *_categories / *_tags の対象
+    category_ids: List[int] = []
+    tag_ids: List[int] = []
+
+
+class PostBulkRequest(BaseModel):
+    # 先頭から順に、全体を1トランザクションで適用する
+    operations: List[PostBulkOperation] = Field(..., min_length=1, max_length=20)
+
+
+class PostBulkItemResult(BaseModel):
+    operation: int  # operations 内の位置
+    post_id: int
+    status: str  # updated / unchanged / deleted / not_found
+
+
+class PostBulkResult(BaseModel):
+    results: List[PostBulkItemResult]
+    updated: int
+    unchanged: int
+    deleted: int
+    not_found: int
+
+
+class PostContentEdit(BaseModel):
+    # 位置は文字（Unicodeコードポイント）単位で、直前の編集を適用した後の本文に対する位置
+    position: int = Field(..., ge=0)
+    delete: int = Field(0, ge=0)
+    insert: str = ""
+
+
+class PostContentPatch(BaseModel):
+    # 編集の基準にした本文のハッシュ（AdminPost.content_hash か、前回の差分保存の結果）
+    base_hash: str = Field(..., min_length=64, max_length=64)
+    edits: List[PostContentEdit] = Field(..., max_length=100)
+
+
+class PostContentPatchResult(BaseModel):
+    content_hash: str
+    content_length: int
+    changed: bool  # False なら何も書き込んでいない
+
+
 class PostInDB(PostBase):
     id: int
     user_id: int
@@ -43,26 +126,114 @@ class PostInDB(PostBase):
         from_attributes = True
 
 
+class TocEntry(BaseModel):
+    level: int
+    id: str
+    title: str
+
+
 class Post(PostInDB):
     user: User
     categories: List[Category] = []
     tags: List[Tag] = []
     featured_image: Optional["Image"] = None
     likes_count: int = 0
+    # サーバー側でレンダリング済みの本文（未レンダリングなら None）
+    content_html: Optional[str] = None
+    toc: Optional[List[TocEntry]] = None
+    word_count: int = 0
+    reading_time: int = 0
     is_liked: bool = False
 
 
 class PostResponse(Post):
     pass
 
+
+class AdminPost(Post):
+    # 本文のハッシュ（差分保存 PATCH /admin/posts/{id}/content の base_hash）
+    content_hash: Optional[str] = None
+
+
+class PostSummary(BaseModel):
+    """一覧用の記事（本文・レンダリング済みHTML・目次を含まない）"""
+    id: int
+    title: str
+    slug: str
+    excerpt: Optional[str] = None
+    status: PostStatus
+    featured_image_id: Optional[int] = None
+    user_id: int
+    created_at: datetime
+    updated_at: datetime
+    published_at: Optional[datetime] = None
+    user: User
+    categories: List[Category] = []
+    tags: List[Tag] = []
+    featured_image: Optional["Image"] = None
+    likes_count: int = 0
+    word_count: int = 0
+    reading_time: int = 0
+    is_liked: bool = False
+    
+    class Config:
+        from_attributes = True
+
+
 # Import here to avoid circular import
 from app.schemas.image import Image
 Post.model_rebuild()
+PostSummary.model_rebuild()
+
+
+class PostFields(BaseModel):
+    """fields= で指定された項目だけを持つ記事レスポンスの基底クラス（post_fields_model で生成する）"""
+    model_config = ConfigDict(from_attributes=True)
+
+
+# 常に含める項目（キャッシュの無効化タグに使う）
+POST_REQUIRED_FIELDS = ("id",)
+
+
+def parse_post_fields(fields: str) -> Tuple[str, ...]:
+    """カンマ区切りの fields= を正規化する（重複除去・ソート済み）。未知の項目は ValueError"""
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - Post.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(sorted(names.union(POST_REQUIRED_FIELDS)))
+
+
+@lru_cache(maxsize=256)
+def post_fields_model(fields: Tuple[str, ...]) -> type:
+    """指定項目だけを持つレスポンスモデルを作る。項目の組み合わせごとにキャッシュする"""
+    return create_model(
+        f"PostFields_{'_'.join(fields)}",
+        __base__=PostFields,
+        **{name: (Post.model_fields[name].annotation, Post.model_fields[name]) for name in fields}
+    )
 
 
 class PostList(BaseModel):
-    posts: List[Post]
+    # include=content 指定時は Post、fields= 指定時は PostFields、既定は PostSummary
+    posts: List[Union[Post, PostSummary, SerializeAsAny[PostFields]]]
     total: int
     page: int
     per_page: int
-    pages: int
\ No newline at end of file
+    pages: int
+
+
+class PostCursorList(BaseModel):
+    posts: List[Union[Post, PostSummary, SerializeAsAny[PostFields]]]
+    per_page: int
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class AdminPostList(PostList):
+    # 状態別の記事数（書き込み時に更新するカウンタ。COUNTは実行しない）
+    status_counts: Dict[str, int]
+
+
+class AdminPostCursorList(PostCursorList):
+    status_counts: Dict[str, int]
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class PostRevisionSummary(BaseModel):
+    revision: int
+    title: str
+    content_length: int
+    content_hash: str
+    user_id: Optional[int] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class PostRevision(PostRevisionSummary):
+    content: str
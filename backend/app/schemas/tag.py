@@ -30,4 +30,13 @@ class Tag(TagInDB):
 
 
 class TagResponse(TagInDB):
-    pass
\ No newline at end of file
+    pass
+
+
+# 一覧用。公開APIは公開記事数だけを返す（下書きの数は管理画面のみ）
+class TagWithCount(Tag):
+    published_post_count: int
+
+
+class TagWithCounts(TagWithCount):
+    post_count: int
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, and_, distinct
 from app.models.analytics import PageView, SiteStatistic, PopularPost
 from app.models.post import Post
+from app.services.slug_cache import slug_cache
 from app.schemas.analytics import (
     PageViewCreate, 
     AnalyticsOverview, 
@@ -33,9 +34,9 @@ class AnalyticsService:
             slug_match = re.search(r'/posts/([^/]+)', page_view_data.url_path)
             if slug_match:
                 slug = slug_match.group(1)
-                post = self.db.query(Post).filter(Post.slug == slug).first()
-                if post:
-                    post_id = post.id
+                entry = slug_cache.resolve(self.db, slug)
+                if entry:
+                    post_id = entry.post_id
         
         page_view = PageView(
             post_id=post_id,
@@ -0,0 +1,235 @@
+import gzip
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, List, Optional
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.post import Post, PostStatus
+
+# 1ファイルあたりのURL数の上限（sitemaps.org の仕様）。超えたらサイトマップインデックスにする
+SITEMAP_MAX_URLS = 50000
+# サイトマップ生成時に一度に読む行数
+SITEMAP_BATCH_SIZE = 5000
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NS = "http://www.w3.org/2005/Atom"
+
+
+@dataclass
+class FeedDocument:
+    gzip_body: bytes
+    digest: str
+    last_modified: datetime
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # DBの日時はタイムゾーンなし（UTC）で返ってくる
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _w3c(value: datetime) -> str:
+    return _utc(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _post_url(slug: str) -> str:
+    return f"{settings.SITE_URL.rstrip('/')}/posts/{quote(slug)}"
+
+
+def _sitemap_url(page: int) -> str:
+    return f"{settings.SITE_URL.rstrip('/')}/api/sitemap-{page}.xml"
+
+
+def _urlset(entries: List[str]) -> str:
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+        + "".join(entries)
+        + "</urlset>\n"
+    )
+
+
+def _url_entry(loc: str, lastmod: Optional[datetime]) -> str:
+    lastmod_xml = f"<lastmod>{_w3c(lastmod)}</lastmod>" if lastmod else ""
+    return f"<url><loc>{escape(loc)}</loc>{lastmod_xml}</url>\n"
+
+
+def build_sitemaps(db: Session) -> Dict[str, str]:
+    """公開記事のサイトマップを生成する。{ファイル名: XML}
+
+    SITEMAP_MAX_URLS 件を超える場合は sitemap.xml をインデックスにして、
+    sitemap-1.xml, sitemap-2.xml, ... に分割する。
+    """
+    pages: List[List[str]] = [[_url_entry(settings.SITE_URL.rstrip("/") + "/", None)]]
+    page_lastmods: List[Optional[datetime]] = [None]
+
+    result = db.execute(
+        select(Post.slug, Post.updated_at, Post.published_at)
+        .where(Post.status == PostStatus.PUBLISHED)
+        .order_by(Post.id)
+        .execution_options(yield_per=SITEMAP_BATCH_SIZE)
+    )
+    for row in result:
+        if len(pages[-1]) >= SITEMAP_MAX_URLS:
+            pages.append([])
+            page_lastmods.append(None)
+        lastmod = _utc(row.updated_at or row.published_at)
+        pages[-1].append(_url_entry(_post_url(row.slug), lastmod))
+        if lastmod and (page_lastmods[-1] is None or lastmod > page_lastmods[-1]):
+            page_lastmods[-1] = lastmod
+
+    if len(pages) == 1:
+        return {"sitemap.xml": _urlset(pages[0])}
+
+    documents = {f"sitemap-{i}.xml": _urlset(entries) for i, entries in enumerate(pages, start=1)}
+    index_entries = "".join(
+        f"<sitemap><loc>{escape(_sitemap_url(i))}</loc>"
+        + (f"<lastmod>{_w3c(lastmod)}</lastmod>" if lastmod else "")
+        + "</sitemap>\n"
+        for i, lastmod in enumerate(page_lastmods, start=1)
+    )
+    documents["sitemap.xml"] = (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+        + index_entries
+        + "</sitemapindex>\n"
+    )
+    return documents
+
+
+def build_feeds(db: Session) -> Dict[str, str]:
+    """新しい公開記事 FEED_MAX_ITEMS 件のRSS 2.0（feed.xml）とAtom（atom.xml）を生成する"""
+    rows = db.execute(
+        select(Post.title, Post.slug, Post.excerpt, Post.published_at, Post.updated_at)
+        .where(Post.status == PostStatus.PUBLISHED)
+        .order_by(Post.published_at.desc(), Post.id.desc())
+        .limit(settings.FEED_MAX_ITEMS)
+    ).all()
+
+    site_url = settings.SITE_URL.rstrip("/")
+    title = escape(settings.APP_NAME)
+    description = escape(settings.SITE_DESCRIPTION or settings.APP_NAME)
+    updated = max(
+        (_utc(row.updated_at or row.published_at) for row in rows if row.updated_at or row.published_at),
+        default=datetime.now(timezone.utc)
+    )
+
+    rss_items = []
+    atom_entries = []
+    for row in rows:
+        url = escape(_post_url(row.slug))
+        published = _utc(row.published_at or row.updated_at)
+        summary = escape(row.excerpt or "")
+        rss_items.append(
+            f"<item><title>{escape(row.title)}</title><link>{url}</link>"
+            f'<guid isPermaLink="true">{url}</guid>'
+            + (f"<pubDate>{format_datetime(published, usegmt=True)}</pubDate>" if published else "")
+            + f"<description>{summary}</description></item>\n"
+        )
+        atom_entries.append(
+            f'<entry><title>{escape(row.title)}</title><link href="{url}"/><id>{url}</id>'
+            + (f"<published>{_w3c(published)}</published>" if published else "")
+            + f"<updated>{_w3c(row.updated_at or published or updated)}</updated>"
+            + f"<summary>{summary}</summary></entry>\n"
+        )
+
+    rss = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<rss version="2.0" xmlns:atom="{ATOM_NS}"><channel>\n'
+        f"<title>{title}</title><link>{escape(site_url)}/</link><description>{description}</description>"
+        f'<atom:link href="{escape(site_url)}/api/feed.xml" rel="self" type="application/rss+xml"/>'
+        f"<lastBuildDate>{format_datetime(updated, usegmt=True)}</lastBuildDate>\n"
+        + "".join(rss_items)
+        + "</channel></rss>\n"
+    )
+    atom = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<feed xmlns="{ATOM_NS}">\n'
+        f'<title>{title}</title><subtitle>{description}</subtitle><link href="{escape(site_url)}/"/>'
+        f'<link href="{escape(site_url)}/api/atom.xml" rel="self"/><id>{escape(site_url)}/</id>'
+        f"<updated>{_w3c(updated)}</updated>\n"
+        + "".join(atom_entries)
+        + "</feed>\n"
+    )
+    return {"feed.xml": rss, "atom.xml": atom}
+
+
+class FeedStore:
+    """サイトマップ・フィードをgzip圧縮済みのバイト列で保持する
+
+    管理画面で公開状態・slug（フィードに出る記事ではタイトル・抜粋も）が変わったら invalidate し、
+    次のリクエストでまとめて作り直す。プロセス内キャッシュなので、ワーカーが複数ある場合の
+    整合性はTTLで担保する。作り直しても内容が同じなら Last-Modified は変えない。
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+        self._documents: Dict[str, FeedDocument] = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.version = 0
+        self._built_version: Optional[int] = None
+        self._expires_at = 0.0
+
+        # Counters
+        self.builds = 0
+        self.last_build_seconds = 0.0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+
+    def get(self, db: Session, name: str) -> Optional[FeedDocument]:
+        """name（例: "sitemap.xml"）の文書を返す。古ければ作り直す。存在しなければ None"""
+        if self._is_stale():
+            with self._build_lock:
+                # Another request may have rebuilt while we waited for the lock
+                if self._is_stale():
+                    self._rebuild(db)
+        return self._documents.get(name)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "documents": {name: len(document.gzip_body) for name, document in self._documents.items()},
+            "version": self.version,
+            "builds": self.builds,
+            "last_build_seconds": self.last_build_seconds
+        }
+
+    def _is_stale(self) -> bool:
+        return self._built_version != self.version or self._expires_at <= time.monotonic()
+
+    def _rebuild(self, db: Session) -> None:
+        # An invalidation during the build leaves the result stale, so the next request rebuilds again
+        version = self.version
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        documents = {}
+        for name, xml in {**build_sitemaps(db), **build_feeds(db)}.items():
+            body = xml.encode("utf-8")
+            digest = hashlib.sha256(body).hexdigest()
+            previous = self._documents.get(name)
+            if previous is not None and previous.digest == digest:
+                documents[name] = previous
+            else:
+                # mtime=0 keeps the compressed bytes stable for identical content
+                documents[name] = FeedDocument(gzip.compress(body, mtime=0), digest, now)
+        self._documents = documents
+        self._built_version = version
+        self._expires_at = time.monotonic() + self.ttl
+        self.builds += 1
+        self.last_build_seconds = round(time.perf_counter() - started, 3)
+
+
+feed_store = FeedStore(ttl=settings.FEED_CACHE_TTL)
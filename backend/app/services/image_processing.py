@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image as PILImage, ImageOps
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = "uploads/images"
+
+THUMBNAIL_SIZES = {
+    'small': (150, 150),
+    'medium': (300, 300),
+    'large': (800, 800)
+}
+
+
+def _flatten(img: PILImage.Image) -> PILImage.Image:
+    # Convert RGBA to RGB if necessary (for JPEG compatibility)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # Create a white background
+        rgb_img = PILImage.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        rgb_img.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+        return rgb_img
+    return img
+
+
+def process_image_file(source_path: str, filename: str, upload_dir: str = UPLOAD_DIR) -> Tuple[Optional[int], Optional[int]]:
+    """受信済みの一時ファイルから画像を最適化して保存し、サムネイルを作る。(幅, 高さ) を返す（ワーカープロセスで実行する）
+
+    画像として処理できない場合は元のデータをそのまま保存する。一時ファイルの削除は呼び出し側で行う。
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    file_path = os.path.join(upload_dir, filename)
+    name, extension = os.path.splitext(filename)
+
+    try:
+        with PILImage.open(source_path) as img:
+            img = _flatten(img)
+            width, height = img.size
+
+            # Save optimized original image
+            img.save(file_path, quality=85, optimize=True)
+
+            thumb_dir = os.path.join(upload_dir, "thumbnails")
+            os.makedirs(thumb_dir, exist_ok=True)
+            for size_name, (max_width, max_height) in THUMBNAIL_SIZES.items():
+                thumb_img = img.copy()
+                thumb_img.thumbnail((max_width, max_height), PILImage.Resampling.LANCZOS)
+                thumb_img.save(os.path.join(thumb_dir, f"{name}_{size_name}{extension}"), quality=85, optimize=True)
+            return width, height
+    except Exception:
+        # If image processing fails, save the original file
+        shutil.copyfile(source_path, file_path)
+        try:
+            with PILImage.open(file_path) as img:
+                return img.size
+        except Exception:
+            return None, None
+
+
+def render_variant_file(
+    source_path: str,
+    dest_path: str,
+    width: Optional[int],
+    height: Optional[int],
+    fit: str,
+    fmt: str,
+    quality: int
+) -> int:
+    """元画像を縮小して dest_path に保存し、ファイルサイズを返す（ワーカープロセスで実行する）
+
+    fit="contain" は幅・高さに収まるよう縮小、fit="cover" は幅×高さを埋めるよう縮小して中央を切り抜く。
+    元画像より大きくはしない。
+    """
+    with PILImage.open(source_path) as img:
+        source_width, source_height = img.size
+        if fit == "cover":
+            # Keep the requested aspect ratio, but never scale up
+            scale = max(width / source_width, height / source_height, 1.0)
+            box = (max(1, round(width / scale)), max(1, round(height / scale)))
+        else:
+            box = (width or source_width, height or source_height)
+        # JPEG can decode at 1/2, 1/4 or 1/8 scale directly, which is much cheaper for large photos
+        img.draft("RGB", box)
+
+        if fit == "cover":
+            img = ImageOps.fit(img, box, PILImage.Resampling.LANCZOS)
+        else:
+            img.thumbnail(box, PILImage.Resampling.LANCZOS)
+        if fmt == "jpeg":
+            img = _flatten(img)
+        elif img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if img.mode in ("LA", "PA") or "transparency" in img.info else "RGB")
+
+        # Write to a temporary name so a concurrent reader never sees a partial file
+        temp_path = f"{dest_path}.{os.getpid()}.tmp"
+        try:
+            img.save(temp_path, format=fmt.upper(), quality=quality, optimize=True)
+            os.replace(temp_path, dest_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    return os.path.getsize(dest_path)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _worker_count() -> int:
+    if settings.IMAGE_PROCESS_WORKERS is None:
+        return os.cpu_count() or 1
+    return settings.IMAGE_PROCESS_WORKERS
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """画像処理用のプロセスプール（IMAGE_PROCESS_WORKERS=0 ならプールを使わずスレッドで処理する）"""
+    global _pool
+    if _worker_count() <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # スレッドを持つワーカープロセスから fork しないよう spawn を使う
+            _pool = ProcessPoolExecutor(
+                max_workers=_worker_count(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def _get_slots() -> asyncio.Semaphore:
+    # Bounds the images being decoded or waiting for a worker
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(1, _worker_count()) * settings.IMAGE_PROCESS_QUEUE_PER_WORKER)
+    return _slots
+
+
+async def _run_in_pool(fn, *args):
+    """fn をイベントループの外（ワーカープロセス）で実行する
+
+    プールの空きを待つ間もイベントループはブロックしない。
+    """
+    global _pool
+    pool = _get_pool()
+    if pool is None:
+        return await run_in_threadpool(fn, *args)
+
+    async with _get_slots():
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory on a huge image); start a fresh pool for the next job
+            logger.exception("Image worker pool is broken, restarting")
+            with _pool_lock:
+                if _pool is pool:
+                    _pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+async def process_image(source_path: str, filename: str, upload_dir: str = UPLOAD_DIR) -> Tuple[Optional[int], Optional[int]]:
+    """process_image_file をイベントループの外で実行する"""
+    return await _run_in_pool(process_image_file, source_path, filename, upload_dir)
+
+
+async def render_variant(
+    source_path: str,
+    dest_path: str,
+    width: Optional[int],
+    height: Optional[int],
+    fit: str,
+    fmt: str,
+    quality: int
+) -> int:
+    """render_variant_file をイベントループの外で実行する"""
+    return await _run_in_pool(render_variant_file, source_path, dest_path, width, height, fit, fmt, quality)
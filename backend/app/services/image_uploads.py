@@ -0,0 +1,233 @@
+import fcntl
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Optional, Tuple
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+# Bytes collected before each write to disk
+COPY_CHUNK_SIZE = 1024 * 1024
+
+_UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class UploadTooLarge(Exception):
+    """受信したデータが上限を超えた"""
+
+
+class UploadNotFound(Exception):
+    """分割アップロードが存在しない（完了済み・中止済み・期限切れ）"""
+
+
+class UploadOffsetMismatch(Exception):
+    """追記位置が受信済みのバイト数と一致しない"""
+
+    def __init__(self, offset: int):
+        super().__init__(offset)
+        self.offset = offset
+
+
+class UploadBusy(Exception):
+    """同じ分割アップロードへの追記が処理中"""
+
+
+@dataclass
+class UploadSession:
+    upload_id: str
+    filename: str
+    content_type: str
+    size: int
+    offset: int
+
+
+async def _upload_file_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(COPY_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _copy_chunks(chunks: AsyncIterator[bytes], handle: BinaryIO, written: int, limit: int) -> int:
+    """chunks を handle に書き、書き込み後の合計バイト数を返す。合計が limit を超えた時点で UploadTooLarge"""
+    buffer = bytearray()
+    try:
+        async for chunk in chunks:
+            written += len(chunk)
+            if written > limit:
+                raise UploadTooLarge()
+            buffer += chunk
+            if len(buffer) >= COPY_CHUNK_SIZE:
+                await run_in_threadpool(handle.write, buffer)
+                del buffer[:]
+    finally:
+        # Keep what was received before a client disconnect so the upload can resume from there
+        if buffer:
+            await run_in_threadpool(handle.write, buffer)
+    return written
+
+
+class ImageUploadStore:
+    """アップロードされた画像を処理前に置く一時ファイルの管理
+
+    単発のアップロードは一時ファイルにチャンク単位でコピーし、上限を超えた時点で打ち切る。
+    分割アップロードはセッションごとに受信済みデータ（.part）とメタデータ（.json）をディスクに置くので、
+    どのワーカープロセスに追記リクエストが届いても続きを受け取れる。.part のサイズがそのまま再開位置になる。
+    async のメソッドはファイル操作をスレッドプールで行う。それ以外のメソッドはブロッキングするので、
+    同期のエンドポイントか run_in_threadpool から呼ぶ。
+    """
+
+    def __init__(self, root: str, session_ttl: float):
+        self.root = root
+        self.session_ttl = session_ttl
+
+    async def spool(self, file: UploadFile, max_bytes: int) -> Tuple[str, int]:
+        """UploadFile を一時ファイルに書き出し、(パス, サイズ) を返す。一時ファイルの削除は呼び出し側で行う"""
+        handle, path = await run_in_threadpool(self._create_temp)
+        try:
+            try:
+                size = await _copy_chunks(_upload_file_chunks(file), handle, 0, max_bytes)
+            finally:
+                await run_in_threadpool(handle.close)
+        except BaseException:
+            await run_in_threadpool(self.discard, path)
+            raise
+        return path, size
+
+    def create(self, filename: str, content_type: str, size: int) -> UploadSession:
+        """分割アップロードを開始する"""
+        os.makedirs(self.root, exist_ok=True)
+        self.cleanup_stale()
+        upload_id = uuid.uuid4().hex
+        with open(self._path(upload_id, "part"), "xb"):
+            pass
+        metadata = {"filename": filename, "content_type": content_type, "size": size}
+        meta_path = self._path(upload_id, "json")
+        with open(meta_path + ".tmp", "w") as handle:
+            json.dump(metadata, handle)
+        os.replace(meta_path + ".tmp", meta_path)
+        return UploadSession(upload_id=upload_id, offset=0, **metadata)
+
+    def get(self, upload_id: str) -> UploadSession:
+        if not _UPLOAD_ID_PATTERN.match(upload_id):
+            raise UploadNotFound()
+        try:
+            with open(self._path(upload_id, "json")) as handle:
+                metadata = json.load(handle)
+            offset = os.path.getsize(self._path(upload_id, "part"))
+        except FileNotFoundError:
+            raise UploadNotFound()
+        return UploadSession(upload_id=upload_id, offset=offset, **metadata)
+
+    async def append(
+        self,
+        upload_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        max_bytes: int,
+        content_length: Optional[int] = None
+    ) -> UploadSession:
+        """受信済みデータの末尾（offset）に chunks を追記する
+
+        1回の追記は max_bytes まで、合計は開始時に申告したサイズまで。超えた場合はこの追記分を取り消して UploadTooLarge。
+        """
+        session = await run_in_threadpool(self.get, upload_id)
+        handle = await run_in_threadpool(self._open_part, upload_id, offset)
+        try:
+            limit = min(session.size, offset + max_bytes)
+            if content_length is not None and offset + content_length > limit:
+                raise UploadTooLarge()
+            try:
+                session.offset = await _copy_chunks(chunks, handle, offset, limit)
+            except UploadTooLarge:
+                await run_in_threadpool(handle.truncate, offset)
+                raise
+        finally:
+            # Closing releases the lock
+            await run_in_threadpool(handle.close)
+        # Keep the session alive for cleanup_stale while data keeps arriving
+        await run_in_threadpool(os.utime, self._path(upload_id, "json"))
+        return session
+
+    def claim(self, upload_id: str) -> Tuple[UploadSession, str]:
+        """受信が終わった分割アップロードを取り出し、(セッション, データのパス) を返す
+
+        取り出した時点でセッションは消えるので、同時に complete されても画像は1つしかできない。
+        データのパスの削除は呼び出し側で行う。
+        """
+        session = self.get(upload_id)
+        if session.offset != session.size:
+            raise UploadOffsetMismatch(session.offset)
+        path = self._path(upload_id, "complete")
+        try:
+            os.rename(self._path(upload_id, "part"), path)
+        except FileNotFoundError:
+            raise UploadNotFound()
+        self.discard(self._path(upload_id, "json"))
+        return session, path
+
+    def remove(self, upload_id: str) -> None:
+        """分割アップロードを中止する"""
+        self.get(upload_id)
+        for suffix in ("part", "json"):
+            self.discard(self._path(upload_id, suffix))
+
+    def cleanup_stale(self) -> None:
+        """最後の書き込みから session_ttl を過ぎた一時ファイルを削除する"""
+        cutoff = time.time() - self.session_ttl
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    self.discard(entry.path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def discard(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _create_temp(self) -> Tuple[BinaryIO, str]:
+        os.makedirs(self.root, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.root, suffix=".upload")
+        return os.fdopen(fd, "wb"), path
+
+    def _open_part(self, upload_id: str, offset: int) -> BinaryIO:
+        """追記用に .part を開いて排他ロックし、offset（受信済みのバイト数と一致すること）に移動する"""
+        try:
+            handle = open(self._path(upload_id, "part"), "r+b")
+        except FileNotFoundError:
+            raise UploadNotFound()
+        try:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadBusy()
+            current = os.fstat(handle.fileno()).st_size
+            if offset != current:
+                raise UploadOffsetMismatch(current)
+            handle.seek(offset)
+        except BaseException:
+            handle.close()
+            raise
+        return handle
+
+    def _path(self, upload_id: str, suffix: str) -> str:
+        return os.path.join(self.root, f"{upload_id}.{suffix}")
+
+
+image_uploads = ImageUploadStore(settings.IMAGE_UPLOAD_TMP_DIR, settings.IMAGE_UPLOAD_SESSION_TTL)
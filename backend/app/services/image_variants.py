@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services.image_processing import UPLOAD_DIR, render_variant
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FORMATS = {
+    "jpeg": ("jpg", "image/jpeg"),
+    "png": ("png", "image/png"),
+    "webp": ("webp", "image/webp"),
+}
+
+# Variants of a source image keep its format; GIF becomes PNG (first frame)
+SOURCE_FORMATS = {
+    ".jpg": "jpeg",
+    ".jpeg": "jpeg",
+    ".png": "png",
+    ".webp": "webp",
+    ".gif": "png",
+}
+
+# Fraction of the budget to shrink to when evicting, so eviction does not run on every new variant
+EVICT_TARGET_RATIO = 0.9
+# Other worker processes add to the same directory, so the running total is re-counted at least this often
+RESCAN_INTERVAL = 60.0  # seconds
+# A variant evicted between get() and reading it is generated again, up to this many times in total
+READ_ATTEMPTS = 2
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    width: Optional[int]
+    height: Optional[int]
+    fit: str
+    fmt: str
+
+    @property
+    def media_type(self) -> str:
+        return VARIANT_FORMATS[self.fmt][1]
+
+    def cache_name(self) -> str:
+        return f"{self.width or 0}x{self.height or 0}_{self.fit}.{VARIANT_FORMATS[self.fmt][0]}"
+
+
+def source_format(filename: str) -> str:
+    return SOURCE_FORMATS.get(os.path.splitext(filename)[1].lower(), "jpeg")
+
+
+def image_version(filename: str) -> str:
+    """バリエーションURLの v（保存ファイル名から拡張子を除いたもの）
+
+    アップロードごとに変わるので、削除した画像のIDが再利用されても古いキャッシュのURLとは一致しない。
+    """
+    return os.path.splitext(filename)[0]
+
+
+class ImageVariantCache:
+    """リサイズした画像のディスクキャッシュ
+
+    バリエーションは最初に要求されたときに画像ワーカーで生成し、root/<元画像のファイル名>/ に保存する。
+    同じバリエーションへの同時リクエストは1回の生成を待ち合わせる。
+    合計サイズが max_bytes を超えたら、最後に使われた時刻（mtime）が古いものから削除する。
+    キャッシュディレクトリは複数のワーカープロセスで共有してよい（合計サイズは定期的にディレクトリから数え直す）。
+    """
+
+    def __init__(self, root: str, max_bytes: int, quality: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._total: Optional[int] = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+
+    async def get(self, filename: str, spec: VariantSpec) -> str:
+        """バリエーションのファイルパス。なければ生成する"""
+        path = os.path.join(self.root, filename, spec.cache_name())
+        if await run_in_threadpool(self._touch, path):
+            return path
+
+        task = self._pending.get(path)
+        if task is None:
+            task = asyncio.ensure_future(self._generate(filename, path, spec))
+            self._pending[path] = task
+            task.add_done_callback(lambda done: self._finished(path, done))
+        # A client that disconnects must not cancel the generation other requests are waiting for
+        return await asyncio.shield(task)
+
+    async def read(self, filename: str, spec: VariantSpec) -> bytes:
+        """バリエーションの内容。get() の後に追い出されていたら作り直す"""
+        for _ in range(READ_ATTEMPTS):
+            path = await self.get(filename, spec)
+            try:
+                return await run_in_threadpool(self._read, path)
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(path)
+
+    def purge(self, filename: str) -> None:
+        """元画像のバリエーションをすべて削除する"""
+        directory = os.path.join(self.root, filename)
+        size = sum(size for _, size, _ in self._entries(directory))
+        shutil.rmtree(directory, ignore_errors=True)
+        with self._lock:
+            if self._total is not None:
+                self._total = max(0, self._total - size)
+
+    def _finished(self, path: str, task: asyncio.Future) -> None:
+        self._pending.pop(path, None)
+        if not task.cancelled():
+            # Mark the error as retrieved even if every waiting request has gone away
+            task.exception()
+
+    async def _generate(self, filename: str, path: str, spec: VariantSpec) -> str:
+        source_path = os.path.join(UPLOAD_DIR, filename)
+        await run_in_threadpool(os.makedirs, os.path.dirname(path), exist_ok=True)
+        size = await render_variant(source_path, path, spec.width, spec.height, spec.fit, spec.fmt, self.quality)
+        await run_in_threadpool(self._account, size)
+        return path
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, "rb") as handle:
+            return handle.read()
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        # mtime doubles as the last-used time for LRU eviction (atime is often disabled)
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _account(self, size: int) -> None:
+        with self._lock:
+            if self._total is not None:
+                self._total += size
+            if (
+                self._total is None
+                or self._total > self.max_bytes
+                or time.monotonic() - self._scanned_at > RESCAN_INTERVAL
+            ):
+                self._evict()
+
+    def _evict(self) -> None:
+        entries: List[Tuple[float, int, str]] = []
+        try:
+            directories = [entry.path for entry in os.scandir(self.root) if entry.is_dir()]
+        except FileNotFoundError:
+            directories = []
+        for directory in directories:
+            entries.extend(self._entries(directory))
+
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            logger.info("Evicted %d image variants, %d bytes cached", removed, total)
+        self._total = total
+        self._scanned_at = time.monotonic()
+
+    @staticmethod
+    def _entries(directory: str) -> List[Tuple[float, int, str]]:
+        entries = []
+        cutoff = time.time() - 3600
+        try:
+            scanned = list(os.scandir(directory))
+        except FileNotFoundError:
+            return entries
+        for entry in scanned:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith(".tmp"):
+                # Left behind by a worker that died mid-write
+                if stat.st_mtime < cutoff:
+                    ImageVariantCache._discard(entry.path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    @staticmethod
+    def _discard(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+image_variants = ImageVariantCache(
+    settings.IMAGE_VARIANT_CACHE_DIR,
+    settings.IMAGE_VARIANT_CACHE_MAX_BYTES,
+    settings.IMAGE_VARIANT_QUALITY
+)
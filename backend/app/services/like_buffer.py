@@ -0,0 +1,209 @@
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.like import Like
+from app.models.post import Post
+from app.services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+
+class LikeBufferFull(Exception):
+    """バッファが満杯で、待機時間内に空きができなかった"""
+
+
+@dataclass
+class BufferedLike:
+    post_id: int
+    session_id: Optional[str]
+    ip_address: Optional[str]
+    created_at: datetime
+
+
+class LikeBuffer:
+    """いいねをメモリ上に溜め、バックグラウンドでまとめてINSERTするライトビハインドバッファ"""
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        enqueue_timeout: float
+    ):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: List[BufferedLike] = []
+        self._flushing = False
+        self._closing = False
+        self._pending: Dict[int, int] = defaultdict(int)
+
+        # Counters
+        self.buffered = 0
+        self.flushed = 0
+        self.dropped = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """フラッシュ用のバックグラウンドタスクを開始する"""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """バックグラウンドタスクを停止し、残っているいいねをすべて書き込む"""
+        if self._task is None:
+            return
+        self._closing = True
+        # Only interrupt the wait for new items; a running flush is allowed to finish
+        if not self._flushing:
+            self._task.cancel()
+        await self._task
+        self._task = None
+
+    async def enqueue(self, post_id: int, session_id: Optional[str], ip_address: Optional[str]) -> None:
+        """いいねをバッファに追加する
+
+        バッファが満杯の場合は enqueue_timeout 秒まで空きを待ち（バックプレッシャー）、
+        それでも空かなければ LikeBufferFull を送出する。
+        """
+        item = BufferedLike(
+            post_id=post_id,
+            session_id=session_id,
+            ip_address=ip_address,
+            created_at=datetime.utcnow()
+        )
+        try:
+            await asyncio.wait_for(self._queue.put(item), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            raise LikeBufferFull()
+
+        self.buffered += 1
+        self._pending[post_id] += 1
+
+    def pending_count(self, post_id: int) -> int:
+        """まだDBに書き込まれていない、指定記事のいいね数"""
+        return self._pending.get(post_id, 0)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buffered": self.buffered,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "pending": self._queue.qsize() + len(self._inflight) if self._queue else 0,
+            "max_size": self.max_size
+        }
+
+    async def _run(self) -> None:
+        try:
+            while not self._closing:
+                await self._collect_batch()
+                if self._inflight:
+                    await self._flush()
+        except asyncio.CancelledError:
+            pass
+
+        # Drain: in-flight batch plus everything still queued
+        while not self._queue.empty():
+            self._inflight.append(self._queue.get_nowait())
+        if self._inflight:
+            await self._flush()
+
+    async def _collect_batch(self) -> None:
+        """batch_size 件溜まるか flush_interval 秒経過するまで待つ"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(self._inflight) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                break
+            self._inflight.append(item)
+
+    async def _flush(self) -> None:
+        batch = self._inflight
+        self._inflight = []
+        self._flushing = True
+        try:
+            await run_in_threadpool(self._write_batch, batch)
+            self.flushed += len(batch)
+            # Cached responses (and their ETags) embed likes_count
+            response_cache.invalidate(*{f"post:{item.post_id}" for item in batch})
+        except Exception:
+            logger.exception("Failed to flush %d buffered likes", len(batch))
+            self.dropped += len(batch)
+        finally:
+            self._flushing = False
+            for item in batch:
+                self._pending[item.post_id] -= 1
+                if self._pending[item.post_id] <= 0:
+                    del self._pending[item.post_id]
+
+    @staticmethod
+    def _write_batch(batch: List[BufferedLike]) -> None:
+        """likesへの一括INSERTとposts.likes_countの加算を1トランザクションで実行する"""
+        increments: Dict[int, int] = defaultdict(int)
+        for item in batch:
+            increments[item.post_id] += 1
+
+        posts_table = Post.__table__
+        db = SessionLocal()
+        try:
+            # executemany
+            db.execute(
+                Like.__table__.insert(),
+                [
+                    {
+                        "post_id": item.post_id,
+                        "session_id": item.session_id,
+                        "ip_address": item.ip_address,
+                        "created_at": item.created_at
+                    }
+                    for item in batch
+                ]
+            )
+            db.execute(
+                posts_table.update()
+                .where(posts_table.c.id == bindparam("b_post_id"))
+                .values(likes_count=posts_table.c.likes_count + bindparam("b_increment")),
+                [
+                    {"b_post_id": post_id, "b_increment": count}
+                    for post_id, count in increments.items()
+                ]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+like_buffer = LikeBuffer(
+    max_size=settings.LIKE_BUFFER_MAX_SIZE,
+    batch_size=settings.LIKE_BUFFER_BATCH_SIZE,
+    flush_interval=settings.LIKE_BUFFER_FLUSH_INTERVAL,
+    enqueue_timeout=settings.LIKE_BUFFER_ENQUEUE_TIMEOUT
+)
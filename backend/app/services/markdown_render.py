@@ -0,0 +1,212 @@
+import hashlib
+import html
+import logging
+import math
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import markdown
+import nh3
+from markdown.extensions.toc import slugify_unicode
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.post import Post
+
+logger = logging.getLogger(__name__)
+
+# フロントエンド（react-markdown + remark-gfm）に近い表現になる拡張
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists", "toc"]
+MARKDOWN_EXTENSION_CONFIGS = {
+    # 日本語の見出しでもアンカーが空にならないようにする
+    "toc": {"slugify": slugify_unicode}
+}
+
+# サニタイズで許可する属性（nh3 の既定に、見出しアンカー・コードの言語クラス・脚注を追加）
+ALLOWED_ATTRIBUTES = {tag: set(attributes) for tag, attributes in nh3.ALLOWED_ATTRIBUTES.items()}
+for _heading in ("h1", "h2", "h3", "h4", "h5", "h6"):
+    ALLOWED_ATTRIBUTES.setdefault(_heading, set()).add("id")
+ALLOWED_ATTRIBUTES.setdefault("a", set()).update({"title", "class"})
+ALLOWED_ATTRIBUTES.setdefault("img", set()).add("title")
+ALLOWED_ATTRIBUTES.setdefault("code", set()).add("class")
+ALLOWED_ATTRIBUTES.setdefault("div", set()).add("class")
+ALLOWED_ATTRIBUTES.setdefault("sup", set()).add("id")
+ALLOWED_ATTRIBUTES.setdefault("li", set()).add("id")
+
+# 読了時間の目安（フロントエンドの reading-time.ts と同じ値。日本語は文字数、英語は単語数で数える）
+CJK_CHARS_PER_MINUTE = 600
+WORDS_PER_MINUTE = 200
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_CJK_CHAR_RE = re.compile(r"[぀-ヿ㐀-䶿一-鿿豈-﫿々〆]")
+_WORD_RE = re.compile(r"[0-9A-Za-zÀ-ɏ]+(?:['’][0-9A-Za-z]+)*")
+
+
+@dataclass
+class RenderedContent:
+    html: str
+    toc: List[Dict[str, Any]]
+    word_count: int
+    reading_time: int
+
+
+def content_hash(content: Optional[str]) -> str:
+    """レンダリング結果のキーにする本文のハッシュ"""
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+def _flatten_toc(tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    entries = []
+    for token in tokens:
+        entries.append({"level": token["level"], "id": token["id"], "title": html.unescape(token["name"])})
+        entries.extend(_flatten_toc(token["children"]))
+    return entries
+
+
+def render_markdown(content: str) -> RenderedContent:
+    """Markdownをサニタイズ済みHTML・見出し目次・語数・読了時間に変換する
+
+    ワーカープロセスで実行するので、モジュールレベルの関数にしておく。
+    """
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS, extension_configs=MARKDOWN_EXTENSION_CONFIGS)
+    raw_html = md.convert(content or "")
+    clean_html = nh3.clean(raw_html, attributes=ALLOWED_ATTRIBUTES)
+
+    text = html.unescape(_TAG_RE.sub(" ", clean_html))
+    cjk_chars = len(_CJK_CHAR_RE.findall(text))
+    words = len(_WORD_RE.findall(text))
+    minutes = cjk_chars / CJK_CHARS_PER_MINUTE + words / WORDS_PER_MINUTE
+
+    return RenderedContent(
+        html=clean_html,
+        toc=_flatten_toc(md.toc_tokens),
+        word_count=cjk_chars + words,
+        reading_time=max(1, math.ceil(minutes)) if cjk_chars + words else 0
+    )
+
+
+def rendered_values(content: str, rendered: Optional[RenderedContent]) -> Dict[str, Any]:
+    """レンダリング結果を Post の列の値にする。rendered が None（失敗）なら結果を空にする"""
+    if rendered is None:
+        return {"content_html": None, "toc": None, "word_count": 0, "reading_time": 0, "content_hash": None}
+    return {
+        "content_html": rendered.html,
+        "toc": rendered.toc,
+        "word_count": rendered.word_count,
+        "reading_time": rendered.reading_time,
+        "content_hash": content_hash(content)
+    }
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """レンダリング用のプロセスプール（MARKDOWN_RENDER_WORKERS=0 ならプールを使わない）"""
+    global _pool
+    if settings.MARKDOWN_RENDER_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # スレッドを持つワーカープロセスから fork しないよう spawn を使う
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.MARKDOWN_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def render_markdown_many(contents: List[str]) -> List[Optional[RenderedContent]]:
+    """複数の本文をワーカープールで並列にレンダリングする。失敗した本文は None"""
+    pool = _get_pool()
+    if pool is None:
+        futures = None
+    else:
+        futures = [pool.submit(render_markdown, content) for content in contents]
+
+    results = []
+    for i, content in enumerate(contents):
+        try:
+            if futures is None:
+                results.append(render_markdown(content))
+            else:
+                results.append(futures[i].result(timeout=settings.MARKDOWN_RENDER_TIMEOUT))
+        except Exception:
+            logger.exception("Failed to render markdown")
+            results.append(None)
+    return results
+
+
+class MarkdownRenderService:
+    """記事本文のレンダリング結果（HTML・目次・語数・読了時間）を管理するサービスクラス
+
+    結果は本文のハッシュと一緒に保存し、本文が変わっていなければ再レンダリングしない。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def render_post(self, post: Post) -> bool:
+        """本文が変わっていればレンダリングして列を更新する。更新したら True。コミットは呼び出し側で行う
+
+        レンダリングに失敗・タイムアウトした場合はレンダリング結果を空にする
+        （フロントエンドは従来どおり本文のMarkdownを表示する。render_posts.py で後から埋められる）。
+        """
+        digest = content_hash(post.content)
+        if post.content_hash == digest:
+            return False
+
+        try:
+            pool = _get_pool()
+            if pool is None:
+                rendered = render_markdown(post.content)
+            else:
+                rendered = pool.submit(render_markdown, post.content).result(
+                    timeout=settings.MARKDOWN_RENDER_TIMEOUT
+                )
+        except Exception:
+            logger.exception("Failed to render markdown for post %s", post.id)
+            rendered = None
+
+        for field, value in rendered_values(post.content, rendered).items():
+            setattr(post, field, value)
+        return True
+
+    def render_all(self, batch_size: int = 100, force: bool = False) -> int:
+        """レンダリング結果が古い（または未作成の）記事をすべてレンダリングする
+
+        バッチごとにコミットし、更新した記事数を返す。force で全記事を作り直す。
+        """
+        rendered = 0
+        last_id = 0
+        while True:
+            posts = (
+                self.db.query(Post)
+                .filter(Post.id > last_id)
+                .order_by(Post.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not posts:
+                break
+            for post in posts:
+                if force:
+                    post.content_hash = None
+                if self.render_post(post):
+                    rendered += 1
+            self.db.commit()
+            last_id = posts[-1].id
+        return rendered
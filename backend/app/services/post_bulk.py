@@ -0,0 +1,218 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.analytics import PageView, PopularPost
+from app.models.category import Category
+from app.models.like import Like
+from app.models.post import Post, PostStatus, post_categories, post_tags
+from app.models.post_revision import PostRevision
+from app.models.tag import Tag
+from app.schemas.post import PostBulkAction, PostBulkItemResult, PostBulkOperation, PostBulkResult
+from app.services.post_counters import PostCounterService
+from app.services.related_posts import RelatedPostsService
+from app.services.search import SearchService
+
+# IN句に渡すIDの最大数
+ID_CHUNK_SIZE = 1000
+
+TAXONOMY_ACTIONS = {
+    PostBulkAction.ADD_CATEGORIES: (post_categories, "category_id", "add"),
+    PostBulkAction.REMOVE_CATEGORIES: (post_categories, "category_id", "remove"),
+    PostBulkAction.SET_CATEGORIES: (post_categories, "category_id", "set"),
+    PostBulkAction.ADD_TAGS: (post_tags, "tag_id", "add"),
+    PostBulkAction.REMOVE_TAGS: (post_tags, "tag_id", "remove"),
+    PostBulkAction.SET_TAGS: (post_tags, "tag_id", "set"),
+}
+
+
+def _chunks(ids: Sequence[int]) -> Iterable[Sequence[int]]:
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        yield ids[start:start + ID_CHUNK_SIZE]
+
+
+@dataclass
+class PostBulkOutcome:
+    result: PostBulkResult
+    # slug / status after the batch, for posts that still exist
+    posts: Dict[int, Tuple[str, PostStatus]] = field(default_factory=dict)
+    changed_ids: Set[int] = field(default_factory=set)
+    # id -> slug of deleted posts
+    deleted: Dict[int, str] = field(default_factory=dict)
+    # A published post appeared or disappeared (sitemap / feeds)
+    visibility_changed: bool = False
+    # Published post counts of categories / tags changed (public category and tag lists)
+    category_counts_changed: bool = False
+    tag_counts_changed: bool = False
+    # Related-post lists to recompute in the background (RelatedPostsService.refresh_posts)
+    related_refill_ids: Set[int] = field(default_factory=set)
+
+
+class PostBulkService:
+    """管理画面の一括操作（公開・非公開・削除・カテゴリ/タグの付け替え）を行うサービスクラス
+
+    記事ごとにSELECT・コミットする代わりに、操作ごとに集合単位の UPDATE / DELETE と
+    関連テーブルへの一括INSERTを発行する。検索インデックスと関連記事も同じトランザクションで更新する。
+    コミットは呼び出し側で行う。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply(self, operations: Sequence[PostBulkOperation]) -> PostBulkOutcome:
+        """操作を先頭から順に適用する。存在しないカテゴリ・タグを指定した場合は ValueError"""
+        self._validate_taxonomy(operations)
+
+        all_ids = list({post_id for operation in operations for post_id in operation.post_ids})
+        state: Dict[int, List] = {}
+        for chunk in _chunks(all_ids):
+            for row in self.db.execute(select(Post.id, Post.slug, Post.status).where(Post.id.in_(chunk))):
+                state[row.id] = [row.slug, row.status]
+        initially_published = {post_id for post_id, (_, status) in state.items() if status == PostStatus.PUBLISHED}
+        counter_service = PostCounterService(self.db)
+        previous_states = counter_service.states(state.keys())
+        related_service = RelatedPostsService(self.db)
+
+        outcome = PostBulkOutcome(result=PostBulkResult(results=[], updated=0, unchanged=0, deleted=0, not_found=0))
+        status_changed: Set[int] = set()
+        taxonomy_changed: Set[int] = set()
+
+        for index, operation in enumerate(operations):
+            targets = []
+            for post_id in dict.fromkeys(operation.post_ids):
+                if post_id in state:
+                    targets.append(post_id)
+                else:
+                    self._add_result(outcome, index, post_id, "not_found")
+
+            if operation.action in (PostBulkAction.PUBLISH, PostBulkAction.UNPUBLISH):
+                new_status = PostStatus.PUBLISHED if operation.action == PostBulkAction.PUBLISH else PostStatus.DRAFT
+                changed = [post_id for post_id in targets if state[post_id][1] != new_status]
+                self._set_status(changed, new_status)
+                for post_id in changed:
+                    state[post_id][1] = new_status
+                status_changed.update(changed)
+            elif operation.action == PostBulkAction.DELETE:
+                changed = targets
+                outcome.related_refill_ids.update(related_service.remove_posts(changed))
+                self._delete(changed)
+                for post_id in changed:
+                    outcome.deleted[post_id] = state.pop(post_id)[0]
+            else:
+                table, column_name, mode = TAXONOMY_ACTIONS[operation.action]
+                ids = operation.category_ids if table is post_categories else operation.tag_ids
+                changed = self._change_associations(table, column_name, targets, set(ids), mode)
+                taxonomy_changed.update(changed)
+
+            changed_set = set(changed)
+            for post_id in targets:
+                if operation.action == PostBulkAction.DELETE:
+                    status = "deleted"
+                else:
+                    status = "updated" if post_id in changed_set else "unchanged"
+                self._add_result(outcome, index, post_id, status)
+
+        now_published = {post_id for post_id, (_, status) in state.items() if status == PostStatus.PUBLISHED}
+        hidden = (initially_published - now_published) | set(outcome.deleted)
+        touched = (status_changed | taxonomy_changed) - set(outcome.deleted)
+
+        # Counters: diff of every post that changed status, taxonomy or was deleted
+        counted = status_changed | taxonomy_changed | set(outcome.deleted)
+        if counted:
+            current_states = counter_service.states(counted - set(outcome.deleted))
+            outcome.category_counts_changed, outcome.tag_counts_changed = counter_service.apply(
+                (previous_states[post_id], current_states.get(post_id)) for post_id in counted
+            )
+
+        # Search index follows visibility
+        if status_changed or outcome.deleted:
+            SearchService(self.db).index_posts(list(status_changed | set(outcome.deleted)))
+
+        # Related posts of the changed posts; lists they dropped out of are refilled after the commit
+        outcome.related_refill_ids.update(related_service.refresh_posts(touched | (hidden - set(outcome.deleted))))
+        outcome.related_refill_ids -= set(outcome.deleted)
+
+        outcome.posts = {post_id: (slug, status) for post_id, (slug, status) in state.items()}
+        outcome.changed_ids = touched
+        outcome.visibility_changed = initially_published != now_published
+        return outcome
+
+    def _add_result(self, outcome: PostBulkOutcome, index: int, post_id: int, status: str) -> None:
+        outcome.result.results.append(PostBulkItemResult(operation=index, post_id=post_id, status=status))
+        setattr(outcome.result, status, getattr(outcome.result, status) + 1)
+
+    def _validate_taxonomy(self, operations: Sequence[PostBulkOperation]) -> None:
+        for model, attribute, label in ((Category, "category_ids", "Category"), (Tag, "tag_ids", "Tag")):
+            ids = {i for operation in operations for i in getattr(operation, attribute)}
+            if not ids:
+                continue
+            found = set(self.db.execute(select(model.id).where(model.id.in_(ids))).scalars())
+            missing = sorted(ids - found)
+            if missing:
+                raise ValueError(f"{label} not found: {', '.join(map(str, missing))}")
+
+    def _set_status(self, post_ids: List[int], status: PostStatus) -> None:
+        if status == PostStatus.PUBLISHED:
+            # Keep the original publish date when re-publishing
+            values = {"status": status, "published_at": func.coalesce(Post.published_at, datetime.utcnow())}
+        else:
+            values = {"status": status, "published_at": None}
+        for chunk in _chunks(post_ids):
+            self.db.execute(
+                update(Post).where(Post.id.in_(chunk)).values(**values).execution_options(synchronize_session=False)
+            )
+
+    def _delete(self, post_ids: List[int]) -> None:
+        """記事と、記事を参照する行をまとめて削除する（ページビューは記事IDだけ外して残す）"""
+        for chunk in _chunks(post_ids):
+            for statement in (
+                delete(Like).where(Like.post_id.in_(chunk)),
+                delete(post_categories).where(post_categories.c.post_id.in_(chunk)),
+                delete(post_tags).where(post_tags.c.post_id.in_(chunk)),
+                delete(PopularPost).where(PopularPost.post_id.in_(chunk)),
+                delete(PostRevision).where(PostRevision.post_id.in_(chunk)),
+                update(PageView).where(PageView.post_id.in_(chunk)).values(post_id=None),
+                delete(Post).where(Post.id.in_(chunk)),
+            ):
+                self.db.execute(statement.execution_options(synchronize_session=False))
+
+    def _change_associations(
+        self, table, column_name: str, post_ids: List[int], ids: Set[int], mode: str
+    ) -> Set[int]:
+        """関連テーブルを集合単位で更新し、実際に変わった記事のIDを返す"""
+        if not post_ids:
+            return set()
+        column = table.c[column_name]
+        current: Dict[int, Set[int]] = {post_id: set() for post_id in post_ids}
+        for chunk in _chunks(post_ids):
+            for post_id, other_id in self.db.execute(
+                select(table.c.post_id, column).where(table.c.post_id.in_(chunk))
+            ):
+                current[post_id].add(other_id)
+
+        to_insert = []
+        remove_from: Dict[frozenset, List[int]] = {}
+        changed = set()
+        for post_id, existing in current.items():
+            if mode == "add":
+                added, removed = ids - existing, set()
+            elif mode == "remove":
+                added, removed = set(), existing & ids
+            else:
+                added, removed = ids - existing, existing - ids
+            if added or removed:
+                changed.add(post_id)
+            to_insert.extend({"post_id": post_id, column_name: other_id} for other_id in added)
+            if removed:
+                remove_from.setdefault(frozenset(removed), []).append(post_id)
+
+        # One DELETE per distinct set of removed ids (usually a single statement)
+        for removed, removed_post_ids in remove_from.items():
+            for chunk in _chunks(removed_post_ids):
+                self.db.execute(delete(table).where(table.c.post_id.in_(chunk), column.in_(removed)))
+        if to_insert:
+            self.db.execute(insert(table), to_insert)
+        return changed
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.post import Post, PostStatus, PostStatusCount, post_categories, post_tags
+from app.models.tag import Tag
+
+# IN句に渡すIDの最大数
+ID_CHUNK_SIZE = 1000
+
+
+class PostCounterState(NamedTuple):
+    """カウンタに影響する記事の状態"""
+    status: PostStatus
+    category_ids: FrozenSet[int]
+    tag_ids: FrozenSet[int]
+
+    @classmethod
+    def of(cls, post: Post) -> "PostCounterState":
+        return cls(
+            post.status,
+            frozenset(category.id for category in post.categories),
+            frozenset(tag.id for tag in post.tags)
+        )
+
+
+# (変更前, 変更後)。作成は変更前、削除は変更後が None
+PostCounterChange = Tuple[Optional[PostCounterState], Optional[PostCounterState]]
+
+
+class PostCounterService:
+    """記事数カウンタを管理するサービスクラス
+
+    状態別の記事数（post_status_counts）と、カテゴリ・タグごとの記事数・公開記事数
+    （categories / tags の post_count, published_post_count）を扱う。
+    記事の作成・状態変更・関連付けの変更・削除を行う処理は、同じトランザクションで apply を呼ぶ。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def states(self, post_ids: Iterable[int]) -> Dict[int, PostCounterState]:
+        """記事ごとの現在の状態を読む（存在しない記事は含まない）"""
+        post_ids = list(post_ids)
+        statuses: Dict[int, PostStatus] = {}
+        category_ids: Dict[int, set] = defaultdict(set)
+        tag_ids: Dict[int, set] = defaultdict(set)
+        for start in range(0, len(post_ids), ID_CHUNK_SIZE):
+            chunk = post_ids[start:start + ID_CHUNK_SIZE]
+            statuses.update(self.db.execute(select(Post.id, Post.status).where(Post.id.in_(chunk))).tuples().all())
+            for post_id, category_id in self.db.execute(
+                select(post_categories.c.post_id, post_categories.c.category_id).where(post_categories.c.post_id.in_(chunk))
+            ):
+                category_ids[post_id].add(category_id)
+            for post_id, tag_id in self.db.execute(
+                select(post_tags.c.post_id, post_tags.c.tag_id).where(post_tags.c.post_id.in_(chunk))
+            ):
+                tag_ids[post_id].add(tag_id)
+        return {
+            post_id: PostCounterState(status, frozenset(category_ids[post_id]), frozenset(tag_ids[post_id]))
+            for post_id, status in statuses.items()
+        }
+
+    def apply(self, changes: Iterable[PostCounterChange]) -> Tuple[bool, bool]:
+        """記事の変更をカウンタに反映する。コミットは呼び出し側で行う
+
+        (カテゴリの公開記事数が変わったか, タグの公開記事数が変わったか) を返す（公開APIのキャッシュ無効化用）。
+        """
+        status_deltas: Dict[PostStatus, int] = defaultdict(int)
+        category_deltas: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+        tag_deltas: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+        for before, after in changes:
+            for state, sign in ((before, -1), (after, 1)):
+                if state is None:
+                    continue
+                status_deltas[state.status] += sign
+                published = sign if state.status == PostStatus.PUBLISHED else 0
+                for category_id in state.category_ids:
+                    category_deltas[category_id][0] += sign
+                    category_deltas[category_id][1] += published
+                for tag_id in state.tag_ids:
+                    tag_deltas[tag_id][0] += sign
+                    tag_deltas[tag_id][1] += published
+
+        self.adjust(status_deltas)
+        return (
+            self._adjust_taxonomy(Category, category_deltas),
+            self._adjust_taxonomy(Tag, tag_deltas)
+        )
+
+    def adjust(self, deltas: Mapping[PostStatus, int]) -> None:
+        """状態ごとの増減を反映する。コミットは呼び出し側で行う"""
+        for status, delta in deltas.items():
+            if delta:
+                self.db.execute(
+                    update(PostStatusCount)
+                    .where(PostStatusCount.status == status)
+                    .values(post_count=PostStatusCount.post_count + delta)
+                )
+
+    def _adjust_taxonomy(self, model, deltas: Mapping[int, Sequence[int]]) -> bool:
+        # One UPDATE per distinct (post_count, published_post_count) delta, usually one or two statements
+        by_delta: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for taxonomy_id, (delta, published_delta) in deltas.items():
+            if delta or published_delta:
+                by_delta[(delta, published_delta)].append(taxonomy_id)
+        for (delta, published_delta), ids in by_delta.items():
+            for start in range(0, len(ids), ID_CHUNK_SIZE):
+                self.db.execute(
+                    update(model)
+                    .where(model.id.in_(ids[start:start + ID_CHUNK_SIZE]))
+                    .values(
+                        post_count=model.post_count + delta,
+                        published_post_count=model.published_post_count + published_delta
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+        return any(published_delta for _, published_delta in by_delta)
+
+    def counts(self) -> Dict[str, int]:
+        """状態ごとの記事数 {"draft": n, "published": m}
+
+        カウンタ行が揃っていない場合（マイグレーションを経ずに作ったDBなど）は数え直して保存する。
+        """
+        rows = dict(self.db.execute(select(PostStatusCount.status, PostStatusCount.post_count)).tuples().all())
+        if len(rows) < len(PostStatus):
+            rows = self.recount()
+            self.db.commit()
+        return {status.value: rows.get(status, 0) for status in PostStatus}
+
+    def recount(self) -> Dict[PostStatus, int]:
+        """posts を数え直してすべてのカウンタを作り直し、状態別の記事数を返す。コミットは呼び出し側で行う"""
+        actual = dict(self.db.execute(select(Post.status, func.count(Post.id)).group_by(Post.status)).tuples().all())
+        counts = {status: actual.get(status, 0) for status in PostStatus}
+        self.db.execute(delete(PostStatusCount))
+        self.db.execute(
+            insert(PostStatusCount),
+            [{"status": status, "post_count": count} for status, count in counts.items()]
+        )
+
+        for model, table, column in (
+            (Category, post_categories, post_categories.c.category_id),
+            (Tag, post_tags, post_tags.c.tag_id),
+        ):
+            linked = select(func.count()).select_from(table).where(column == model.id)
+            published = (
+                select(func.count())
+                .select_from(table.join(Post, Post.id == table.c.post_id))
+                .where(column == model.id, Post.status == PostStatus.PUBLISHED)
+            )
+            self.db.execute(
+                update(model)
+                .values(post_count=linked.scalar_subquery(), published_post_count=published.scalar_subquery())
+                .execution_options(synchronize_session=False)
+            )
+        return counts
@@ -0,0 +1,140 @@
+import json
+import zlib
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session, defer
+
+from app.core.config import settings
+from app.models.post import Post
+from app.models.post_revision import PostRevision
+from app.services.markdown_render import content_hash
+
+# 差分の1命令。[start, end] は元の本文の行範囲のコピー、文字列はそのまま挿入
+DeltaOp = Union[List[int], str]
+
+
+def make_delta(source: str, target: str) -> List[DeltaOp]:
+    """source から target を組み立てる行単位の差分"""
+    source_lines = source.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    ops: List[DeltaOp] = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, source_lines, target_lines, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(target_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(source: str, ops: List[DeltaOp]) -> str:
+    source_lines = source.splitlines(keepends=True)
+    return "".join(op if isinstance(op, str) else "".join(source_lines[op[0]:op[1]]) for op in ops)
+
+
+def encode_content(content: str) -> bytes:
+    return zlib.compress(content.encode("utf-8"), 9)
+
+
+def decode_content(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+def encode_delta(source: str, target: str) -> bytes:
+    return zlib.compress(json.dumps(make_delta(source, target), ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def decode_delta(source: str, data: bytes) -> str:
+    return apply_delta(source, json.loads(zlib.decompress(data)))
+
+
+class PostRevisionService:
+    """記事本文の版を保存・復元するサービスクラス
+
+    最新版は常に本文全体を持つ。新しい版を保存するとき、1つ前の版は新しい本文からの逆差分に置き換える
+    （版番号が snapshot_interval の倍数の版は本文全体のまま残す）。
+    任意の版は、それより新しい最寄りの本文全体から逆差分をたどって復元するので、
+    復元に読む行数は snapshot_interval 以下になる。コミットは呼び出し側で行う。
+    """
+
+    def __init__(self, db: Session, snapshot_interval: Optional[int] = None):
+        self.db = db
+        self.snapshot_interval = max(1, snapshot_interval or settings.REVISION_SNAPSHOT_INTERVAL)
+
+    def ensure_initial(self, post: Post) -> None:
+        """版がまだない記事（履歴の導入前からある記事）なら、変更前の本文を最初の版として保存する"""
+        if self._head(post.id) is None:
+            self._add(post.id, 1, post.title, post.content, None)
+
+    def record(self, post: Post, user_id: Optional[int]) -> Optional[PostRevision]:
+        """現在のタイトルと本文を新しい版として保存する。最新版と同じなら何もしない"""
+        head = self._head(post.id)
+        if head is None:
+            return self._add(post.id, 1, post.title, post.content, user_id)
+        if head.title == post.title and head.content_hash == content_hash(post.content):
+            return None
+
+        if head.revision % self.snapshot_interval != 0:
+            # The previous head becomes a reverse delta from the new content
+            head.data = encode_delta(post.content, decode_content(head.data))
+            head.is_snapshot = False
+        return self._add(post.id, head.revision + 1, post.title, post.content, user_id)
+
+    def list(self, post_id: int, limit: int = 50, before: Optional[int] = None) -> List[PostRevision]:
+        """新しい順の版の一覧（data は読まない）"""
+        query = self.db.query(PostRevision).options(defer(PostRevision.data)).filter(PostRevision.post_id == post_id)
+        if before is not None:
+            query = query.filter(PostRevision.revision < before)
+        return query.order_by(PostRevision.revision.desc()).limit(limit).all()
+
+    def get(self, post_id: int, revision: int) -> Optional[Tuple[PostRevision, str]]:
+        """版とその本文。存在しなければ None"""
+        snapshot_revision = self.db.query(func.min(PostRevision.revision)).filter(
+            PostRevision.post_id == post_id,
+            PostRevision.revision >= revision,
+            PostRevision.is_snapshot.is_(True)
+        ).scalar()
+        if snapshot_revision is None:
+            return None
+
+        # Walk back from the nearest full copy, applying one reverse delta per revision
+        rows = self.db.query(PostRevision).filter(
+            PostRevision.post_id == post_id,
+            PostRevision.revision >= revision,
+            PostRevision.revision <= snapshot_revision
+        ).order_by(PostRevision.revision.desc()).all()
+        if rows[-1].revision != revision:
+            return None
+        content = decode_content(rows[0].data)
+        for row in rows[1:]:
+            content = decode_delta(content, row.data)
+        return rows[-1], content
+
+    def remove_post(self, post_id: int) -> None:
+        self.db.execute(delete(PostRevision).where(PostRevision.post_id == post_id))
+
+    def _head(self, post_id: int) -> Optional[PostRevision]:
+        # Lock the head so concurrent saves of one post get consecutive revision numbers
+        return (
+            self.db.query(PostRevision)
+            .filter(PostRevision.post_id == post_id)
+            .order_by(PostRevision.revision.desc())
+            .with_for_update()
+            .first()
+        )
+
+    def _add(self, post_id: int, revision: int, title: str, content: str, user_id: Optional[int]) -> PostRevision:
+        row = PostRevision(
+            post_id=post_id,
+            revision=revision,
+            title=title,
+            is_snapshot=True,
+            data=encode_content(content),
+            content_length=len(content),
+            content_hash=content_hash(content),
+            user_id=user_id
+        )
+        self.db.add(row)
+        self.db.flush()
+        return row
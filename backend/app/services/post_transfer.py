@@ -0,0 +1,189 @@
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterator, List, Sequence, Set, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.image import Image
+from app.models.post import Post, PostStatus, post_categories, post_tags
+from app.models.tag import Tag
+from app.models.user import User
+from app.schemas.post import PostImportItem
+from app.services.markdown_render import content_hash, render_markdown_many, rendered_values
+from app.services.post_counters import PostCounterService
+from app.services.related_posts import RelatedPostsService
+from app.services.search import SearchService
+
+# エクスポートする列（インポートで受け付けない列も参照用に含める）
+EXPORT_COLUMNS = (
+    Post.id, Post.title, Post.slug, Post.content, Post.excerpt, Post.status,
+    Post.user_id, Post.featured_image_id, Post.created_at, Post.updated_at,
+    Post.published_at, Post.likes_count
+)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class PostTransferService:
+    """記事のNDJSON一括エクスポート・インポートを行うサービスクラス"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # Export
+
+    def export_ndjson(self, batch_size: int = 500) -> Iterator[str]:
+        """全記事をカテゴリ・タグのID付きでNDJSONとして出力する（バッチごとに1つの文字列を返す）
+
+        記事本体はサーバーサイドカーソル（yield_per）で読むので、記事数に関係なくメモリ使用量は一定。
+        カーソルを読み切るまで同じ接続で他のクエリを発行できないため、記事本体は別の接続で読む。
+        """
+        with self.db.get_bind().connect() as stream_connection:
+            result = stream_connection.execution_options(yield_per=batch_size).execute(
+                select(*EXPORT_COLUMNS).order_by(Post.id)
+            )
+            for rows in result.partitions():
+                post_ids = [row.id for row in rows]
+                category_ids = self._association_ids(post_categories.c.post_id, post_categories.c.category_id, post_ids)
+                tag_ids = self._association_ids(post_tags.c.post_id, post_tags.c.tag_id, post_ids)
+                yield "".join(
+                    json.dumps(
+                        {
+                            **row._asdict(),
+                            "status": row.status.value,
+                            "category_ids": category_ids.get(row.id, []),
+                            "tag_ids": tag_ids.get(row.id, [])
+                        },
+                        ensure_ascii=False,
+                        default=_json_default
+                    ) + "\n"
+                    for row in rows
+                )
+
+    def _association_ids(self, post_column, other_column, post_ids: Sequence[int]) -> Dict[int, List[int]]:
+        ids: Dict[int, List[int]] = defaultdict(list)
+        for post_id, other_id in self.db.execute(
+            select(post_column, other_column).where(post_column.in_(post_ids)).order_by(post_column, other_column)
+        ):
+            ids[post_id].append(other_id)
+        return ids
+
+    # Import
+
+    def import_batch(self, items: Sequence[PostImportItem], default_user_id: int) -> Tuple[int, int]:
+        """slugをキーに記事をまとめて作成・更新する（1バッチ1トランザクション）。(作成数, 更新数) を返す
+
+        カテゴリ・タグの関連はバッチ内の記事分を削除してから一括で挿入し直す。
+        存在しないユーザー・画像・カテゴリ・タグのIDは無視する（ユーザーはインポートした管理者になる）。
+        検索インデックスと取り込んだ記事自身の関連記事も同じトランザクションで更新する。
+        コミットは呼び出し側で行う。
+        """
+        # The same slug twice in one batch: the later line wins
+        items = list({item.slug: item for item in items}.values())
+        slugs = [item.slug for item in items]
+
+        existing = {
+            row.slug: row for row in self.db.execute(
+                select(Post.id, Post.slug, Post.content_hash, Post.published_at).where(Post.slug.in_(slugs))
+            )
+        }
+        counter_service = PostCounterService(self.db)
+        previous_states = counter_service.states(row.id for row in existing.values())
+        valid_user_ids = self._existing_ids(User.id, {item.user_id for item in items if item.user_id})
+        valid_image_ids = self._existing_ids(
+            Image.id, {item.featured_image_id for item in items if item.featured_image_id}
+        )
+        valid_category_ids = self._existing_ids(Category.id, {i for item in items for i in item.category_ids})
+        valid_tag_ids = self._existing_ids(Tag.id, {i for item in items for i in item.tag_ids})
+
+        # Render only content that changed since the last render
+        to_render = [
+            item for item in items
+            if item.slug not in existing or existing[item.slug].content_hash != content_hash(item.content)
+        ]
+        rendered = dict(zip(
+            (item.slug for item in to_render),
+            render_markdown_many([item.content for item in to_render])
+        ))
+
+        now = datetime.utcnow()
+        inserts = []
+        updates = []
+        for item in items:
+            current = existing.get(item.slug)
+            if item.status == PostStatus.PUBLISHED:
+                published_at = item.published_at or (current.published_at if current else None) or now
+            else:
+                published_at = None
+            values = {
+                "title": item.title,
+                "slug": item.slug,
+                "content": item.content,
+                "excerpt": item.excerpt,
+                "status": item.status,
+                "featured_image_id": item.featured_image_id if item.featured_image_id in valid_image_ids else None,
+                "published_at": published_at,
+                "content_length": len(item.content)
+            }
+            if item.slug in rendered:
+                values.update(rendered_values(item.content, rendered[item.slug]))
+
+            if current:
+                updates.append({"id": current.id, **values})
+            else:
+                user_id = item.user_id if item.user_id in valid_user_ids else default_user_id
+                inserts.append({**values, "user_id": user_id})
+
+        if inserts:
+            self.db.execute(insert(Post), inserts)
+        if updates:
+            # Bulk UPDATE by primary key (one executemany per distinct column set)
+            self.db.execute(update(Post), updates)
+
+        post_ids_by_slug = {slug: row.id for slug, row in existing.items()}
+        if inserts:
+            post_ids_by_slug.update(
+                self.db.execute(
+                    select(Post.slug, Post.id).where(Post.slug.in_([row["slug"] for row in inserts]))
+                ).all()
+            )
+        post_ids = [post_ids_by_slug[item.slug] for item in items]
+
+        # Replace taxonomy associations in bulk
+        self.db.execute(post_categories.delete().where(post_categories.c.post_id.in_(post_ids)))
+        self.db.execute(post_tags.delete().where(post_tags.c.post_id.in_(post_ids)))
+        category_rows = [
+            {"post_id": post_ids_by_slug[item.slug], "category_id": category_id}
+            for item in items for category_id in set(item.category_ids) & valid_category_ids
+        ]
+        tag_rows = [
+            {"post_id": post_ids_by_slug[item.slug], "tag_id": tag_id}
+            for item in items for tag_id in set(item.tag_ids) & valid_tag_ids
+        ]
+        if category_rows:
+            self.db.execute(post_categories.insert(), category_rows)
+        if tag_rows:
+            self.db.execute(post_tags.insert(), tag_rows)
+
+        # Post and taxonomy counters: diff of the batch's posts before and after the import
+        current_states = counter_service.states(post_ids)
+        counter_service.apply(
+            (previous_states.get(post_id), state) for post_id, state in current_states.items()
+        )
+        SearchService(self.db).index_posts(post_ids)
+        # Neighbours of the imported posts are refreshed by rebuild_related_posts.py
+        RelatedPostsService(self.db).recompute(post_ids)
+
+        return len(inserts), len(updates)
+
+    def _existing_ids(self, column, ids: Set[int]) -> Set[int]:
+        if not ids:
+            return set()
+        return set(self.db.execute(select(column).where(column.in_(ids))).scalars())
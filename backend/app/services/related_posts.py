@@ -0,0 +1,349 @@
+import logging
+import math
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from fastapi import BackgroundTasks
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.post import Post, PostStatus, post_categories, post_tags
+from app.models.related_post import RelatedPost
+
+logger = logging.getLogger(__name__)
+
+# Score weights
+CATEGORY_WEIGHT = 3.0
+TAG_WEIGHT = 2.0
+RECENCY_WEIGHT = 1.0
+POPULARITY_WEIGHT = 1.0
+# 新しさスコアが半分になるまでの日数
+RECENCY_HALF_LIFE_DAYS = 90
+# 記事ごとに保存する関連記事数（エンドポイントの limit 上限）
+RELATED_POSTS_PER_POST = 20
+# 一覧の補充をバックグラウンドで再計算するときに1トランザクションで扱う記事数
+REFILL_BATCH_SIZE = 200
+# IN句に渡すIDの最大数
+ID_CHUNK_SIZE = 1000
+
+
+def _chunks(ids: Sequence) -> Iterable[Sequence]:
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        yield ids[start:start + ID_CHUNK_SIZE]
+
+
+def _score(shared_categories: int, shared_tags: int, published_at: datetime, likes_count: int, now: datetime) -> float:
+    age_days = max((now - published_at.replace(tzinfo=None)).total_seconds() / 86400, 0)
+    recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+    popularity = 1 - 1 / (1 + math.log1p(likes_count or 0))
+    return (
+        CATEGORY_WEIGHT * shared_categories
+        + TAG_WEIGHT * shared_tags
+        + RECENCY_WEIGHT * recency
+        + POPULARITY_WEIGHT * popularity
+    )
+
+
+class RelatedPostsService:
+    """関連記事テーブルを管理するサービスクラス
+
+    スコア = カテゴリ共有数 × CATEGORY_WEIGHT + タグ共有数 × TAG_WEIGHT
+           + 新しさ（半減期 RECENCY_HALF_LIFE_DAYS） × RECENCY_WEIGHT
+           + 人気度（いいね数の対数） × POPULARITY_WEIGHT
+    タクソノミーを共有する記事が少ない場合は、新しい記事・人気記事で補完する。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def neighbour_ids(self, post_id: int) -> Set[int]:
+        """カテゴリまたはタグを共有している記事のID"""
+        return self.neighbour_ids_of([post_id])
+
+    def neighbour_ids_of(self, post_ids: Iterable[int]) -> Set[int]:
+        """いずれかの記事とカテゴリまたはタグを共有している記事のID（指定した記事自身は除く）"""
+        post_ids = set(post_ids)
+        if not post_ids:
+            return set()
+        category_ids = self.db.query(post_categories.c.category_id).filter(
+            post_categories.c.post_id.in_(post_ids)
+        )
+        tag_ids = self.db.query(post_tags.c.tag_id).filter(
+            post_tags.c.post_id.in_(post_ids)
+        )
+        ids = {
+            row[0] for row in self.db.query(post_categories.c.post_id).filter(
+                post_categories.c.category_id.in_(category_ids.scalar_subquery())
+            )
+        }
+        ids.update(
+            row[0] for row in self.db.query(post_tags.c.post_id).filter(
+                post_tags.c.tag_id.in_(tag_ids.scalar_subquery())
+            )
+        )
+        return ids - post_ids
+
+    def refresh_post(self, post_id: int) -> Set[int]:
+        """記事の作成・更新・削除・公開状態の変更を関連記事に反映する（refresh_posts() を参照）"""
+        return self.refresh_posts([post_id])
+
+    def refresh_posts(self, post_ids: Iterable[int]) -> Set[int]:
+        """変更した記事の関連記事を再計算し、ほかの記事の関連記事一覧には変更した記事だけを差し込む
+
+        ほかの記事の一覧が変わりうるのは、変更した記事をすでに載せている記事と、変更後にタクソノミーを
+        共有する記事だけなので、保存済みの一覧に変更した記事を加えてスコアを付け直し、上位を取り直す。
+        タクソノミーを共有する候補を全件スコアリングし直すことはしない。一覧から記事が外れて保存済みの上位だけでは
+        埋められなくなった記事のIDを返すので、呼び出し側でコミット後に schedule_related_refill() に渡すこと。
+        コミットは呼び出し側で行う。
+        """
+        post_ids = set(post_ids)
+        if not post_ids:
+            return set()
+        self.recompute(post_ids)
+
+        listing_ids: Set[int] = set()
+        for chunk in _chunks(list(post_ids)):
+            listing_ids.update(self.db.execute(
+                select(RelatedPost.post_id).where(RelatedPost.related_post_id.in_(chunk))
+            ).scalars())
+        neighbour_ids = (listing_ids | self.neighbour_ids_of(post_ids)) - post_ids
+        if not neighbour_ids:
+            return set()
+
+        # Current lists of the neighbours (only published posts have rows)
+        lists: Dict[int, List[Tuple[float, int, int, int]]] = defaultdict(list)
+        for chunk in _chunks(list(neighbour_ids)):
+            for row in self.db.execute(
+                select(
+                    RelatedPost.post_id, RelatedPost.related_post_id, RelatedPost.score,
+                    RelatedPost.shared_categories, RelatedPost.shared_tags
+                ).where(RelatedPost.post_id.in_(chunk))
+            ):
+                lists[row.post_id].append((row.score, row.related_post_id, row.shared_categories, row.shared_tags))
+        if not lists:
+            return set()
+
+        # Every list is rescored at the same time, since stored scores carry the recency of when they were computed
+        listed_ids = {row[1] for rows in lists.values() for row in rows} - post_ids
+        stats: Dict[int, Tuple[datetime, int]] = {}
+        for chunk in _chunks(list(listed_ids | post_ids)):
+            for row in self.db.query(Post.id, Post.published_at, Post.likes_count).filter(
+                Post.id.in_(chunk),
+                Post.status == PostStatus.PUBLISHED,
+                Post.published_at.isnot(None)
+            ):
+                stats[row.id] = (row.published_at, row.likes_count)
+        changed_ids = post_ids & stats.keys()
+        categories_of, tags_of = self._taxonomy(changed_ids | lists.keys())
+
+        now = datetime.utcnow()
+        rewritten: List[int] = []
+        rows_to_insert: List[Dict] = []
+        refill: Set[int] = set()
+        for pid, rows in lists.items():
+            entries = [
+                (_score(shared_categories, shared_tags, *stats[other], now), other, shared_categories, shared_tags)
+                for _, other, shared_categories, shared_tags in rows
+                if other in stats and other not in post_ids
+            ]
+            previous_min = min(entries)[0] if entries else None
+            for other in changed_ids:
+                shared_categories = len(categories_of[pid] & categories_of[other])
+                shared_tags = len(tags_of[pid] & tags_of[other])
+                entries.append((
+                    _score(shared_categories, shared_tags, *stats[other], now), other, shared_categories, shared_tags
+                ))
+            entries.sort(key=lambda entry: (-entry[0], -entry[1]))
+            top = entries[:RELATED_POSTS_PER_POST]
+
+            if not any(row[1] in post_ids for row in rows) and not any(entry[1] in post_ids for entry in top):
+                continue
+            # A full list only ever held its best candidates; once a changed post drops out, the next best may be
+            # a post that is not in the list
+            if len(rows) >= RELATED_POSTS_PER_POST and (
+                len(top) < RELATED_POSTS_PER_POST or (previous_min is not None and top[-1][0] < previous_min)
+            ):
+                refill.add(pid)
+                continue
+            rewritten.append(pid)
+            rows_to_insert.extend(
+                {
+                    "post_id": pid,
+                    "related_post_id": other,
+                    "shared_categories": shared_categories,
+                    "shared_tags": shared_tags,
+                    "score": score
+                }
+                for score, other, shared_categories, shared_tags in top
+            )
+
+        for chunk in _chunks(rewritten):
+            self.db.execute(delete(RelatedPost).where(RelatedPost.post_id.in_(chunk)))
+        if rows_to_insert:
+            self.db.execute(RelatedPost.__table__.insert(), rows_to_insert)
+        return refill
+
+    def remove_posts(self, post_ids: Iterable[int]) -> Set[int]:
+        """削除する記事を関連記事から外す（記事の行を削除する前に呼ぶ）
+
+        外した記事を載せていた記事のIDを返すので、呼び出し側でコミット後に schedule_related_refill() に渡すこと。
+        """
+        post_ids = list(set(post_ids))
+        listing_ids: Set[int] = set()
+        for chunk in _chunks(post_ids):
+            listing_ids.update(self.db.execute(
+                select(RelatedPost.post_id).where(RelatedPost.related_post_id.in_(chunk))
+            ).scalars())
+            self.db.execute(delete(RelatedPost).where(
+                RelatedPost.post_id.in_(chunk) | RelatedPost.related_post_id.in_(chunk)
+            ))
+        return listing_ids - set(post_ids)
+
+    def rebuild(self, batch_size: int = 200) -> int:
+        """全公開記事の関連記事を作り直す。バッチごとにコミットし、処理した記事数を返す"""
+        self.db.query(RelatedPost).delete(synchronize_session=False)
+        self.db.commit()
+
+        post_ids = [
+            row[0] for row in self.db.query(Post.id).filter(
+                Post.status == PostStatus.PUBLISHED,
+                Post.published_at.isnot(None)
+            ).order_by(Post.id)
+        ]
+        for start in range(0, len(post_ids), batch_size):
+            self.recompute(post_ids[start:start + batch_size])
+            self.db.commit()
+        return len(post_ids)
+
+    def recompute(self, post_ids: Iterable[int]) -> None:
+        """指定記事の関連記事行を置き換える"""
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+
+        rows = self.compute(post_ids)
+        self.db.query(RelatedPost).filter(
+            RelatedPost.post_id.in_(post_ids)
+        ).delete(synchronize_session=False)
+        if rows:
+            self.db.execute(RelatedPost.__table__.insert(), rows)
+
+    def compute(self, post_ids: List[int]) -> List[Dict]:
+        """指定記事の関連記事行（related_posts に挿入する辞書）を計算する。DBへの書き込みはしない"""
+        published_ids = {
+            row[0] for row in self.db.query(Post.id).filter(
+                Post.id.in_(post_ids),
+                Post.status == PostStatus.PUBLISHED,
+                Post.published_at.isnot(None)
+            )
+        }
+        if not published_ids:
+            return []
+
+        # Taxonomy of the target posts
+        categories_of, tags_of = self._taxonomy(published_ids)
+
+        # Every post sharing one of those categories/tags
+        all_category_ids = set().union(*categories_of.values())
+        all_tag_ids = set().union(*tags_of.values())
+        posts_in_category: Dict[int, Set[int]] = defaultdict(set)
+        posts_with_tag: Dict[int, Set[int]] = defaultdict(set)
+        if all_category_ids:
+            for pid, category_id in self.db.query(post_categories.c.post_id, post_categories.c.category_id).filter(
+                post_categories.c.category_id.in_(all_category_ids)
+            ):
+                posts_in_category[category_id].add(pid)
+        if all_tag_ids:
+            for pid, tag_id in self.db.query(post_tags.c.post_id, post_tags.c.tag_id).filter(
+                post_tags.c.tag_id.in_(all_tag_ids)
+            ):
+                posts_with_tag[tag_id].add(pid)
+
+        candidate_ids = set().union(*posts_in_category.values(), *posts_with_tag.values())
+
+        # Fillers: latest and most liked posts, for posts with few taxonomy neighbours
+        base_query = self.db.query(Post.id, Post.published_at, Post.likes_count).filter(
+            Post.status == PostStatus.PUBLISHED,
+            Post.published_at.isnot(None)
+        )
+        stats: Dict[int, tuple] = {}
+        for row in base_query.order_by(Post.published_at.desc()).limit(RELATED_POSTS_PER_POST + 1):
+            stats[row.id] = (row.published_at, row.likes_count)
+        for row in base_query.order_by(Post.likes_count.desc()).limit(RELATED_POSTS_PER_POST + 1):
+            stats[row.id] = (row.published_at, row.likes_count)
+        missing = list(candidate_ids - stats.keys())
+        for start in range(0, len(missing), 1000):
+            for row in base_query.filter(Post.id.in_(missing[start:start + 1000])):
+                stats[row.id] = (row.published_at, row.likes_count)
+
+        now = datetime.utcnow()
+        rows = []
+        for pid in published_ids:
+            shared_categories: Dict[int, int] = defaultdict(int)
+            shared_tags: Dict[int, int] = defaultdict(int)
+            for category_id in categories_of[pid]:
+                for other in posts_in_category[category_id]:
+                    shared_categories[other] += 1
+            for tag_id in tags_of[pid]:
+                for other in posts_with_tag[tag_id]:
+                    shared_tags[other] += 1
+
+            scored = []
+            for other, (published_at, likes_count) in stats.items():
+                if other == pid:
+                    continue
+                score = _score(
+                    shared_categories.get(other, 0), shared_tags.get(other, 0), published_at, likes_count, now
+                )
+                scored.append((score, other))
+
+            scored.sort(key=lambda item: (-item[0], -item[1]))
+            for score, other in scored[:RELATED_POSTS_PER_POST]:
+                rows.append({
+                    "post_id": pid,
+                    "related_post_id": other,
+                    "shared_categories": shared_categories.get(other, 0),
+                    "shared_tags": shared_tags.get(other, 0),
+                    "score": score
+                })
+        return rows
+
+    def _taxonomy(self, post_ids: Iterable[int]) -> Tuple[Dict[int, Set[int]], Dict[int, Set[int]]]:
+        """記事ごとのカテゴリID・タグIDの集合"""
+        post_ids = list(post_ids)
+        categories_of: Dict[int, Set[int]] = defaultdict(set)
+        tags_of: Dict[int, Set[int]] = defaultdict(set)
+        for chunk in _chunks(post_ids):
+            for pid, category_id in self.db.query(post_categories.c.post_id, post_categories.c.category_id).filter(
+                post_categories.c.post_id.in_(chunk)
+            ):
+                categories_of[pid].add(category_id)
+            for pid, tag_id in self.db.query(post_tags.c.post_id, post_tags.c.tag_id).filter(
+                post_tags.c.post_id.in_(chunk)
+            ):
+                tags_of[pid].add(tag_id)
+        return categories_of, tags_of
+
+
+def refill_related_posts(post_ids: List[int]) -> None:
+    """関連記事を REFILL_BATCH_SIZE 件ずつ再計算する（バックグラウンドタスク用）"""
+    db = SessionLocal()
+    try:
+        service = RelatedPostsService(db)
+        for start in range(0, len(post_ids), REFILL_BATCH_SIZE):
+            service.recompute(post_ids[start:start + REFILL_BATCH_SIZE])
+            db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Failed to recompute related posts")
+    finally:
+        db.close()
+
+
+def schedule_related_refill(background_tasks: BackgroundTasks, post_ids: Iterable[int]) -> None:
+    """refresh_posts() が返した記事の関連記事を、レスポンス送信後に再計算する"""
+    post_ids = sorted(post_ids)
+    if post_ids:
+        background_tasks.add_task(refill_related_posts, post_ids)
@@ -0,0 +1,272 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from pydantic import TypeAdapter
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+# キー・タグ・管理情報ぶんの概算オーバーヘッド（バイト）
+ENTRY_OVERHEAD = 200
+# 条件付きGETのためにデコレータが追加する引数名
+REQUEST_PARAM = "_conditional_request"
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    tags: Set[str]
+    expires_at: float
+    size: int
+
+
+class ResponseCache:
+    """シリアライズ済みレスポンスのLRUキャッシュ（バイト数上限・TTL・タグ単位の無効化）
+
+    プロセス内キャッシュなので、ワーカーが複数ある場合の整合性はTTLで担保する。
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._tag_index: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        # 無効化のたびに進める。生成中に無効化されたレスポンスは保存しない
+        self.generation = 0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        etag: str,
+        tags: Iterable[str],
+        generation: Optional[int] = None
+    ) -> None:
+        """generation を渡した場合、その後に無効化が起きていれば保存しない"""
+        size = len(key) + len(body) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+
+            entry = CacheEntry(
+                body=body,
+                etag=etag,
+                tags=set(tags),
+                expires_at=time.monotonic() + self.ttl,
+                size=size
+            )
+            self._entries[key] = entry
+            self.current_bytes += size
+            for tag in entry.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+
+            # Evict least recently used entries until within budget
+            while self.current_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, *tags: str) -> None:
+        """指定タグのいずれかが付いたエントリを削除する"""
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                for key in self._tag_index.get(tag, set()).copy():
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._tag_index.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl=settings.RESPONSE_CACHE_TTL
+)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(_normalize(item) for item in value))
+    return value
+
+
+def make_cache_key(name: str, params: Dict[str, Any]) -> str:
+    """エンドポイント名と正規化したパラメータからキャッシュキーを作る"""
+    items = sorted((key, _normalize(value)) for key, value in params.items())
+    return f"{name}:{items!r}"
+
+
+def make_etag(*parts: Any) -> str:
+    """値（またはレスポンスボディ）から強いETagを作る"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else repr(part).encode())
+        digest.update(b"\x00")
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match が etag に一致するか（弱い比較）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag in candidates
+
+
+def _json_response(body: bytes, etag: str) -> Response:
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def cached_response(
+    response_type: Any,
+    tags: Callable[[Any], Iterable[str]],
+    etag: Optional[Callable[[Any], str]] = None,
+    ignore: Iterable[str] = ("db",)
+):
+    """公開GETエンドポイントのJSONレスポンスをキャッシュし、ETagと条件付きGETに対応させるデコレータ
+
+    response_type は @router.get の response_model と同じ型。
+    tags はバリデーション済みのレスポンスを受け取り、無効化用のタグを返す。
+    etag はハンドラの戻り値（ORMオブジェクト）からETagを作る関数で、指定すると
+    If-None-Match が一致した時点でシリアライズせずに304を返す。省略時はボディのハッシュを使う。
+    キャッシュヒット時は保存済みのETagと比較するので、DBにもアクセスしない。
+    ignore に挙げた引数（DBセッションなど）はキーに含めない。
+    """
+    adapter = TypeAdapter(response_type)
+    ignored = set(ignore)
+
+    def key_for(func_name: str, kwargs: Dict[str, Any]) -> str:
+        return make_cache_key(func_name, {k: v for k, v in kwargs.items() if k not in ignored})
+
+    def lookup(key: str, request: Request) -> Optional[Response]:
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return None
+        entry = response_cache.get(key)
+        if entry is None:
+            return None
+        if etag_matches(request, entry.etag):
+            return _not_modified(entry.etag)
+        return _json_response(entry.body, entry.etag)
+
+    def render(key: str, generation: int, request: Request, result: Any) -> Response:
+        if isinstance(result, Response):
+            return result
+
+        result_etag = etag(result) if etag else None
+        if result_etag and etag_matches(request, result_etag):
+            return _not_modified(result_etag)
+
+        value = adapter.validate_python(result, from_attributes=True)
+        body = adapter.dump_json(value)
+        result_etag = result_etag or make_etag(body)
+        if settings.RESPONSE_CACHE_ENABLED:
+            response_cache.set(key, body, result_etag, tags(value), generation=generation)
+
+        if etag_matches(request, result_etag):
+            return _not_modified(result_etag)
+        return _json_response(body, result_etag)
+
+    def decorator(func):
+        name = func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(**kwargs):
+                request = kwargs.pop(REQUEST_PARAM)
+                key = key_for(name, kwargs)
+                hit = lookup(key, request)
+                if hit is not None:
+                    return hit
+                generation = response_cache.generation
+                return render(key, generation, request, await func(**kwargs))
+        else:
+            @functools.wraps(func)
+            def wrapper(**kwargs):
+                request = kwargs.pop(REQUEST_PARAM)
+                key = key_for(name, kwargs)
+                hit = lookup(key, request)
+                if hit is not None:
+                    return hit
+                generation = response_cache.generation
+                return render(key, generation, request, func(**kwargs))
+
+        # Let FastAPI inject the Request alongside the handler's own parameters
+        signature = inspect.signature(func)
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter(REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+        ])
+        return wrapper
+
+    return decorator
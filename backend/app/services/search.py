@@ -0,0 +1,302 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app.models.post import Post, PostStatus
+from app.models.search import SearchPosting, SearchDocument
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# タイトル中の出現を本文の何倍として扱うか
+TITLE_WEIGHT = 3.0
+
+MAX_TERM_LENGTH = 64
+# IN句1回あたりのID数
+ID_CHUNK_SIZE = 1000
+# 候補数×この値が語の出現文書数以上なら、候補ごとの主キー検索ではなく語のポスティングを全件読む
+FULL_SCAN_RATIO = 4
+
+# ひらがな・カタカナ・CJK統合漢字（拡張A、互換漢字を含む）
+_CJK_CHARS = r"\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3005\u3006"
+_CJK_RE = re.compile(f"[{_CJK_CHARS}]")
+_TOKEN_RE = re.compile(f"[{_CJK_CHARS}]+|[0-9a-z\u00c0-\u024f]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """テキストを検索語に分割する
+
+    NFKC正規化・小文字化した上で、日本語の連続部分は文字バイグラムに、
+    英数字の連続部分は単語として切り出す。1文字だけの日本語はそのまま1語とする。
+    """
+    if not text:
+        return []
+
+    text = unicodedata.normalize("NFKC", text).lower()
+    tokens = []
+    for match in _TOKEN_RE.finditer(text):
+        run = match.group()
+        if not _CJK_RE.match(run):
+            tokens.append(run[:MAX_TERM_LENGTH])
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def query_terms(q: Optional[str]) -> Optional[Set[str]]:
+    """検索クエリの検索語。インデックスで扱えない場合は None
+
+    1文字の語（日本語1文字・英数字1文字）は、文書側のバイグラムの後ろ側の文字や単語の途中にも
+    現れうるのでインデックスでは引けない。その場合は部分一致検索にフォールバックさせる。
+    """
+    terms = set(tokenize(q))
+    if not terms or any(len(term) < 2 for term in terms):
+        return None
+    return terms
+
+
+def _term_condition(term: str):
+    # 英数字の語は前方一致（入力途中の "java" でも "javascript" に当たるように）、日本語のバイグラムは完全一致
+    if _CJK_RE.match(term):
+        return SearchPosting.term == term
+    return SearchPosting.term.like(f"{term}%")
+
+
+def _chunks(ids: Sequence[int]) -> Iterable[Sequence[int]]:
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        yield ids[start:start + ID_CHUNK_SIZE]
+
+
+class SearchService:
+    """記事の全文検索インデックス（文字バイグラム＋英単語、BM25ランキング）を管理するサービスクラス
+
+    公開中の記事だけをインデックスに載せる。英数字の検索語は索引語への前方一致で引く。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # Indexing
+
+    def index_post(self, post: Post) -> None:
+        """記事のインデックスを作り直す（非公開なら削除のみ）。コミットは呼び出し側で行う"""
+        self.remove_post(post.id)
+        if post.status == PostStatus.PUBLISHED and post.published_at is not None:
+            self._insert_documents([(post.id, post.title, post.content)])
+
+    def remove_post(self, post_id: int) -> None:
+        self.db.query(SearchPosting).filter(SearchPosting.post_id == post_id).delete(synchronize_session=False)
+        self.db.query(SearchDocument).filter(SearchDocument.post_id == post_id).delete(synchronize_session=False)
+
+    def index_posts(self, post_ids: Sequence[int]) -> None:
+        """複数記事のインデックスをまとめて作り直す（一括インポート用）。コミットは呼び出し側で行う"""
+        for chunk in _chunks(list(post_ids)):
+            self.db.query(SearchPosting).filter(SearchPosting.post_id.in_(chunk)).delete(synchronize_session=False)
+            self.db.query(SearchDocument).filter(SearchDocument.post_id.in_(chunk)).delete(synchronize_session=False)
+            rows = self.db.query(Post.id, Post.title, Post.content).filter(
+                Post.id.in_(chunk),
+                Post.status == PostStatus.PUBLISHED,
+                Post.published_at.isnot(None)
+            ).all()
+            self._insert_documents(rows)
+
+    def rebuild(self, batch_size: int = 500) -> int:
+        """インデックスを全件作り直す。バッチごとにコミットし、インデックスした記事数を返す
+
+        全体を先に消さず、記事IDの範囲ごとに古いエントリの削除と再登録を1トランザクションで行うので、
+        稼働中に実行しても検索結果が空にならない（各記事は古いエントリか新しいエントリのどちらかで引ける）。
+        """
+        indexed = 0
+        last_id = 0
+        while True:
+            rows = (
+                self.db.query(Post.id, Post.title, Post.content)
+                .filter(
+                    Post.id > last_id,
+                    Post.status == PostStatus.PUBLISHED,
+                    Post.published_at.isnot(None)
+                )
+                .order_by(Post.id)
+                .limit(batch_size)
+                .all()
+            )
+            # The range also covers unpublished posts between the batch's ids; the last range is open-ended
+            upper_id = rows[-1].id if rows else None
+            self._remove_range(last_id, upper_id)
+            self._insert_documents(rows)
+            self.db.commit()
+            if not rows:
+                break
+            indexed += len(rows)
+            last_id = upper_id
+
+        return indexed
+
+    def _remove_range(self, after_id: int, upper_id: Optional[int]) -> None:
+        """after_id より大きく upper_id 以下（None なら上限なし）の記事のエントリを削除する"""
+        for model in (SearchPosting, SearchDocument):
+            query = self.db.query(model).filter(model.post_id > after_id)
+            if upper_id is not None:
+                query = query.filter(model.post_id <= upper_id)
+            query.delete(synchronize_session=False)
+
+    def _insert_documents(self, rows: Iterable[Tuple[int, str, str]]) -> None:
+        postings = []
+        documents = []
+        for post_id, title, content in rows:
+            title_tokens = tokenize(title)
+            content_tokens = tokenize(content)
+            title_tf = Counter(title_tokens)
+            content_tf = Counter(content_tokens)
+            for term in title_tf.keys() | content_tf.keys():
+                postings.append({
+                    "term": term,
+                    "post_id": post_id,
+                    "title_tf": title_tf.get(term, 0),
+                    "content_tf": content_tf.get(term, 0)
+                })
+            documents.append({
+                "post_id": post_id,
+                "title_length": len(title_tokens),
+                "content_length": len(content_tokens)
+            })
+
+        if postings:
+            self.db.execute(SearchPosting.__table__.insert(), postings)
+        if documents:
+            self.db.execute(SearchDocument.__table__.insert(), documents)
+
+    # Querying
+
+    @staticmethod
+    def match_condition(q: str):
+        """検索語をすべて含む記事に絞り込む Post の条件（検索語ごとのポスティングへのサブクエリ）
+
+        一致する記事IDをアプリ側に集めてIN句に並べないので、よく出る語でも条件の大きさは変わらない。
+        インデックスで扱えない検索語（記号のみ・1文字の語など）の場合は None を返すので、
+        呼び出し側で従来の部分一致検索にフォールバックすること。
+        """
+        terms = query_terms(q)
+        if terms is None:
+            return None
+        return and_(*(
+            Post.id.in_(select(SearchPosting.post_id).where(_term_condition(term)))
+            for term in sorted(terms)
+        ))
+
+    def search(self, q: str, limit: int = 10, offset: int = 0) -> Optional[List[int]]:
+        """BM25スコア順に記事IDを返す（タイトル中の出現を重み付け）
+
+        扱えない検索語の場合は None を返す。
+        """
+        terms = query_terms(q)
+        if terms is None:
+            return None
+
+        candidates, document_frequency = self._collect_postings(terms)
+        if not candidates:
+            return []
+
+        total_docs, avg_title_length, avg_content_length = self.db.query(
+            func.count(SearchDocument.post_id),
+            func.avg(SearchDocument.title_length),
+            func.avg(SearchDocument.content_length)
+        ).one()
+        avg_title_length = max(float(avg_title_length or 0), 1.0)
+        avg_content_length = max(float(avg_content_length or 0), 1.0)
+
+        idf = {
+            term: math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+        lengths: Dict[int, Tuple[int, int]] = {}
+        for chunk in _chunks(list(candidates)):
+            for row in self.db.query(
+                SearchDocument.post_id,
+                SearchDocument.title_length,
+                SearchDocument.content_length
+            ).filter(SearchDocument.post_id.in_(chunk)):
+                lengths[row.post_id] = (row.title_length, row.content_length)
+
+        scores = []
+        for post_id, term_freqs in candidates.items():
+            title_length, content_length = lengths.get(post_id, (0, 0))
+            title_norm = (1 - BM25_B) + BM25_B * title_length / avg_title_length
+            content_norm = (1 - BM25_B) + BM25_B * content_length / avg_content_length
+            score = 0.0
+            for term, (title_tf, content_tf) in term_freqs.items():
+                weighted_tf = TITLE_WEIGHT * title_tf / title_norm + content_tf / content_norm
+                score += idf[term] * weighted_tf * (BM25_K1 + 1) / (BM25_K1 + weighted_tf)
+            scores.append((score, post_id))
+
+        # Highest score first, newer post first on ties
+        scores.sort(key=lambda item: (-item[0], -item[1]))
+        return [post_id for _, post_id in scores[offset:offset + limit]]
+
+    def _collect_postings(
+        self, terms: Set[str]
+    ) -> Tuple[Dict[int, Dict[str, Tuple[int, int]]], Dict[str, int]]:
+        """全検索語を含む記事について、語ごとの (title_tf, content_tf) を集める
+
+        前方一致で複数の索引語に当たる検索語は、索引語ごとの出現回数を合計する。
+        出現文書数の少ない語から順に候補を絞り込み、以降の語は候補記事だけを主キーで引く。
+        """
+        exact_terms = {term for term in terms if _CJK_RE.match(term)}
+        document_frequency: Dict[str, int] = {}
+        if exact_terms:
+            document_frequency.update(
+                self.db.query(SearchPosting.term, func.count(SearchPosting.post_id))
+                .filter(SearchPosting.term.in_(exact_terms))
+                .group_by(SearchPosting.term)
+                .all()
+            )
+        for term in terms - exact_terms:
+            count = self.db.query(func.count(func.distinct(SearchPosting.post_id))).filter(
+                _term_condition(term)
+            ).scalar()
+            if count:
+                document_frequency[term] = count
+        if len(document_frequency) < len(terms):
+            return {}, document_frequency
+
+        ordered_terms = sorted(terms, key=lambda term: document_frequency[term])
+        postings_query = self.db.query(SearchPosting.post_id, SearchPosting.title_tf, SearchPosting.content_tf)
+
+        candidates: Dict[int, Dict[str, Tuple[int, int]]] = {}
+        for post_id, title_tf, content_tf in postings_query.filter(_term_condition(ordered_terms[0])):
+            _add_tf(candidates.setdefault(post_id, {}), ordered_terms[0], title_tf, content_tf)
+
+        for term in ordered_terms[1:]:
+            if not candidates:
+                break
+            if len(candidates) * FULL_SCAN_RATIO >= document_frequency[term]:
+                # Few postings relative to the candidates: one range scan beats point lookups
+                batches = [postings_query.filter(_term_condition(term))]
+            else:
+                batches = [
+                    postings_query.filter(_term_condition(term), SearchPosting.post_id.in_(chunk))
+                    for chunk in _chunks(list(candidates))
+                ]
+            matched: Dict[int, Dict[str, Tuple[int, int]]] = {}
+            for batch in batches:
+                for post_id, title_tf, content_tf in batch:
+                    term_freqs = candidates.get(post_id)
+                    if term_freqs is not None:
+                        _add_tf(term_freqs, term, title_tf, content_tf)
+                        matched[post_id] = term_freqs
+            candidates = matched
+
+        return candidates, document_frequency
+
+
+def _add_tf(term_freqs: Dict[str, Tuple[int, int]], term: str, title_tf: int, content_tf: int) -> None:
+    previous_title_tf, previous_content_tf = term_freqs.get(term, (0, 0))
+    term_freqs[term] = (previous_title_tf + title_tf, previous_content_tf + content_tf)
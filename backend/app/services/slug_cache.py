@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.post import Post, PostStatus
+
+# キャッシュに無いことを表す（None は「存在しないslug」の否定キャッシュ）
+_MISS = object()
+
+
+@dataclass(frozen=True)
+class SlugEntry:
+    post_id: int
+    status: PostStatus
+
+    @property
+    def is_published(self) -> bool:
+        return self.status == PostStatus.PUBLISHED
+
+
+class SlugCache:
+    """slug → (記事ID, 公開状態) の対応表（件数上限つきLRU・存在しないslugの否定キャッシュ）
+
+    管理画面での作成・更新・削除時に set / discard で更新する。変更のたびに version を進め、
+    DB参照中に変更があった場合はその結果を保存しない。
+    プロセス内キャッシュなので、ワーカーが複数ある場合の整合性はTTLで担保する。
+    """
+
+    def __init__(self, max_entries: int, ttl: float, negative_max_entries: int, negative_ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_max_entries = negative_max_entries
+        self.negative_ttl = negative_ttl
+
+        self._entries: "OrderedDict[str, Tuple[SlugEntry, float]]" = OrderedDict()
+        self._negative: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = 0
+
+        # Counters
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    # Lookup
+
+    def resolve(self, db: Session, slug: str) -> Optional[SlugEntry]:
+        """slugに対応する記事を返す。存在しなければ None"""
+        entry = self._get(slug)
+        if entry is not _MISS:
+            return entry
+        version = self.version
+        row = db.query(Post.id, Post.status).filter(Post.slug == slug).first()
+        return self._store(slug, SlugEntry(row.id, row.status) if row else None, version)
+
+    async def resolve_async(self, db: AsyncSession, slug: str) -> Optional[SlugEntry]:
+        """resolve の非同期セッション版"""
+        entry = self._get(slug)
+        if entry is not _MISS:
+            return entry
+        version = self.version
+        row = (await db.execute(select(Post.id, Post.status).where(Post.slug == slug))).first()
+        return self._store(slug, SlugEntry(row.id, row.status) if row else None, version)
+
+    async def load(self, db: AsyncSession) -> int:
+        """起動時に新しい記事から max_entries 件を読み込む。読み込んだ件数を返す"""
+        version = self.version
+        rows = (await db.execute(
+            select(Post.slug, Post.id, Post.status).order_by(Post.id.desc()).limit(self.max_entries)
+        )).all()
+        # Oldest first so the newest posts end up most recently used
+        for row in reversed(rows):
+            self._store(row.slug, SlugEntry(row.id, row.status), version)
+        return len(rows)
+
+    # Maintenance (call after the admin transaction commits)
+
+    def set(self, slug: str, post_id: int, status: PostStatus) -> None:
+        with self._lock:
+            self.version += 1
+            self._negative.pop(slug, None)
+            self._put(slug, SlugEntry(post_id, status))
+
+    def discard(self, *slugs: str) -> None:
+        with self._lock:
+            self.version += 1
+            for slug in slugs:
+                self._entries.pop(slug, None)
+                self._negative.pop(slug, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._negative.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "negative_entries": len(self._negative),
+                "max_entries": self.max_entries,
+                "version": self.version,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses
+            }
+
+    def _get(self, slug: str):
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(slug)
+            if item is not None:
+                entry, expires_at = item
+                if expires_at > now:
+                    self._entries.move_to_end(slug)
+                    self.hits += 1
+                    return entry
+                del self._entries[slug]
+
+            expires_at = self._negative.get(slug)
+            if expires_at is not None:
+                if expires_at > now:
+                    self.negative_hits += 1
+                    return None
+                del self._negative[slug]
+
+            self.misses += 1
+            return _MISS
+
+    def _store(self, slug: str, entry: Optional[SlugEntry], version: int) -> Optional[SlugEntry]:
+        with self._lock:
+            if version == self.version:
+                if entry is not None:
+                    self._put(slug, entry)
+                else:
+                    self._negative[slug] = time.monotonic() + self.negative_ttl
+                    self._negative.move_to_end(slug)
+                    while len(self._negative) > self.negative_max_entries:
+                        self._negative.popitem(last=False)
+        return entry
+
+    def _put(self, slug: str, entry: SlugEntry) -> None:
+        self._entries[slug] = (entry, time.monotonic() + self.ttl)
+        self._entries.move_to_end(slug)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+slug_cache = SlugCache(
+    max_entries=settings.SLUG_CACHE_MAX_ENTRIES,
+    ttl=settings.SLUG_CACHE_TTL,
+    negative_max_entries=settings.SLUG_CACHE_NEGATIVE_MAX_ENTRIES,
+    negative_ttl=settings.SLUG_CACHE_NEGATIVE_TTL
+)
@@ -0,0 +1,328 @@
+import fcntl
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from fastapi import BackgroundTasks
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.loaders import post_response_options, post_summary_options
+from app.db.session import SessionLocal
+from app.models.category import Category as CategoryModel
+from app.models.post import Post as PostModel, PostStatus
+from app.models.tag import Tag as TagModel
+from app.schemas.category import CategoryWithCount
+from app.schemas.post import Post, PostList, PostSummary
+from app.schemas.tag import TagWithCount
+
+logger = logging.getLogger(__name__)
+
+# 一覧ページの件数（GET /api/posts/ の per_page の既定値と同じ）
+SNAPSHOT_PER_PAGE = 10
+MANIFEST_NAME = ".manifest.json"
+# Post ids on each list page as last written, to find the pages a change touches
+LAYOUT_NAME = ".lists.json"
+LOCK_NAME = ".lock"
+
+# Counters that change without an admin write would go stale in the files; clients fetch them from the API
+# (GET /api/posts/{slug}/likes, or GET /api/posts/likes?ids=... for the cards of a list page)
+VOLATILE_POST_FIELDS = {"likes_count"}
+
+_post_adapter = TypeAdapter(Post)
+_post_list_adapter = TypeAdapter(PostList)
+_category_list_adapter = TypeAdapter(List[CategoryWithCount])
+_tag_list_adapter = TypeAdapter(List[TagWithCount])
+
+
+@dataclass
+class SnapshotResult:
+    written: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+
+def post_path(slug: str) -> Optional[str]:
+    """記事JSONのパス。ファイル名にできないslugは None（nginx はバックエンドに回す）"""
+    if "/" in slug or "\0" in slug or slug.startswith(".") or len(slug.encode("utf-8")) > 240:
+        return None
+    return f"posts/{slug}.json"
+
+
+def list_page_path(page: int) -> str:
+    return f"lists/posts/page-{page}.json"
+
+
+class SnapshotService:
+    """公開APIの匿名アクセス向けレスポンスを静的ファイル（.json と .json.gz）に書き出すサービスクラス
+
+    出力先は nginx が直接配信するディレクトリ（SNAPSHOT_DIR）。各ファイルは一時ファイルに書いてから
+    rename で置き換えるので、配信中に書きかけのファイルが見えることはない。
+    書き出したファイルの内容ハッシュを .manifest.json に記録し、内容が変わったファイルだけを書き直す。
+    """
+
+    def __init__(self, db: Session, root: Optional[str] = None):
+        self.db = db
+        self.root = Path(root or settings.SNAPSHOT_DIR)
+
+    def export_all(self) -> SnapshotResult:
+        """公開記事・一覧ページ・カテゴリ・タグをすべて書き出し、不要になったファイルを削除する"""
+        with self._locked() as manifest:
+            result = SnapshotResult()
+            produced = set()
+            for post in self._published_posts():
+                produced.update(self._write_post(manifest, result, post))
+            layout = self._list_layout()
+            produced.update(self._write_lists(manifest, result, layout, range(len(layout))))
+            produced.update(self._write_taxonomies(manifest, result))
+            for path in set(manifest) - produced:
+                self._remove(manifest, result, path)
+            self._save_layout(layout)
+            return result
+
+    def export_posts(
+        self,
+        post_ids: Iterable[int],
+        removed_slugs: Sequence[str] = (),
+        taxonomies: bool = False
+    ) -> SnapshotResult:
+        """指定した記事と、影響のある一覧ページだけを書き出す（管理画面での変更後に使う）
+
+        公開されていない記事・removed_slugs（変更前のslugや削除した記事）のファイルは削除する。
+        一覧ページは、指定した記事が載っているページと、載っている記事IDの並びが変わったページだけを書き直す。
+        ただし公開記事数が変わったときは、全ページの total が変わるので全ページを書き直す。
+        カテゴリ・タグ一覧は taxonomies が真（公開記事数や名前が変わった）のときだけ書き出す。
+        """
+        post_ids = list(post_ids)
+        with self._locked() as manifest:
+            result = SnapshotResult()
+            for slug in removed_slugs:
+                path = post_path(slug)
+                if path:
+                    self._remove(manifest, result, path)
+            if post_ids:
+                posts = (
+                    self.db.query(PostModel)
+                    .options(*post_response_options())
+                    .filter(PostModel.id.in_(post_ids))
+                    .all()
+                )
+                for post in posts:
+                    if post.status == PostStatus.PUBLISHED:
+                        self._write_post(manifest, result, post)
+                    elif post_path(post.slug):
+                        self._remove(manifest, result, post_path(post.slug))
+
+            layout = self._list_layout()
+            previous = self._load_layout()
+            if previous is None or sum(map(len, previous)) != sum(map(len, layout)):
+                pages = range(len(layout))
+            else:
+                changed = set(post_ids)
+                pages = [
+                    index for index, ids in enumerate(layout)
+                    if index >= len(previous) or ids != previous[index] or changed.intersection(ids)
+                ]
+            self._write_lists(manifest, result, layout, pages)
+            # Trailing list pages that no longer exist
+            current = {list_page_path(index + 1) for index in range(len(layout))}
+            for path in [p for p in manifest if p.startswith("lists/posts/") and p not in current]:
+                self._remove(manifest, result, path)
+            if taxonomies:
+                self._write_taxonomies(manifest, result)
+            self._save_layout(layout)
+            return result
+
+    # Sources
+
+    def _published_posts(self, batch_size: int = 200):
+        last_key = None
+        while True:
+            query = (
+                self.db.query(PostModel)
+                .options(*post_response_options())
+                .filter(PostModel.status == PostStatus.PUBLISHED)
+                .order_by(PostModel.id)
+            )
+            if last_key is not None:
+                query = query.filter(PostModel.id > last_key)
+            posts = query.limit(batch_size).all()
+            if not posts:
+                return
+            yield from posts
+            last_key = posts[-1].id
+            # Release the batch before loading the next one
+            self.db.expunge_all()
+
+    def _list_layout(self) -> List[List[int]]:
+        """GET /api/posts/ の既定の並び順（published_at, id の降順）での、ページごとの記事ID（記事がなくても1ページ）"""
+        ids = [
+            row[0] for row in self.db.query(PostModel.id).filter(
+                PostModel.status == PostStatus.PUBLISHED,
+                PostModel.published_at.isnot(None)
+            ).order_by(PostModel.published_at.desc(), PostModel.id.desc())
+        ]
+        return [ids[start:start + SNAPSHOT_PER_PAGE] for start in range(0, len(ids), SNAPSHOT_PER_PAGE)] or [[]]
+
+    def _write_post(self, manifest: Dict[str, str], result: SnapshotResult, post: PostModel) -> List[str]:
+        path = post_path(post.slug)
+        if path is None:
+            return []
+        body = _post_adapter.dump_json(Post.model_validate(post), exclude=VOLATILE_POST_FIELDS)
+        self._write(manifest, result, path, body)
+        return [path]
+
+    def _write_lists(
+        self,
+        manifest: Dict[str, str],
+        result: SnapshotResult,
+        layout: List[List[int]],
+        pages: Iterable[int]
+    ) -> List[str]:
+        """GET /api/posts/?page=N（既定の並び順・件数）のうち、pages（0始まり）のページを書き出す"""
+        total = sum(map(len, layout))
+        page_count = (total + SNAPSHOT_PER_PAGE - 1) // SNAPSHOT_PER_PAGE
+        produced = []
+        for index in pages:
+            ids = layout[index]
+            position = {post_id: i for i, post_id in enumerate(ids)}
+            posts = sorted(
+                self.db.query(PostModel).options(*post_summary_options()).filter(PostModel.id.in_(ids)).all(),
+                key=lambda post: position[post.id]
+            ) if ids else []
+            body = _post_list_adapter.dump_json(PostList(
+                posts=[PostSummary.model_validate(post) for post in posts],
+                total=total,
+                page=index + 1,
+                per_page=SNAPSHOT_PER_PAGE,
+                pages=page_count
+            ), exclude={"posts": {"__all__": VOLATILE_POST_FIELDS}})
+            path = list_page_path(index + 1)
+            self._write(manifest, result, path, body)
+            produced.append(path)
+            self.db.expunge_all()
+        return produced
+
+    def _write_taxonomies(self, manifest: Dict[str, str], result: SnapshotResult) -> List[str]:
+        """カテゴリ一覧・タグ一覧を書き出す"""
+        categories = self.db.query(CategoryModel).order_by(CategoryModel.name).all()
+        self._write(manifest, result, "categories.json", _category_list_adapter.dump_json(
+            _category_list_adapter.validate_python(categories, from_attributes=True)
+        ))
+        tags = self.db.query(TagModel).order_by(TagModel.name).all()
+        self._write(manifest, result, "tags.json", _tag_list_adapter.dump_json(_tag_list_adapter.validate_python(tags, from_attributes=True)))
+        return ["categories.json", "tags.json"]
+
+    # Files
+
+    @contextmanager
+    def _locked(self):
+        """書き出しを（プロセスをまたいで）直列化し、マニフェストを読み込んで終了時に保存する"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / LOCK_NAME, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                manifest_path = self.root / MANIFEST_NAME
+                try:
+                    manifest = json.loads(manifest_path.read_text())
+                except (FileNotFoundError, ValueError):
+                    manifest = {}
+                try:
+                    yield manifest
+                finally:
+                    self._replace(manifest_path, json.dumps(manifest, sort_keys=True).encode("utf-8"))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_layout(self) -> Optional[List[List[int]]]:
+        try:
+            return json.loads((self.root / LAYOUT_NAME).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_layout(self, layout: List[List[int]]) -> None:
+        self._replace(self.root / LAYOUT_NAME, json.dumps(layout).encode("utf-8"))
+
+    def _write(self, manifest: Dict[str, str], result: SnapshotResult, path: str, body: bytes) -> None:
+        digest = hashlib.sha256(body).hexdigest()
+        target = self.root / path
+        if manifest.get(path) == digest and target.exists():
+            result.unchanged += 1
+            return
+        # mtime=0 keeps the compressed bytes stable for identical content
+        self._replace(target.with_name(target.name + ".gz"), gzip.compress(body, mtime=0))
+        self._replace(target, body)
+        manifest[path] = digest
+        result.written += 1
+
+    def _remove(self, manifest: Dict[str, str], result: SnapshotResult, path: str) -> None:
+        target = self.root / path
+        existed = manifest.pop(path, None) is not None
+        for file in (target, target.with_name(target.name + ".gz")):
+            try:
+                file.unlink()
+                existed = True
+            except FileNotFoundError:
+                pass
+        if existed:
+            result.removed += 1
+
+    @staticmethod
+    def _replace(target: Path, data: bytes) -> None:
+        """一時ファイルに書いてから rename で置き換える（同じディレクトリ内なのでアトミック）"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+
+def export_snapshot(
+    post_ids: Optional[Iterable[int]] = None,
+    removed_slugs: Sequence[str] = (),
+    taxonomies: bool = False
+) -> None:
+    """管理画面での変更後にバックグラウンドで実行する。post_ids が None なら全体を書き出す"""
+    db = SessionLocal()
+    try:
+        service = SnapshotService(db)
+        if post_ids is None:
+            service.export_all()
+        else:
+            service.export_posts(post_ids, removed_slugs, taxonomies)
+    except Exception:
+        logger.exception("Failed to export snapshot")
+    finally:
+        db.close()
+
+
+def schedule_snapshot_export(
+    background_tasks: BackgroundTasks,
+    post_ids: Optional[Iterable[int]] = None,
+    removed_slugs: Sequence[str] = (),
+    taxonomies: bool = False
+) -> None:
+    """SNAPSHOT_ENABLED のとき、レスポンス送信後にスナップショットを更新する
+
+    カテゴリ・タグの公開記事数や名前が変わったときは taxonomies=True を渡す（一覧を書き直す）。
+    """
+    if settings.SNAPSHOT_ENABLED:
+        background_tasks.add_task(
+            export_snapshot, list(post_ids) if post_ids is not None else None, list(removed_slugs), taxonomies
+        )
@@ -0,0 +1,110 @@
+"""
+管理画面の一括操作のベンチマーク（記事ごとのAPI呼び出し vs 一括操作エンドポイント）
+使用方法: python benchmark_bulk_admin.py --base-url http://localhost:8000 --username admin --password secret
+         （ログインの代わりに --token でアクセストークンを直接指定してもよい）
+
+計測用の下書き記事を作成して公開・タグ付け・非公開・削除を行うので、必ずベンチマーク専用の環境で実行すること。
+計測対象のサーバーは別途起動しておく。
+"""
+import argparse
+import time
+import uuid
+
+import httpx
+
+
+def create_posts(client: httpx.Client, count: int, prefix: str, tag_id: int):
+    ids = []
+    for i in range(count):
+        response = client.post("/api/admin/posts", json={
+            "title": f"Benchmark {prefix} {i}",
+            "slug": f"bench-{prefix}-{i}",
+            "content": "Benchmark post body",
+            "status": "draft",
+            "tag_ids": [tag_id]
+        })
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    return ids
+
+
+def per_item(client: httpx.Client, post_ids, tag_ids):
+    """既存のAPIで1記事ずつ公開・タグ付け → 非公開 → 削除する"""
+    timings = {}
+    started = time.perf_counter()
+    for post_id in post_ids:
+        client.put(f"/api/admin/posts/{post_id}", json={"status": "published", "tag_ids": tag_ids}).raise_for_status()
+    timings["publish + tag"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for post_id in post_ids:
+        client.put(f"/api/admin/posts/{post_id}", json={"status": "draft"}).raise_for_status()
+    timings["unpublish"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for post_id in post_ids:
+        client.delete(f"/api/admin/posts/{post_id}").raise_for_status()
+    timings["delete"] = time.perf_counter() - started
+    return timings
+
+
+def bulk(client: httpx.Client, post_ids, tag_ids):
+    """一括操作エンドポイントで同じ操作を行う"""
+    timings = {}
+    steps = [
+        ("publish + tag", [
+            {"action": "publish", "post_ids": post_ids},
+            {"action": "set_tags", "post_ids": post_ids, "tag_ids": tag_ids},
+        ]),
+        ("unpublish", [{"action": "unpublish", "post_ids": post_ids}]),
+        ("delete", [{"action": "delete", "post_ids": post_ids}]),
+    ]
+    for name, operations in steps:
+        started = time.perf_counter()
+        client.post("/api/admin/posts/bulk", json={"operations": operations}).raise_for_status()
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def run(base_url: str, username: str, password: str, token: str, count: int):
+    with httpx.Client(base_url=base_url, timeout=300.0) as client:
+        if not token:
+            response = client.post("/api/auth/login", json={"username": username, "password": password})
+            response.raise_for_status()
+            token = response.json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        prefix = uuid.uuid4().hex[:8]
+        tag_ids = []
+        for i in range(2):
+            response = client.post("/api/admin/tags", json={"name": f"bench-{prefix}-{i}", "slug": f"bench-{prefix}-{i}"})
+            response.raise_for_status()
+            tag_ids.append(response.json()["id"])
+
+        print(f"Creating {count * 2} draft posts...")
+        per_item_ids = create_posts(client, count, f"{prefix}-a", tag_ids[0])
+        bulk_ids = create_posts(client, count, f"{prefix}-b", tag_ids[0])
+
+        per_item_timings = per_item(client, per_item_ids, tag_ids)
+        bulk_timings = bulk(client, bulk_ids, tag_ids)
+
+        print(f"{'operation':>14} | {'per-item (s)':>12} | {'bulk (s)':>9} | {'speedup':>7}")
+        for name, seconds in per_item_timings.items():
+            bulk_seconds = bulk_timings[name]
+            print(f"{name:>14} | {seconds:>12.2f} | {bulk_seconds:>9.2f} | {seconds / bulk_seconds:>6.1f}x")
+
+        for tag_id in tag_ids:
+            client.delete(f"/api/admin/tags/{tag_id}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-item admin API calls with the bulk operations endpoint")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="Admin access token (instead of --username/--password)")
+    parser.add_argument("--posts", type=int, default=200, help="Posts per variant")
+    args = parser.parse_args()
+    if not args.token and not (args.username and args.password):
+        parser.error("--token or --username and --password are required")
+    run(args.base_url, args.username, args.password, args.token, args.posts)
@@ -0,0 +1,73 @@
+"""
+同時接続数ごとのスループット計測（非同期DBレイヤーの効果確認用）
+使用方法: python benchmark_concurrency.py --base-url http://localhost:8000 --slug my-post
+
+計測対象のサーバーは別途起動しておくこと。DBアクセスそのものを測るため、
+サーバー側は RESPONSE_CACHE_ENABLED=false で起動する。
+変更前後のコミットでそれぞれサーバーを起動し、同じ引数で実行して比較する。
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def build_paths(slug: str):
+    return [
+        "/api/posts/?per_page=10",
+        f"/api/posts/{slug}",
+        f"/api/posts/{slug}/likes",
+    ]
+
+
+async def run_level(client: httpx.AsyncClient, paths, concurrency: int, total_requests: int):
+    """concurrency 個のクライアントで合計 total_requests 件のリクエストを送る"""
+    latencies = []
+    errors = 0
+    counter = iter(range(total_requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            path = paths[i % len(paths)]
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    return len(latencies) / elapsed, statistics.median(latencies), p99, errors
+
+
+async def run(base_url: str, slug: str, levels, total_requests: int, warmup: int):
+    paths = build_paths(slug)
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        await run_level(client, paths, min(levels), warmup)
+
+        print(f"{'clients':>7} | {'req/s':>8} | {'p50 (ms)':>9} | {'p99 (ms)':>9} | {'errors':>6}")
+        for concurrency in levels:
+            rps, p50, p99, errors = await run_level(client, paths, concurrency, total_requests)
+            print(f"{concurrency:>7} | {rps:>8.1f} | {p50:>9.1f} | {p99:>9.1f} | {errors:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure requests/sec of the public post endpoints under concurrency")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--slug", required=True, help="Slug of a published post")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.slug, args.concurrency, args.requests, args.warmup))
@@ -0,0 +1,121 @@
+"""
+画像アップロード中の他のAPIのレイテンシ計測（画像処理がイベントループを止めていないかの確認用）
+使用方法: python benchmark_image_uploads.py --base-url http://localhost:8000 --username admin --password secret
+         （ログインの代わりに --token でアクセストークンを直接指定してもよい）
+
+アップロードなしの状態と、--uploaders 並列で大きなPNGをアップロードし続ける状態で、
+アップロードと無関係なエンドポイントを --probes 並列で叩き、レイテンシの p50 / p99 を比較する。
+アップロードした画像は最後に削除する。計測対象のサーバーは別途起動しておくこと。
+変更前後のコミットでそれぞれサーバーを起動し、同じ引数で実行して比較する。
+"""
+import argparse
+import asyncio
+import io
+import random
+import statistics
+import time
+
+import httpx
+from PIL import Image
+
+PROBE_PATHS = ["/api/health", "/api/categories/", "/api/tags/"]
+
+
+def make_png(width: int, height: int, seed: int) -> bytes:
+    """写真に近い（圧縮しにくい）PNG を作る"""
+    rng = random.Random(seed)
+    image = Image.new("RGB", (width, height))
+    image.putdata([
+        ((x * 255 // width + rng.randint(0, 40)) % 256, (y * 255 // height + rng.randint(0, 40)) % 256, rng.randint(0, 255))
+        for y in range(height) for x in range(width)
+    ])
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)]
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list):
+    i = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(PROBE_PATHS[i % len(PROBE_PATHS)])
+        latencies.append((time.perf_counter() - started) * 1000)
+        i += 1
+
+
+async def upload(client: httpx.AsyncClient, stop: asyncio.Event, image: bytes, image_ids: list, upload_times: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.post(
+            "/api/admin/images/upload",
+            files={"file": ("benchmark.png", image, "image/png")}
+        )
+        response.raise_for_status()
+        upload_times.append((time.perf_counter() - started) * 1000)
+        image_ids.append(response.json()["id"])
+
+
+async def measure(client: httpx.AsyncClient, seconds: float, probes: int, uploaders: int, image: bytes, image_ids: list):
+    stop = asyncio.Event()
+    latencies = []
+    upload_times = []
+    tasks = [asyncio.create_task(probe(client, stop, latencies)) for _ in range(probes)]
+    tasks += [asyncio.create_task(upload(client, stop, image, image_ids, upload_times)) for _ in range(uploaders)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return latencies, upload_times
+
+
+async def run(base_url: str, token: str, seconds: float, probes: int, uploaders: int, width: int, height: int):
+    image = make_png(width, height, seed=1)
+    print(f"Upload image: {width}x{height} PNG, {len(image) / 1024 / 1024:.1f} MB")
+
+    limits = httpx.Limits(max_connections=probes + uploaders, max_keepalive_connections=probes + uploaders)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        client.headers["Authorization"] = f"Bearer {token}"
+        image_ids = []
+        try:
+            # Warm up connections and the worker pool
+            await measure(client, 1.0, probes, 1, image, image_ids)
+
+            print(f"{'scenario':>16} | {'probe req':>9} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'max (ms)':>8} | {'uploads':>7} | {'upload p50 (ms)':>15}")
+            for name, active_uploaders in (("idle", 0), (f"{uploaders} uploaders", uploaders)):
+                latencies, upload_times = await measure(client, seconds, probes, active_uploaders, image, image_ids)
+                upload_p50 = f"{statistics.median(upload_times):>15.0f}" if upload_times else f"{'-':>15}"
+                print(
+                    f"{name:>16} | {len(latencies):>9} | {statistics.median(latencies):>8.1f} | "
+                    f"{percentile(latencies, 0.99):>8.1f} | {max(latencies):>8.1f} | {len(upload_times):>7} | {upload_p50}"
+                )
+        finally:
+            for image_id in image_ids:
+                await client.delete(f"/api/admin/images/{image_id}")
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    response = httpx.post(f"{base_url}/api/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure latency of unrelated endpoints during concurrent image uploads")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="Admin access token (instead of --username/--password)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of each scenario")
+    parser.add_argument("--probes", type=int, default=4, help="Concurrent clients calling unrelated endpoints")
+    parser.add_argument("--uploaders", type=int, default=4, help="Concurrent uploading clients")
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=1200)
+    args = parser.parse_args()
+    if not args.token and not (args.username and args.password):
+        parser.error("--token or --username and --password are required")
+    token = args.token or login(args.base_url, args.username, args.password)
+    asyncio.run(run(args.base_url, token, args.seconds, args.probes, args.uploaders, args.width, args.height))
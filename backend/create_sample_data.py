@@ -10,6 +10,7 @@ from app.models.post import Post, PostStatus
 from app.models.category import Category
 from app.models.tag import Tag
 from app.core.security import get_password_hash
+from app.services.post_counters import PostCounterService
 from datetime import datetime, timezone
 
 def create_sample_data():
@@ -471,6 +472,10 @@ Next.js 15のApp Routerは、モダンなWebアプリケーション開発に必
                 db.add(post)
                 db.commit()
         
+        # Posts were inserted directly, so rebuild the per-status counters
+        PostCounterService(db).recount()
+        db.commit()
+        
         print("Sample data created successfully!")
         print(f"- Categories: {len(categories)}")
         print(f"- Tags: {len(tags)}")
@@ -0,0 +1,36 @@
+"""
+公開記事・一覧ページ・カテゴリ・タグのAPIレスポンスを、nginx が直接配信する静的ファイルとして書き出すスクリプト
+使用方法: python export_snapshot.py [--dir snapshot]
+
+内容が変わったファイルだけを書き直し、公開されなくなった記事のファイルは削除する。
+管理画面での変更後の自動更新は SNAPSHOT_ENABLED=true で有効になる。
+"""
+import argparse
+import time
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.snapshot import SnapshotService
+
+
+def export_snapshot(directory: str):
+    db = SessionLocal()
+    
+    try:
+        started = time.perf_counter()
+        result = SnapshotService(db, directory).export_all()
+        elapsed = time.perf_counter() - started
+        print(
+            f"Wrote {result.written} files, {result.unchanged} unchanged, "
+            f"removed {result.removed} in {elapsed:.1f}s"
+        )
+    except Exception as e:
+        print(f"Error exporting snapshot: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the anonymous read API as precompressed static files")
+    parser.add_argument("--dir", default=settings.SNAPSHOT_DIR, help="Output directory served by nginx")
+    args = parser.parse_args()
+    export_snapshot(args.dir)
@@ -0,0 +1,30 @@
+"""
+関連記事テーブルを全件作り直すスクリプト
+使用方法: python rebuild_related_posts.py [--batch-size 200]
+"""
+import argparse
+import time
+from app.db.session import SessionLocal
+from app.services.related_posts import RelatedPostsService
+
+
+def rebuild_related_posts(batch_size: int):
+    db = SessionLocal()
+    
+    try:
+        started = time.perf_counter()
+        processed = RelatedPostsService(db).rebuild(batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"Computed related posts for {processed} published posts in {elapsed:.1f}s")
+    except Exception as e:
+        print(f"Error rebuilding related posts: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the precomputed related posts")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    rebuild_related_posts(args.batch_size)
@@ -0,0 +1,30 @@
+"""
+検索インデックスを全件作り直すスクリプト
+使用方法: python rebuild_search_index.py [--batch-size 500]
+"""
+import argparse
+import time
+from app.db.session import SessionLocal
+from app.services.search import SearchService
+
+
+def rebuild_search_index(batch_size: int):
+    db = SessionLocal()
+    
+    try:
+        started = time.perf_counter()
+        indexed = SearchService(db).rebuild(batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"Indexed {indexed} published posts in {elapsed:.1f}s")
+    except Exception as e:
+        print(f"Error rebuilding search index: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the post search index")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    rebuild_search_index(args.batch_size)
@@ -0,0 +1,34 @@
+"""
+記事本文のMarkdownをレンダリングし、HTML・目次・語数・読了時間を保存するスクリプト
+使用方法: python render_posts.py [--batch-size 100] [--force]
+
+本文が前回のレンダリング時から変わっていない記事はスキップする（--force で全件作り直す）。
+"""
+import argparse
+import time
+from app.db.session import SessionLocal
+from app.services.markdown_render import MarkdownRenderService, shutdown_render_pool
+
+
+def render_posts(batch_size: int, force: bool):
+    db = SessionLocal()
+    
+    try:
+        started = time.perf_counter()
+        rendered = MarkdownRenderService(db).render_all(batch_size=batch_size, force=force)
+        elapsed = time.perf_counter() - started
+        print(f"Rendered {rendered} posts in {elapsed:.1f}s")
+    except Exception as e:
+        print(f"Error rendering posts: {e}")
+        db.rollback()
+    finally:
+        db.close()
+        shutdown_render_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render post markdown to HTML")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--force", action="store_true", help="Re-render posts whose content has not changed")
+    args = parser.parse_args()
+    render_posts(args.batch_size, args.force)
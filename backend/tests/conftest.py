@@ -0,0 +1,146 @@
+"""テスト共通のフィクスチャ
+
+一時ディレクトリの SQLite をデータベースに使う（TEST_DATABASE_URL で MySQL などのテスト用DBを指定してもよい）。
+テーブルはテストごとに作り直す。
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+_tmp_dir = tempfile.mkdtemp(prefix="blog-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", f"sqlite:///{_tmp_dir}/test.db")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ["DEBUG"] = "false"
+# Every request must reach the database so that statement counts are meaningful
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+os.environ["LIKE_BUFFER_ENABLED"] = "false"
+os.environ["SNAPSHOT_ENABLED"] = "false"
+os.environ["MARKDOWN_RENDER_WORKERS"] = "0"
+os.environ["IMAGE_PROCESS_WORKERS"] = "0"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import app.models  # noqa: E402,F401  (register all tables)
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, async_engine, engine  # noqa: E402
+from app.main import app as fastapi_app  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.image import Image  # noqa: E402
+from app.models.post import Post, PostStatus  # noqa: E402
+from app.models.tag import Tag  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.post_counters import PostCounterService  # noqa: E402
+from app.services.related_posts import RelatedPostsService  # noqa: E402
+from app.services.response_cache import response_cache  # noqa: E402
+from app.services.search import SearchService  # noqa: E402
+from app.services.slug_cache import slug_cache  # noqa: E402
+
+
+class StatementCounter:
+    """before_cursor_execute で数えたSQL文"""
+
+    def __init__(self):
+        self.statements = []
+        self.parameters = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+
+@contextmanager
+def count_statements():
+    """with ブロック内で同期・非同期の両エンジンが実行したSQL文を数える"""
+    counter = StatementCounter()
+    engines = (engine, async_engine.sync_engine)
+    for target in engines:
+        event.listen(target, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    slug_cache.clear()
+    response_cache.clear()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(fastapi_app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def admin(db) -> User:
+    user = User(username="admin", email="admin@example.com", password_hash="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def admin_headers(admin):
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(admin.id)})}"}
+
+
+@pytest.fixture
+def make_posts(db, admin):
+    """公開記事を count 件作る（カテゴリ・タグ・アイキャッチ画像付き。検索・関連記事・件数も構築する）"""
+
+    def make(count: int):
+        categories = [Category(name=f"Category {i}", slug=f"category-{i}") for i in range(3)]
+        tags = [Tag(name=f"Tag {i}", slug=f"tag-{i}") for i in range(4)]
+        image = Image(filename="featured.png", original_name="featured.png", mime_type="image/png")
+        db.add_all(categories + tags + [image])
+        db.flush()
+
+        now = datetime.utcnow()
+        posts = []
+        for i in range(count):
+            post = Post(
+                title=f"Post {i}",
+                slug=f"post-{i}",
+                content=f"Body of post {i} about python and databases",
+                status=PostStatus.PUBLISHED,
+                published_at=now - timedelta(hours=i),
+                user_id=admin.id,
+                featured_image_id=image.id,
+                categories=[categories[i % 3], categories[(i + 1) % 3]],
+                tags=[tags[i % 4], tags[(i + 2) % 4]]
+            )
+            posts.append(post)
+        db.add_all(posts)
+        db.commit()
+
+        SearchService(db).rebuild()
+        RelatedPostsService(db).rebuild()
+        PostCounterService(db).recount()
+        db.commit()
+        return posts
+
+    return make
+
+
+@pytest.fixture
+def sql_counter():
+    """with sql_counter() as counter: ... で counter.count にSQL文の数が入る"""
+    return count_statements
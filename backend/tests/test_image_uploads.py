@@ -0,0 +1,74 @@
+"""分割アップロードの追記（ImageUploadStore.append）"""
+import asyncio
+import fcntl
+import os
+import threading
+
+import pytest
+
+from app.services import image_uploads as image_uploads_module
+from app.services.image_uploads import ImageUploadStore, UploadBusy, UploadOffsetMismatch, UploadTooLarge
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ImageUploadStore(str(tmp_path), session_ttl=3600)
+
+
+def test_append_resumes_from_received_bytes(store):
+    session = store.create("photo.png", "image/png", 10)
+    assert asyncio.run(store.append(session.upload_id, 0, _chunks(b"abcd"), 8)).offset == 4
+
+    with pytest.raises(UploadOffsetMismatch) as excinfo:
+        asyncio.run(store.append(session.upload_id, 0, _chunks(b"abcd"), 8))
+    assert excinfo.value.offset == 4
+
+    assert asyncio.run(store.append(session.upload_id, 4, _chunks(b"ef", b"ghij"), 8)).offset == 10
+    _, path = store.claim(session.upload_id)
+    with open(path, "rb") as handle:
+        assert handle.read() == b"abcdefghij"
+
+
+def test_append_over_limit_keeps_previous_bytes(store):
+    session = store.create("photo.png", "image/png", 10)
+    asyncio.run(store.append(session.upload_id, 0, _chunks(b"abcd"), 8))
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(store.append(session.upload_id, 4, _chunks(b"efgh", b"ijkl"), 8))
+    assert store.get(session.upload_id).offset == 4
+
+
+def test_append_rejects_concurrent_append(store):
+    session = store.create("photo.png", "image/png", 10)
+    with open(os.path.join(store.root, f"{session.upload_id}.part"), "r+b") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        with pytest.raises(UploadBusy):
+            asyncio.run(store.append(session.upload_id, 0, _chunks(b"abcd"), 8))
+
+
+def test_append_does_file_io_off_the_event_loop(store, monkeypatch):
+    session = store.create("photo.png", "image/png", 10)
+    loop_threads = set()
+    calls = []
+
+    def recording(name, original):
+        def call(*args, **kwargs):
+            calls.append((name, threading.get_ident()))
+            return original(*args, **kwargs)
+        return call
+
+    monkeypatch.setattr(image_uploads_module.fcntl, "flock", recording("flock", fcntl.flock))
+    monkeypatch.setattr(image_uploads_module.os, "fstat", recording("fstat", os.fstat))
+    monkeypatch.setattr(image_uploads_module.os, "utime", recording("utime", os.utime))
+
+    async def run():
+        loop_threads.add(threading.get_ident())
+        await store.append(session.upload_id, 0, _chunks(b"abcd"), 8)
+
+    asyncio.run(run())
+    assert {name for name, _ in calls} >= {"flock", "fstat", "utime"}
+    assert not [name for name, thread in calls if thread in loop_threads]
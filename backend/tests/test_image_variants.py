@@ -0,0 +1,74 @@
+"""画像のリサイズ版（GET /api/images/{id}）"""
+import os
+
+import pytest
+from PIL import Image as PILImage
+
+from app.api import images as images_api
+from app.models.image import Image
+from app.services import image_variants as image_variants_module
+from app.services.image_variants import ImageVariantCache, VariantSpec, image_version
+
+FILENAME = "0123abcd.png"
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    PILImage.new("RGB", (400, 300), "red").save(uploads / FILENAME)
+    monkeypatch.setattr(image_variants_module, "UPLOAD_DIR", str(uploads))
+    cache = ImageVariantCache(str(tmp_path / "variants"), 10 * 1024 * 1024, 80)
+    monkeypatch.setattr(images_api, "image_variants", cache)
+    return cache
+
+
+@pytest.fixture
+def image(db):
+    image = Image(filename=FILENAME, original_name="photo.png", mime_type="image/png")
+    db.add(image)
+    db.commit()
+    return image
+
+
+def _get(client, image, **params):
+    return client.get(f"/api/images/{image.id}", params={"w": 150, **params})
+
+
+def test_variant_requires_current_version(client, cache, image):
+    response = _get(client, image, v=image_version(FILENAME))
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+
+    assert _get(client, image, v="other").status_code == 404
+    assert _get(client, image).status_code == 422
+
+
+def test_deleted_image_is_not_found(client, db, cache, image):
+    image_id = image.id
+    assert _get(client, image, v=image_version(FILENAME)).status_code == 200
+    db.delete(image)
+    db.commit()
+    response = client.get(f"/api/images/{image_id}", params={"w": 150, "v": image_version(FILENAME)})
+    assert response.status_code == 404
+
+
+def test_variant_evicted_after_get_is_generated_again(client, cache, image, monkeypatch):
+    spec = VariantSpec(width=150, height=None, fit="contain", fmt="png")
+    original_get = cache.get
+    evicted = []
+
+    async def get_then_evict(filename, spec):
+        path = await original_get(filename, spec)
+        if not evicted:
+            # Another worker evicts the file right after get() returned it
+            os.remove(path)
+            evicted.append(path)
+        return path
+
+    monkeypatch.setattr(cache, "get", get_then_evict)
+    response = _get(client, image, v=image_version(FILENAME))
+    assert response.status_code == 200, response.text
+    assert evicted == [os.path.join(cache.root, FILENAME, spec.cache_name())]
+    assert os.path.exists(evicted[0])
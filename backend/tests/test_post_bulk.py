@@ -0,0 +1,63 @@
+"""一括操作（POST /api/admin/posts/bulk）が、記事ごとの PUT を繰り返すより少ないSQL文で速く終わること"""
+import time
+
+import pytest
+
+from app.models.post import Post, PostStatus
+
+COUNT = 20
+
+
+@pytest.fixture
+def posts(make_posts):
+    return make_posts(COUNT * 2)
+
+
+def _measure(sql_counter, requests):
+    """requests を順に実行し、(SQL文の数, 経過秒数) を返す"""
+    with sql_counter() as counter:
+        started = time.perf_counter()
+        for request in requests:
+            response = request()
+            assert response.status_code == 200, response.text
+        elapsed = time.perf_counter() - started
+    return counter.count, elapsed
+
+
+@pytest.mark.parametrize("per_item_body, operation, check", [
+    (
+        {"status": "draft"},
+        {"action": "unpublish"},
+        lambda post: post.status == PostStatus.DRAFT and post.published_at is None
+    ),
+    (
+        {"tag_ids": [1, 2]},
+        {"action": "set_tags", "tag_ids": [1, 2]},
+        lambda post: sorted(tag.id for tag in post.tags) == [1, 2]
+    ),
+])
+def test_bulk_request_beats_per_item_requests(
+    client, sql_counter, db, admin_headers, posts, per_item_body, operation, check
+):
+    per_item_ids = [post.id for post in posts[:COUNT]]
+    bulk_ids = [post.id for post in posts[COUNT:]]
+
+    per_item_statements, per_item_time = _measure(sql_counter, [
+        lambda post_id=post_id: client.put(f"/api/admin/posts/{post_id}", json=per_item_body, headers=admin_headers)
+        for post_id in per_item_ids
+    ])
+    bulk_statements, bulk_time = _measure(sql_counter, [
+        lambda: client.post(
+            "/api/admin/posts/bulk",
+            json={"operations": [{**operation, "post_ids": bulk_ids}]},
+            headers=admin_headers
+        )
+    ])
+
+    # Both paths leave the posts in the same state
+    db.expire_all()
+    for post in db.query(Post).filter(Post.id.in_(per_item_ids + bulk_ids)):
+        assert check(post), post.id
+
+    assert bulk_statements < per_item_statements
+    assert bulk_time < per_item_time
@@ -0,0 +1,32 @@
+"""自動保存（PATCH /api/admin/posts/{id}/content）は下書きだけに適用されること"""
+from app.services.markdown_render import content_hash
+
+
+def _create(client, admin_headers, status):
+    response = client.post("/api/admin/posts", headers=admin_headers, json={
+        "title": "Autosave", "slug": f"autosave-{status}", "content": "Hello world", "status": status
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _patch(client, admin_headers, post, insert):
+    return client.patch(f"/api/admin/posts/{post['id']}/content", headers=admin_headers, json={
+        "base_hash": content_hash(post["content"]),
+        "edits": [{"position": 0, "insert": insert}]
+    })
+
+
+def test_autosave_applies_to_drafts(client, admin_headers):
+    post = _create(client, admin_headers, "draft")
+    response = _patch(client, admin_headers, post, "Draft: ")
+    assert response.status_code == 200, response.text
+    assert response.json()["changed"] is True
+    assert client.get(f"/api/admin/posts/{post['id']}", headers=admin_headers).json()["content"] == "Draft: Hello world"
+
+
+def test_autosave_rejects_published_posts(client, admin_headers):
+    post = _create(client, admin_headers, "published")
+    response = _patch(client, admin_headers, post, "Half-written ")
+    assert response.status_code == 409
+    assert client.get(f"/api/posts/{post['slug']}").json()["content"] == "Hello world"
@@ -0,0 +1,83 @@
+"""いいね後の記事レスポンス（キャッシュ済みのレスポンスとETagが新しいいいね数に変わること）"""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.models.post import PostStatus
+from app.services.like_buffer import LikeBuffer
+
+
+@pytest.fixture
+def cached(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+
+
+@pytest.fixture
+def post(make_posts):
+    return make_posts(3)[0]
+
+
+def _get(client, path, **headers):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def _list_likes(response, slug):
+    return next(post["likes_count"] for post in response.json()["posts"] if post["slug"] == slug)
+
+
+def _assert_refreshed(client, slug, before_detail, expected):
+    detail = _get(client, f"/api/posts/{slug}", **{"If-None-Match": before_detail.headers["etag"]})
+    assert detail.json()["likes_count"] == expected
+    assert detail.headers["etag"] != before_detail.headers["etag"]
+    assert _list_likes(_get(client, "/api/posts/"), slug) == expected
+
+
+def test_like_refreshes_cached_post(client, cached, post):
+    detail = _get(client, f"/api/posts/{post.slug}")
+    assert _list_likes(_get(client, "/api/posts/"), post.slug) == 0
+    assert detail.json()["likes_count"] == 0
+    # Served from the cache from here on
+    assert client.get(
+        f"/api/posts/{post.slug}", headers={"If-None-Match": detail.headers["etag"]}
+    ).status_code == 304
+
+    response = client.post(f"/api/posts/{post.slug}/like", json={"session_id": "s1"})
+    assert response.status_code == 200, response.text
+    assert response.json()["likes_count"] == 1
+
+    _assert_refreshed(client, post.slug, detail, 1)
+
+
+def test_buffered_like_refreshes_cached_post_after_flush(client, cached, post):
+    detail = _get(client, f"/api/posts/{post.slug}")
+    _get(client, "/api/posts/")
+
+    async def like_and_flush():
+        buffer = LikeBuffer(max_size=10, batch_size=10, flush_interval=0.01, enqueue_timeout=0.1)
+        buffer.start()
+        await buffer.enqueue(post.id, "s1", None)
+        await buffer.enqueue(post.id, "s2", None)
+        await buffer.stop()
+
+    asyncio.run(like_and_flush())
+    _assert_refreshed(client, post.slug, detail, 2)
+
+
+def test_likes_counts_for_list_cards(client, db, make_posts):
+    posts = make_posts(3)
+    client.post(f"/api/posts/{posts[0].slug}/like", json={"session_id": "s1"})
+    client.post(f"/api/posts/{posts[0].slug}/like", json={"session_id": "s2"})
+    client.post(f"/api/posts/{posts[2].slug}/like", json={"session_id": "s1"})
+    posts[1].status = PostStatus.DRAFT
+    db.commit()
+
+    response = client.get("/api/posts/likes", params={"ids": f"{posts[0].id},{posts[1].id},{posts[2].id},999"})
+    assert response.status_code == 200, response.text
+    assert response.json() == {str(posts[0].id): 2, str(posts[2].id): 1}
+
+    assert client.get("/api/posts/likes", params={"ids": "1,x"}).status_code == 422
+    too_many = ",".join(str(i) for i in range(1, 102))
+    assert client.get("/api/posts/likes", params={"ids": too_many}).status_code == 400
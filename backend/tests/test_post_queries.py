@@ -0,0 +1,82 @@
+"""記事を返すエンドポイントのSQL文の数が件数によらず一定であること（関連の遅延ロードによる N+1 がないこと）"""
+import pytest
+
+from app.models.related_post import RelatedPost
+
+SMALL = 2
+LARGE = 20
+
+
+@pytest.fixture
+def posts(make_posts):
+    return make_posts(LARGE + 5)
+
+
+def _statements(client, sql_counter, path, params=None, headers=None) -> int:
+    with sql_counter() as counter:
+        response = client.get(path, params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return counter.count
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"include": "content"},
+    {"cursor": ""},
+    {"category": "category-0"},
+    {"search": "python"},
+])
+def test_post_list_statement_count_is_constant(client, sql_counter, posts, params):
+    small = _statements(client, sql_counter, "/api/posts/", {**params, "per_page": SMALL})
+    large = _statements(client, sql_counter, "/api/posts/", {**params, "per_page": LARGE})
+    assert small == large
+
+
+def test_post_list_returns_relationships(client, posts):
+    items = client.get("/api/posts/", params={"per_page": LARGE}).json()["posts"]
+    assert len(items) == LARGE
+    assert all(item["categories"] and item["tags"] and item["featured_image"] for item in items)
+
+
+def test_search_statement_count_is_constant(client, sql_counter, posts):
+    small = _statements(client, sql_counter, "/api/posts/search", {"q": "python", "limit": SMALL})
+    large = _statements(client, sql_counter, "/api/posts/search", {"q": "python", "limit": LARGE})
+    assert small == large
+
+
+def test_related_posts_statement_count_is_constant(client, sql_counter, db, posts):
+    # post-0 keeps SMALL stored related posts, post-1 keeps all of them
+    keep = [
+        row[0] for row in db.query(RelatedPost.related_post_id).filter(
+            RelatedPost.post_id == posts[0].id
+        ).order_by(RelatedPost.score.desc()).limit(SMALL)
+    ]
+    db.query(RelatedPost).filter(
+        RelatedPost.post_id == posts[0].id, RelatedPost.related_post_id.notin_(keep)
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    # Resolve the slugs once so both measurements hit the slug cache
+    for slug in ("post-0", "post-1"):
+        client.get(f"/api/posts/{slug}/related")
+    assert len(client.get("/api/posts/post-0/related", params={"limit": LARGE}).json()["popular"]) == SMALL
+    assert len(client.get("/api/posts/post-1/related", params={"limit": LARGE}).json()["popular"]) == LARGE
+
+    small = _statements(client, sql_counter, "/api/posts/post-0/related", {"limit": LARGE})
+    large = _statements(client, sql_counter, "/api/posts/post-1/related", {"limit": LARGE})
+    assert small == large
+
+
+def test_post_detail_statement_count(client, sql_counter, posts):
+    # Detail of a post with several categories and tags; the count must not depend on the post
+    for i in range(3):
+        client.get(f"/api/posts/post-{i}")
+    counts = {_statements(client, sql_counter, f"/api/posts/post-{i}") for i in range(3)}
+    assert len(counts) == 1
+
+
+@pytest.mark.parametrize("params", [{}, {"include": "content"}, {"cursor": ""}])
+def test_admin_post_list_statement_count_is_constant(client, sql_counter, admin_headers, posts, params):
+    small = _statements(client, sql_counter, "/api/admin/posts", {**params, "per_page": SMALL}, admin_headers)
+    large = _statements(client, sql_counter, "/api/admin/posts", {**params, "per_page": LARGE}, admin_headers)
+    assert small == large
@@ -0,0 +1,62 @@
+"""記事一覧の文字数フィルターが ix_posts_status_published_at_content_length を使い、全件走査やソートをしないこと
+
+エンドポイントが実際に発行したSQL文とパラメーターをそのまま EXPLAIN する（SQLite と MySQL に対応）。
+"""
+import pytest
+
+from app.db.session import engine
+
+INDEX_NAME = "ix_posts_status_published_at_content_length"
+
+
+@pytest.fixture
+def posts(make_posts):
+    return make_posts(30)
+
+
+def _plans(client, sql_counter, params):
+    """一覧リクエストが posts に発行した、文字数で絞り込むSQL文ごとの実行計画"""
+    with sql_counter() as counter:
+        response = client.get("/api/posts/", params=params)
+    assert response.status_code == 200, response.text
+
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in zip(counter.statements, counter.parameters):
+            if "FROM posts" not in statement or "content_length" not in statement:
+                continue
+            if conn.dialect.name == "sqlite":
+                rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+                plans.append([row[-1] for row in rows])
+            else:
+                rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().fetchall()
+                plans.append([row for row in rows if row["table"] in ("posts", "anon_1")])
+    assert plans
+    return plans
+
+
+def _assert_uses_index(plan):
+    if engine.dialect.name == "sqlite":
+        posts_steps = [step for step in plan if " posts " in f"{step} "]
+        assert posts_steps and all(INDEX_NAME in step for step in posts_steps), plan
+        assert not any(step.startswith("SCAN posts") for step in plan), plan
+        assert not any("TEMP B-TREE" in step for step in plan), plan
+    else:
+        posts_rows = [row for row in plan if row["table"] == "posts"]
+        assert posts_rows and all(row["key"] == INDEX_NAME for row in posts_rows), plan
+        assert not any(row["type"] == "ALL" for row in posts_rows), plan
+        assert not any("filesort" in (row["Extra"] or "") for row in plan), plan
+
+
+@pytest.mark.parametrize("params", [
+    {"min_length": 100},
+    {"max_length": 5000},
+    {"min_length": 100, "max_length": 5000},
+    {"min_length": 100, "date_from": "2020-01-01", "date_to": "2030-12-31"},
+    {"min_length": 100, "sort": "oldest"},
+    {"min_length": 100, "cursor": ""},
+    {"min_length": 100, "cursor": "", "sort": "oldest"},
+])
+def test_length_filter_uses_content_length_index(client, sql_counter, posts, params):
+    for plan in _plans(client, sql_counter, params):
+        _assert_uses_index(plan)
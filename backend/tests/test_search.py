@@ -0,0 +1,48 @@
+"""全文検索（記事一覧の search= と検索インデックスの作り直し）"""
+import pytest
+
+from app.models.post import Post, PostStatus
+from app.models.search import SearchDocument
+from app.services.search import SearchService
+
+
+@pytest.fixture
+def posts(make_posts):
+    return make_posts(30)
+
+
+def test_list_search_does_not_bind_matching_ids(client, sql_counter, posts):
+    with sql_counter() as counter:
+        response = client.get("/api/posts/", params={"search": "pyth databases", "per_page": 5})
+    assert response.status_code == 200, response.text
+    assert response.json()["total"] == 30
+    assert len(response.json()["posts"]) == 5
+
+    # The matching ids stay in the database; no statement binds one parameter per match
+    assert max(len(parameters) for parameters in counter.parameters) < 30
+
+    assert client.get("/api/posts/", params={"search": "pyth missing"}).json()["total"] == 0
+
+
+def test_rebuild_keeps_index_searchable(db, posts):
+    service = SearchService(db)
+    db.query(Post).filter(Post.id == posts[-1].id).update({"status": PostStatus.DRAFT})
+    db.commit()
+
+    searchable = []
+    original_commit = db.commit
+
+    def commit():
+        original_commit()
+        # What a concurrent search sees after each batch
+        searchable.append(len(service.search("python", limit=100)))
+
+    db.commit = commit
+    try:
+        assert service.rebuild(batch_size=10) == 29
+    finally:
+        db.commit = original_commit
+
+    assert min(searchable) >= 29
+    assert searchable[-1] == 29
+    assert db.query(SearchDocument).filter(SearchDocument.post_id == posts[-1].id).count() == 0
@@ -0,0 +1,18 @@
+"""起動処理が失敗しても、キャッシュを空のまま起動してリクエストに応えること"""
+from fastapi.testclient import TestClient
+
+from app.main import app as fastapi_app
+from app.services.slug_cache import slug_cache
+
+
+def test_starts_with_cold_slug_cache_when_warm_up_fails(db, make_posts, monkeypatch):
+    make_posts(3)
+
+    async def fail(session):
+        raise ConnectionError("database is not reachable")
+
+    monkeypatch.setattr(slug_cache, "load", fail)
+    with TestClient(fastapi_app) as client:
+        assert client.get("/api/health").status_code == 200
+        # Slugs are resolved from the database on demand
+        assert client.get("/api/posts/post-0").status_code == 200
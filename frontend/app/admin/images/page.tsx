@@ -268,7 +268,7 @@ export default function ImagesPage() {
                       className="cursor-pointer"
                     />
                     <p className="text-xs text-muted-foreground">
-                      JPEG, PNG, WebP, GIF形式に対応（最大5MB）
+                      JPEG, PNG, WebP, GIF形式に対応（最大50MB）
                     </p>
                   </div>
                   
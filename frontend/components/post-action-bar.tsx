@@ -20,6 +20,10 @@ export function PostActionBar({ slug, title, initialCount = 0 }: PostActionBarPr
   const [isLoading, setIsLoading] = useState(false);
   const { toast } = useToast();
 
+  useEffect(() => {
+    setLikesCount(initialCount);
+  }, [initialCount]);
+
   useEffect(() => {
     const checkMobile = () => {
       setIsMobile(window.innerWidth < 1024);
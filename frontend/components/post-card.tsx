@@ -4,7 +4,7 @@ import Link from 'next/link';
 import { Card } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { Clock, User, Image as ImageIcon, BookOpen, Heart } from 'lucide-react';
-import { getThumbnailUrl } from '@/lib/config';
+import { getImageVariantUrl, likes } from '@/lib/api';
 import { useEffect, useState } from 'react';
 import { calculateReadingTime, formatReadingTime } from '@/lib/utils/reading-time';
 
@@ -26,6 +26,7 @@ interface Post {
     height?: number;
   };
   likes_count?: number;
+  reading_time?: number;
 }
 
 interface PostCardProps {
@@ -34,6 +35,7 @@ interface PostCardProps {
 
 export function PostCard({ post }: PostCardProps) {
   const [formattedDate, setFormattedDate] = useState<string>('');
+  const [likesCount, setLikesCount] = useState(post.likes_count);
 
   useEffect(() => {
     setFormattedDate(
@@ -45,6 +47,19 @@ export function PostCard({ post }: PostCardProps) {
     );
   }, [post.published_at]);
 
+  // 静的スナップショットの一覧JSONにはいいね数が入らないので、そのときはAPIからまとめて取得する
+  useEffect(() => {
+    setLikesCount(post.likes_count);
+    if (post.likes_count !== undefined) return;
+    let active = true;
+    likes.count(post.id).then((count) => {
+      if (active && count !== undefined) setLikesCount(count);
+    });
+    return () => {
+      active = false;
+    };
+  }, [post.id, post.likes_count]);
+
   return (
     <Card className="group hover:shadow-lg transition-all duration-300 hover:-translate-y-1 overflow-hidden h-full">
       <Link href={`/posts/${post.slug}`} className="block h-full">
@@ -53,7 +68,7 @@ export function PostCard({ post }: PostCardProps) {
           <div className="aspect-video relative bg-muted overflow-hidden">
             {post.featured_image ? (
               <img
-                src={getThumbnailUrl(post.featured_image.filename, 'medium')}
+                src={getImageVariantUrl(post.featured_image, { w: 640 })}
                 alt={post.featured_image.alt_text || post.title}
                 className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
                 loading="lazy"
@@ -113,16 +128,16 @@ export function PostCard({ post }: PostCardProps) {
                 {formattedDate}
               </time>
             </div>
-            {post.content && (
+            {(post.reading_time || post.content) && (
               <div className="flex items-center gap-1">
                 <BookOpen className="h-3 w-3" suppressHydrationWarning />
-                <span>{formatReadingTime(calculateReadingTime(post.content))}</span>
+                <span>{formatReadingTime(post.reading_time || calculateReadingTime(post.content!))}</span>
               </div>
             )}
-            {post.likes_count !== undefined && (
+            {likesCount !== undefined && (
               <div className="flex items-center gap-1">
                 <Heart className="h-3 w-3" suppressHydrationWarning />
-                <span>{post.likes_count}</span>
+                <span>{likesCount}</span>
               </div>
             )}
           </div>
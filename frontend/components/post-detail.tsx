@@ -8,7 +8,7 @@ import { MarkdownRenderer } from "@/components/markdown-renderer";
 import { PostSidebar } from "@/components/post-sidebar";
 import { TableOfContents } from "@/components/table-of-contents";
 import { RelatedPosts } from "@/components/related-posts";
-import { getImageUrl } from "@/lib/api";
+import { getImageVariantUrl, likes } from "@/lib/api";
 import { useEffect, useState } from "react";
 import { useAnalytics } from "@/lib/hooks/use-analytics";
 import { usePathname } from "next/navigation";
@@ -43,6 +43,7 @@ interface PostDetailProps {
 
 export function PostDetail({ post }: PostDetailProps) {
   const [formattedDate, setFormattedDate] = useState<string>('');
+  const [likesCount, setLikesCount] = useState(post.likes_count || 0);
   const pathname = usePathname();
   const readingTime = calculateReadingTime(post.content);
   
@@ -63,6 +64,13 @@ export function PostDetail({ post }: PostDetailProps) {
     );
   }, [post.published_at]);
 
+  // 静的スナップショットの記事JSONにはいいね数が入らないので、最新の値をAPIから取得する
+  useEffect(() => {
+    likes.get(post.slug)
+      .then((response) => setLikesCount(response.likes_count))
+      .catch(() => {});
+  }, [post.slug]);
+
   return (
     <div className="min-h-screen bg-background">
       <ReadingProgressBar />
@@ -86,7 +94,7 @@ export function PostDetail({ post }: PostDetailProps) {
               <PostActionBar
                 slug={post.slug}
                 title={post.title}
-                initialCount={post.likes_count || 0}
+                initialCount={likesCount}
               />
             </div>
 
@@ -99,7 +107,7 @@ export function PostDetail({ post }: PostDetailProps) {
                 {post.featured_image && (
                   <div className="aspect-video relative bg-muted">
                     <img
-                      src={getImageUrl(post.featured_image.filename)}
+                      src={getImageVariantUrl(post.featured_image, { w: 1200 })}
                       alt={post.featured_image.alt_text || post.title}
                       className="w-full h-full object-cover"
                     />
@@ -205,7 +213,7 @@ export function PostDetail({ post }: PostDetailProps) {
             <PostActionBar
               slug={post.slug}
               title={post.title}
-              initialCount={post.likes_count || 0}
+              initialCount={likesCount}
             />
           </div>
         </div>
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useForm } from "react-hook-form";
 import { zodResolver } from "@hookform/resolvers/zod";
 import * as z from "zod";
@@ -16,6 +16,7 @@ import { Multiselect, MultiselectOption } from "@/components/ui/multiselect";
 import { FeaturedImageSelector } from "@/components/featured-image-selector";
 import { ImageGalleryDialog } from "@/components/image-gallery-dialog";
 import { admin, categories as categoriesApi, tags as tagsApi } from "@/lib/api";
+import { diffText } from "@/lib/text-delta";
 import { Save, Eye, Upload, ImagePlus } from "lucide-react";
 
 const postSchema = z.object({
@@ -31,6 +32,9 @@ const postSchema = z.object({
 
 type PostFormData = z.infer<typeof postSchema>;
 
+// 本文の自動保存（既存記事のみ）。入力が止まってから保存するまでの時間
+const AUTOSAVE_DELAY_MS = 2000;
+
 interface PostEditorProps {
   post?: {
     id: number;
@@ -42,6 +46,8 @@ interface PostEditorProps {
     categories: Array<{ id: number }>;
     tags: Array<{ id: number }>;
     featured_image_id?: number;
+    // 本文のハッシュ（差分保存の基準）
+    content_hash?: string;
   };
   onSave: (data: PostFormData, isPublish?: boolean) => Promise<void>;
 }
@@ -53,11 +59,19 @@ export function PostEditor({ post, onSave }: PostEditorProps) {
   const [tags, setTags] = useState<Array<{ id: number; name: string }>>([]);
   const [selectedTab, setSelectedTab] = useState("editor");
   const [isDragging, setIsDragging] = useState(false);
+  const [autosaveStatus, setAutosaveStatus] = useState<"idle" | "saving" | "saved" | "conflict">("idle");
+  // Last content known to the server and its hash
+  const savedContentRef = useRef(post?.content || "");
+  const baseHashRef = useRef(post?.content_hash);
+  const autosavingRef = useRef(false);
+  // Published posts change only on an explicit save, so half-written edits never go live
+  const autosaveEnabled = !!post && post.status !== "published";
 
   const {
     register,
     handleSubmit,
     watch,
+    getValues,
     setValue,
     formState: { errors },
   } = useForm<PostFormData>({
@@ -111,6 +125,46 @@ export function PostEditor({ post, onSave }: PostEditorProps) {
     fetchData();
   }, [toast]);
 
+  const autosave = async () => {
+    if (!post || !autosaveEnabled || autosavingRef.current) return;
+    autosavingRef.current = true;
+    try {
+      // Keep sending deltas until the server has caught up with the editor
+      while (baseHashRef.current) {
+        const nextContent = getValues("content");
+        const edit = diffText(savedContentRef.current, nextContent);
+        if (!edit) break;
+        setAutosaveStatus("saving");
+        const result = await admin.posts.patchContent(post.id, baseHashRef.current, [edit]);
+        savedContentRef.current = nextContent;
+        baseHashRef.current = result.content_hash;
+        setAutosaveStatus("saved");
+      }
+    } catch (error: any) {
+      if (error.response?.status === 409) {
+        // Edited elsewhere: stop autosaving instead of overwriting
+        baseHashRef.current = undefined;
+        setAutosaveStatus("conflict");
+        toast({
+          title: "自動保存を停止しました",
+          description: "この記事は別の場所で更新されています。再読み込みしてから編集してください",
+          variant: "destructive",
+        });
+      } else {
+        setAutosaveStatus("idle");
+      }
+    } finally {
+      autosavingRef.current = false;
+    }
+  };
+
+  useEffect(() => {
+    if (!autosaveEnabled || !baseHashRef.current) return;
+    const timer = setTimeout(autosave, AUTOSAVE_DELAY_MS);
+    return () => clearTimeout(timer);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [content]);
+
   const onSubmit = async (data: PostFormData, isPublish: boolean = false) => {
     setIsLoading(true);
     try {
@@ -361,7 +415,14 @@ export function PostEditor({ post, onSave }: PostEditorProps) {
           </Tabs>
         </div>
 
-        <div className="flex justify-end gap-4">
+        <div className="flex justify-end items-center gap-4">
+          {autosaveStatus !== "idle" && (
+            <span className="text-sm text-muted-foreground">
+              {autosaveStatus === "saving" && "自動保存中..."}
+              {autosaveStatus === "saved" && "本文を自動保存しました"}
+              {autosaveStatus === "conflict" && "自動保存を停止しました"}
+            </span>
+          )}
           <Button
             type="submit"
             variant="outline"
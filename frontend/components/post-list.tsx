@@ -7,8 +7,7 @@ import { format } from "date-fns";
 import { ja } from "date-fns/locale";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
-import { posts } from "@/lib/api";
-import { getThumbnailUrl } from "@/lib/config";
+import { getImageVariantUrl, posts } from "@/lib/api";
 import { useSearchParams } from "next/navigation";
 
 interface Post {
@@ -87,7 +86,7 @@ function PostListContent() {
                 {post.featured_image ? (
                   <div className="aspect-video md:aspect-square h-full relative overflow-hidden">
                     <img
-                      src={getThumbnailUrl(post.featured_image.filename, 'large')}
+                      src={getImageVariantUrl(post.featured_image, { w: 640 })}
                       alt={post.featured_image.alt_text || post.title}
                       className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
                       loading="lazy"
@@ -5,7 +5,7 @@ import Link from "next/link";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
-import { getImageUrl, posts } from "@/lib/api";
+import { getImageVariantUrl, posts } from "@/lib/api";
 import { Calendar, TrendingUp, Tag, FolderOpen } from "lucide-react";
 
 interface Post {
@@ -15,6 +15,7 @@ interface Post {
   excerpt?: string;
   published_at: string;
   featured_image?: {
+    id: number;
     filename: string;
     alt_text?: string;
   };
@@ -63,7 +64,7 @@ export function RelatedPosts({ postSlug }: RelatedPostsProps) {
         {post.featured_image ? (
           <div className="w-20 h-20 flex-shrink-0 bg-muted rounded-md overflow-hidden">
             <img
-              src={getImageUrl(post.featured_image.filename)}
+              src={getImageVariantUrl(post.featured_image, { w: 150, h: 150, fit: "cover" })}
               alt={post.featured_image.alt_text || post.title}
               className="w-full h-full object-cover group-hover:scale-105 transition-transform"
             />
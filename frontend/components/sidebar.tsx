@@ -18,12 +18,14 @@ interface Category {
   id: number;
   name: string;
   slug: string;
+  published_post_count?: number;
 }
 
 interface TagType {
   id: number;
   name: string;
   slug: string;
+  published_post_count?: number;
 }
 
 interface SidebarProps {
@@ -390,6 +392,9 @@ export function Sidebar({ categories, tags, selectedCategories = [], selectedTag
                       className="text-primary focus:ring-primary"
                     />
                     {category.name}
+                    {category.published_post_count !== undefined && (
+                      <span className="text-xs text-muted-foreground">({category.published_post_count})</span>
+                    )}
                   </label>
                 );
               })}
@@ -426,6 +431,9 @@ export function Sidebar({ categories, tags, selectedCategories = [], selectedTag
                       className="text-primary focus:ring-primary"
                     />
                     #{tag.name}
+                    {tag.published_post_count !== undefined && (
+                      <span className="text-xs text-muted-foreground">({tag.published_post_count})</span>
+                    )}
                   </label>
                 );
               })}
@@ -1,4 +1,5 @@
 import axios from 'axios';
+import type { TextEdit } from './text-delta';
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost/api';
 
@@ -8,6 +9,19 @@ export const getImageUrl = (filename: string) => {
   return `${baseUrl}/uploads/images/${filename}`;
 };
 
+// Resized image served by the backend; w and h must be one of its allowed sizes.
+// v (the stored filename without extension) changes with every upload, so cached URLs never outlive the image
+export const getImageVariantUrl = (
+  image: { id: number; filename: string },
+  options: { w?: number; h?: number; fit?: 'contain' | 'cover'; fmt?: 'jpeg' | 'png' | 'webp' }
+) => {
+  const params = new URLSearchParams({ v: image.filename.replace(/\.[^.]*$/, '') });
+  Object.entries(options).forEach(([key, value]) => {
+    if (value !== undefined) params.append(key, String(value));
+  });
+  return `${API_URL}/images/${image.id}?${params.toString()}`;
+};
+
 export const api = axios.create({
   baseURL: API_URL,
   headers: {
@@ -26,6 +40,44 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Files above this size are sent in chunks via the resumable upload protocol
+const SINGLE_UPLOAD_MAX_BYTES = 5 * 1024 * 1024;
+const UPLOAD_CHUNK_RETRIES = 3;
+
+const uploadResumable = async (file: File, altText?: string, caption?: string) => {
+  const { data: session } = await api.post('/admin/images/uploads', {
+    filename: file.name,
+    content_type: file.type,
+    size: file.size,
+  });
+  let offset: number = session.offset;
+  let failures = 0;
+  while (offset < file.size) {
+    try {
+      const response = await api.patch(
+        `/admin/images/uploads/${session.upload_id}`,
+        file.slice(offset, offset + session.chunk_size),
+        { params: { offset }, headers: { 'Content-Type': 'application/octet-stream' } }
+      );
+      offset = response.data.offset;
+      failures = 0;
+    } catch (error: any) {
+      const status = error?.response?.status;
+      if ((status && status !== 409 && status < 500) || ++failures > UPLOAD_CHUNK_RETRIES) {
+        throw error;
+      }
+      // Resume from whatever the server actually received
+      const { data } = await api.get(`/admin/images/uploads/${session.upload_id}`);
+      offset = data.offset;
+    }
+  }
+  const response = await api.post(`/admin/images/uploads/${session.upload_id}/complete`, {
+    alt_text: altText || null,
+    caption: caption || null,
+  });
+  return response.data;
+};
+
 // API functions
 export const auth = {
   login: async (username: string, password: string) => {
@@ -91,8 +143,12 @@ export const tags = {
 
 export const admin = {
   posts: {
-    list: async (page?: number, per_page?: number) => {
-      const response = await api.get('/admin/posts', { params: { page, per_page } });
+    list: async (
+      page?: number,
+      per_page?: number,
+      filters?: { status?: string; author_id?: number; category_id?: number; tag_id?: number; title_prefix?: string }
+    ) => {
+      const response = await api.get('/admin/posts', { params: { page, per_page, ...filters } });
       return response.data;
     },
     get: async (id: number) => {
@@ -107,6 +163,11 @@ export const admin = {
       const response = await api.put(`/admin/posts/${id}`, data);
       return response.data;
     },
+    // 本文の差分保存。base_hash が古ければ 409
+    patchContent: async (id: number, base_hash: string, edits: TextEdit[]) => {
+      const response = await api.patch(`/admin/posts/${id}/content`, { base_hash, edits });
+      return response.data as { content_hash: string; content_length: number; changed: boolean };
+    },
     delete: async (id: number) => {
       const response = await api.delete(`/admin/posts/${id}`);
       return response.data;
@@ -166,6 +227,9 @@ export const admin = {
       return response.data;
     },
     upload: async (file: File, altText?: string, caption?: string) => {
+      if (file.size > SINGLE_UPLOAD_MAX_BYTES) {
+        return uploadResumable(file, altText, caption);
+      }
       const formData = new FormData();
       formData.append('file', file);
       if (altText) formData.append('alt_text', altText);
@@ -254,4 +318,23 @@ export const likes = {
     const response = await api.get(`/posts/${slug}/likes`);
     return response.data;
   },
-};
\ No newline at end of file
+  // Counts requested in the same tick (e.g. by every card of a list page) are fetched with one request
+  count: (postId: number): Promise<number | undefined> =>
+    new Promise((resolve) => {
+      if (!pendingLikeCounts) {
+        const batch = new Map<number, ((count: number | undefined) => void)[]>();
+        pendingLikeCounts = batch;
+        setTimeout(() => {
+          pendingLikeCounts = null;
+          api.get('/posts/likes', { params: { ids: Array.from(batch.keys()).join(',') } })
+            .then((response) => batch.forEach((callbacks, id) => callbacks.forEach((cb) => cb(response.data[id]))))
+            .catch(() => batch.forEach((callbacks) => callbacks.forEach((cb) => cb(undefined))));
+        }, 0);
+      }
+      const callbacks = pendingLikeCounts.get(postId) || [];
+      callbacks.push(resolve);
+      pendingLikeCounts.set(postId, callbacks);
+    }),
+};
+
+let pendingLikeCounts: Map<number, ((count: number | undefined) => void)[]> | null = null;
\ No newline at end of file
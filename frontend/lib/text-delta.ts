@@ -0,0 +1,59 @@
+export interface TextEdit {
+  // Offsets are in Unicode code points, matching Python string indexing on the server
+  position: number;
+  delete: number;
+  insert: string;
+}
+
+const isHighSurrogate = (code: number) => code >= 0xd800 && code <= 0xdbff;
+const isLowSurrogate = (code: number) => code >= 0xdc00 && code <= 0xdfff;
+
+const codePointLength = (text: string) => {
+  let length = 0;
+  for (let i = 0; i < text.length; i++) {
+    if (!(isLowSurrogate(text.charCodeAt(i)) && i > 0 && isHighSurrogate(text.charCodeAt(i - 1)))) {
+      length++;
+    }
+  }
+  return length;
+};
+
+/**
+ * 変更前後の本文から、共通の先頭・末尾を除いた1つの置換を求める（変更がなければ null）
+ */
+export function diffText(previous: string, next: string): TextEdit | null {
+  if (previous === next) {
+    return null;
+  }
+
+  let start = 0;
+  const maxStart = Math.min(previous.length, next.length);
+  while (start < maxStart && previous.charCodeAt(start) === next.charCodeAt(start)) {
+    start++;
+  }
+  // Never split a surrogate pair
+  if (start > 0 && isHighSurrogate(previous.charCodeAt(start - 1))) {
+    start--;
+  }
+
+  let previousEnd = previous.length;
+  let nextEnd = next.length;
+  while (
+    previousEnd > start &&
+    nextEnd > start &&
+    previous.charCodeAt(previousEnd - 1) === next.charCodeAt(nextEnd - 1)
+  ) {
+    previousEnd--;
+    nextEnd--;
+  }
+  if (previousEnd < previous.length && isLowSurrogate(previous.charCodeAt(previousEnd))) {
+    previousEnd++;
+    nextEnd++;
+  }
+
+  return {
+    position: codePointLength(previous.slice(0, start)),
+    delete: codePointLength(previous.slice(start, previousEnd)),
+    insert: next.slice(start, nextEnd),
+  };
+}